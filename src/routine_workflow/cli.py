@@ -9,22 +9,24 @@ rich-powered --help renderer (when rich is installed).
 import os
 import sys
 import argparse
-import importlib.util
 import textwrap
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Set, Dict, Any
+from typing import AbstractSet, List, Optional, Dict, Any, Tuple
 
-from .config import WorkflowConfig
-from .config_loader import load_config
-from .runner import WorkflowRunner
-from .banner import print_logo
 from .constants import STEP_NAMES, STEP_ALIASES, PRIMARY_ALIASES
 from .prompt_service import run_interactive_mode
 from .pre_commit_installer import install_pre_commit_hook
 
 
-def _has_rich() -> bool:
-    return importlib.util.find_spec("rich") is not None
+def _version() -> str:
+    """Package version from its metadata; looked up only when a version is printed."""
+    from . import __version__
+
+    return __version__
+
+# Worker default is fixed for the life of the process; compute it once
+_DEFAULT_WORKERS = min(8, os.cpu_count() or 4)
 
 
 def build_parser(defaults: Optional[Dict[str, Any]] = None) -> argparse.ArgumentParser:
@@ -36,8 +38,6 @@ def build_parser(defaults: Optional[Dict[str, Any]] = None) -> argparse.Argument
     Args:
         defaults: Optional dictionary of default values to override parser defaults.
     """
-    from typing import Any  # Local import
-
     defaults = defaults or {}
 
     # Helper to get default value with precedence: supplied default -> parser default
@@ -55,7 +55,7 @@ def build_parser(defaults: Optional[Dict[str, Any]] = None) -> argparse.Argument
           routine-workflow -t 1800 -p /path/to/proj     # Timeout + custom root
           routine-workflow -es -eda                     # Enable security/audit gates
           routine-workflow --fail-on-backup --yes       # Exit on backup fail, auto-confirm
-          routine-workflow --create-dump-run-cmd create-dump batch run --dirs custom .""")
+          routine-workflow --create-dump-run-cmd -- create-dump batch run --dirs custom .""")
 
     parser = argparse.ArgumentParser(
         description='Production routine workflow',
@@ -63,15 +63,17 @@ def build_parser(defaults: Optional[Dict[str, Any]] = None) -> argparse.Argument
         epilog=epilog,
     )
 
-    parser.add_argument('-p', '--project-root', type=Path, default=Path(os.getenv('PROJECT_ROOT', os.getcwd())),
-                        help='Project root path')
-    parser.add_argument('-l', '--log-dir', type=Path, default=Path(os.getenv('LOG_DIR', '/sdcard/tools/logs')),
-                        help='Directory to write logs')
+    # Env/cwd-derived defaults are left as None here and resolved after parsing
+    # (see _apply_env_defaults) so building the parser stays side-effect free.
+    parser.add_argument('-p', '--project-root', type=Path, default=None,
+                        help='Project root path (default: $PROJECT_ROOT or cwd)')
+    parser.add_argument('-l', '--log-dir', type=Path, default=None,
+                        help='Directory to write logs (default: $LOG_DIR or /sdcard/tools/logs)')
     parser.add_argument('--log-file', type=Path, default=None, help='Optional single log file path')
-    parser.add_argument('--lock-dir', type=Path, default=Path(os.getenv('LOCK_DIR', '/tmp/routine_workflow.lock')),
-                        help='Lock directory used to guard a running workflow')
-    parser.add_argument('--lock-ttl', type=int, default=int(os.getenv('LOCK_TTL', '3600')),
-                        help='Lock eviction TTL in seconds (0=disable; default: 3600)')
+    parser.add_argument('--lock-dir', type=Path, default=None,
+                        help='Lock path guarding a running workflow; a .lock file is flocked here (default: $LOCK_DIR or /tmp/routine_workflow.lock)')
+    parser.add_argument('--lock-ttl', type=int, default=None,
+                        help='Unused; kept for compatibility (the OS releases the lock when the holder exits; default: $LOCK_TTL or 3600)')
 
     # Logging args
     parser.add_argument('--log-level', type=str, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
@@ -96,16 +98,19 @@ def build_parser(defaults: Optional[Dict[str, Any]] = None) -> argparse.Argument
     parser.add_argument('-nd', '--no-dry-run', dest='dry_run', action='store_false',
                         help='Disable dry-run (perform real execution)')
 
-    parser.add_argument('-w', '--workers', type=int, default=get_default('workers', min(8, os.cpu_count() or 4)),
+    parser.add_argument('-w', '--workers', type=int, default=get_default('workers', _DEFAULT_WORKERS),
                         help='Parallel workers for autoimport')
-    parser.add_argument('-t', '--workflow-timeout', type=int, default=get_default('workflow_timeout', int(os.getenv('WORKFLOW_TIMEOUT', '0'))),
-                        help='Overall timeout in seconds (0=disable)')
+    parser.add_argument('-t', '--workflow-timeout', type=int, default=get_default('workflow_timeout', None),
+                        help='Overall timeout in seconds (0=disable; default: $WORKFLOW_TIMEOUT or 0)')
     parser.add_argument('--exclude-patterns', nargs='*', default=get_default('exclude_patterns', None), help='Optional override exclude patterns')
-    parser.add_argument('--create-dump-run-cmd', nargs=argparse.REMAINDER, default=None,
-                        help='Override create-dump run command (base args before dynamic flags)')
+    parser.add_argument('--create-dump-run-cmd', nargs='*', default=None,
+                        help='Override create-dump run command (base args before dynamic flags); '
+                             'pass it after "--" when it contains options')
 
     parser.add_argument(
         '-s', '--steps', nargs='+', default=None,
+        # Unknown names are rejected at parse time; sorted so the error lists them in order
+        choices=_SORTED_CHOICES, metavar='STEP',
         # --- UPDATED help text ---
         help='Run specific steps or aliases (e.g., "git backup pytest"). Supports custom order/repeats. Defaults to all.'
     )
@@ -120,6 +125,8 @@ def build_parser(defaults: Optional[Dict[str, Any]] = None) -> argparse.Argument
 
     parser.add_argument('--profile', action='store_true',
                         help='Profile execution time of steps and workflow')
+    parser.add_argument('--overlap', action='store_true',
+                        help='Overlap independent steps: step1 runs beside the reformat/test chain (default: one at a time)')
 
     parser.add_argument('--install-pre-commit', action='store_true',
                         help='Install routine-workflow as a pre-commit hook')
@@ -151,14 +158,102 @@ def build_parser(defaults: Optional[Dict[str, Any]] = None) -> argparse.Argument
 
     parser.set_defaults(**bool_defaults)
     parser.add_argument(
-        "--version", action="version", version=f"%(prog)s 9.0.2", help="Show program's version number and exit"
+        "--version", action="version", version=f"%(prog)s {_version()}", help="Show program's version number and exit"
     )
 
     return parser
 
 
+def _build_resolver(available_steps: AbstractSet[str], aliases: Dict[str, str]) -> Dict[str, str]:
+    """Merge aliases and canonical names (dotted and underscored) into one lookup."""
+    resolver: Dict[str, str] = dict(aliases)
+    for step in available_steps:
+        resolver[step] = step
+        resolver[sys.intern(step.replace('.', '_'))] = step
+    return resolver
+
+
+# Precomputed for the default step set so the hot path is one dict probe per token
+_RESOLVE: Dict[str, str] = _build_resolver(STEP_NAMES, STEP_ALIASES)
+_SORTED_ALIASES = tuple(sorted(STEP_ALIASES))
+_SORTED_CHOICES = tuple(sorted(_RESOLVE))
+
+
+@dataclass
+class CliArgs:
+    """Parsed CLI arguments with one slot per parser ``dest``.
+
+    Converted from the argparse ``Namespace`` once after parsing so
+    downstream reads are slot lookups rather than ``__dict__`` probes.
+    ``__slots__`` is spelled out (fields carry no defaults) to keep
+    Python 3.9 support.
+    """
+
+    __slots__ = (
+        'project_root', 'log_dir', 'log_file', 'lock_dir', 'lock_ttl',
+        'log_level', 'log_format', 'log_rotation_max_bytes', 'log_rotation_backup_count',
+        'fail_on_backup', 'yes', 'dry_run', 'workers', 'workflow_timeout',
+        'exclude_patterns', 'create_dump_run_cmd', 'steps', 'test_cov_threshold',
+        'git_push', 'enable_security', 'enable_dep_audit', 'profile', 'overlap',
+        'install_pre_commit', 'interactive',
+    )
+
+    project_root: Path
+    log_dir: Path
+    log_file: Optional[Path]
+    lock_dir: Path
+    lock_ttl: int
+    log_level: str
+    log_format: str
+    log_rotation_max_bytes: int
+    log_rotation_backup_count: int
+    fail_on_backup: bool
+    yes: bool
+    dry_run: bool
+    workers: int
+    workflow_timeout: int
+    exclude_patterns: Optional[List[str]]
+    create_dump_run_cmd: Optional[List[str]]
+    steps: Optional[List[str]]
+    test_cov_threshold: int
+    git_push: bool
+    enable_security: bool
+    enable_dep_audit: bool
+    profile: bool
+    overlap: bool
+    install_pre_commit: bool
+    interactive: bool
+
+    @classmethod
+    def from_namespace(cls, ns: argparse.Namespace) -> "CliArgs":
+        return cls(**vars(ns))
+
+
+def _apply_env_defaults(args: argparse.Namespace) -> argparse.Namespace:
+    """Fill in env/cwd-derived defaults for options the user did not pass."""
+    if args.project_root is None:
+        args.project_root = Path(os.getenv('PROJECT_ROOT', os.getcwd()))
+    if args.log_dir is None:
+        args.log_dir = Path(os.getenv('LOG_DIR', '/sdcard/tools/logs'))
+    if args.lock_dir is None:
+        args.lock_dir = Path(os.getenv('LOCK_DIR', '/tmp/routine_workflow.lock'))
+    if args.lock_ttl is None:
+        args.lock_ttl = int(os.getenv('LOCK_TTL', '3600'))
+    if args.workflow_timeout is None:
+        args.workflow_timeout = int(os.getenv('WORKFLOW_TIMEOUT', '0'))
+    return args
+
+
+def _split_passthrough(cli_args: List[str]) -> Tuple[List[str], List[str]]:
+    """Split argv at the first '--'; the tail is the create-dump run command."""
+    if '--' not in cli_args:
+        return cli_args, []
+    idx = cli_args.index('--')
+    return cli_args[:idx], cli_args[idx + 1:]
+
+
 # --- UPDATED validate_steps function ---
-def validate_steps(steps: Optional[List[str]], available_steps: Set[str], aliases: Dict[str, str]) -> List[str]:
+def validate_steps(steps: Optional[List[str]], available_steps: AbstractSet[str], aliases: Dict[str, str]) -> List[str]:
     """Validate and translate requested steps/aliases; warn and exit on fully-invalid sets.
 
     Returns a list of valid, translated canonical step names.
@@ -167,73 +262,103 @@ def validate_steps(steps: Optional[List[str]], available_steps: Set[str], aliase
     """
     if not steps:
         return []
-    
+
+    # Fast path: every token is already a canonical id (e.g. CI wrappers enumerating steps)
+    if available_steps >= set(steps):  # abc.Set has the operator, not issuperset()
+        return list(steps)
+
+    if available_steps is STEP_NAMES and aliases is STEP_ALIASES:
+        resolver, sorted_aliases = _RESOLVE, _SORTED_ALIASES
+    else:
+        resolver, sorted_aliases = _build_resolver(available_steps, aliases), tuple(sorted(aliases))
+
+    resolve = resolver.get
+
+    # Fast path: a single valid alias needs no list bookkeeping
+    if len(steps) == 1:
+        canonical = resolve(sys.intern(steps[0]))
+        if canonical is not None:
+            return [canonical]
+
     translated_steps: List[str] = []
     invalid_steps: List[str] = []
 
-    # --- REVISED LOGIC ---
     for step_name in steps:
-        # 1. Check if it's a known alias (respects underscores)
-        if step_name in aliases:
-            translated_steps.append(aliases[step_name])
-        # 2. Check if it's a canonical name (with underscore or dot)
+        canonical = resolve(sys.intern(step_name))
+        if canonical is not None:
+            translated_steps.append(canonical)
         else:
-            normalized_name = step_name.replace('_', '.')
-            if normalized_name in available_steps:
-                translated_steps.append(normalized_name)
-            # 3. Otherwise, it's invalid
-            else:
-                invalid_steps.append(step_name) # Append the original name
-    # --- END REVISED LOGIC ---
+            invalid_steps.append(step_name)  # Append the original name
 
     if invalid_steps:
         print(f"Warning: Skipping invalid steps: {', '.join(invalid_steps)}", file=sys.stderr)
         if not translated_steps:
             # If the user specified steps but none are valid, bail out
-            print(f"Error: No valid steps provided. Valid aliases are: {', '.join(sorted(aliases.keys()))}", file=sys.stderr)
+            print(f"Error: No valid steps provided. Valid aliases are: {', '.join(sorted_aliases)}", file=sys.stderr)
             sys.exit(1)
-    
+
     return translated_steps
 # --- End UPDATED function ---
 
 
 def main() -> int:
+    cli_args = sys.argv[1:]
+
+    # Version probes (common in CI health checks) need neither config nor parser
+    if cli_args and cli_args[0] == '--version':
+        print(f"routine-workflow {_version()}")
+        return 0
+
+    # Early --help interception so rich can render a prettier help screen.
+    # Handled before any config I/O: help shows the built-in defaults.
+    if cli_args and cli_args[0] in ('-h', '--help'):
+        parser = build_parser()
+        # One attempted import instead of a find_spec probe followed by the import
+        try:
+            from rich.console import Console
+        except ImportError:
+            parser.print_help()
+            return 0
+
+        from .help_renderer import render_rich_help
+
+        render_rich_help(Console(), parser)
+        return 0
+
     # 1. First pass: Parse only project-root to locate config
     # We use a throwaway parser to find -p/--project-root without triggering required args errors (if any)
     pre_parser = argparse.ArgumentParser(add_help=False)
     pre_parser.add_argument('-p', '--project-root', type=Path, default=Path(os.getenv('PROJECT_ROOT', os.getcwd())))
 
-    cli_args = sys.argv[1:]
-
-    # Check for help early to avoid parsing partial args if help is requested
-    # But we need to build the REAL parser to show help with correct defaults?
-    # Actually, showing help with defaults from config is nice.
-    # So we should try to load config even for help.
-
     known_args, _ = pre_parser.parse_known_args(cli_args)
     project_root = known_args.project_root.resolve()
 
     # 2. Load config from project root
+    from .config_loader import load_config
+
     file_config = load_config(project_root)
 
     # 3. Build actual parser with loaded defaults
     parser = build_parser(defaults=file_config)
 
-    # Early --help interception so rich can render a prettier help screen
-    if len(cli_args) > 0 and cli_args[0] in ('-h', '--help'):
-        if _has_rich():
-            from rich.console import Console
-            from .help_renderer import render_rich_help
-
-            console = Console()
-            render_rich_help(console, parser)
-        else:
-            parser.print_help()
-        return 0
-
-    print_logo()
-    # Normal parse
-    args = parser.parse_args(cli_args)
+    # Heavy imports (runner graph, banner) are deferred past the help
+    # short-circuit so `-h` does not pay for them.
+    from .config import WorkflowConfig
+    from .runner import WorkflowRunner
+
+    # Banner only when someone is watching (skipped when piped, in CI, or NO_BANNER=1)
+    if sys.stdout.isatty() and os.getenv('NO_BANNER') != '1':
+        from .banner import print_logo
+
+        print_logo()
+    # Normal parse; anything after '--' is the create-dump run command
+    cli_args, passthrough = _split_passthrough(cli_args)
+    args = _apply_env_defaults(parser.parse_args(cli_args))
+    if passthrough:
+        if args.create_dump_run_cmd is None:
+            parser.error("arguments after '--' require --create-dump-run-cmd")
+        args.create_dump_run_cmd = args.create_dump_run_cmd + passthrough
+    args = CliArgs.from_namespace(args)
 
     if args.install_pre_commit:
         install_pre_commit_hook(project_root)
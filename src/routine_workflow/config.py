@@ -6,26 +6,31 @@
 from __future__ import annotations
 
 import os
+import sys
 from dataclasses import dataclass, field
-from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
 from .defaults import default_exclude_patterns
 
 
-def _default_clean_cmd() -> List[str]:
-    return ['create-dump', 'batch', 'clean']
+# Immutable command defaults: shared by every config instance, no per-instance copies
+_CLEAN_CMD: Tuple[str, ...] = ('create-dump', 'batch', 'clean')
+_RUN_CMD: Tuple[str, ...] = (
+    'create-dump', 'batch', 'run',
+    '--dirs', '., packages, packages/platform_core, packages/telethon_adapter_kit, services, services/forwarder_bot',  # Default; override via CLI
+)
 
 
-def _default_run_cmd() -> List[str]:
-    return [
-        'create-dump', 'batch', 'run',
-        '--dirs', '., packages, packages/platform_core, packages/telethon_adapter_kit, services, services/forwarder_bot',  # Default; override via CLI
-    ]
+# Read once: os.cpu_count() may parse cpusets, and the value should not drift mid-run
+_CPU_COUNT = os.cpu_count() or 4
+_CPU_DEFAULT_WORKERS = min(8, _CPU_COUNT)
 
+# slots=True drops the per-instance __dict__; the keyword only exists on 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class WorkflowConfig:
     # Positional (non-default) fields first
     project_root: Path
@@ -35,18 +40,19 @@ class WorkflowConfig:
 
     # Defaults follow
     lock_ttl: int = 3600
-    create_dump_clean_cmd: List[str] = field(default_factory=_default_clean_cmd)
-    create_dump_run_cmd: List[str] = field(default_factory=_default_run_cmd)
+    create_dump_clean_cmd: Tuple[str, ...] = _CLEAN_CMD
+    create_dump_run_cmd: Tuple[str, ...] = _RUN_CMD
 
     fail_on_backup: bool = False
     auto_yes: bool = False
     dry_run: bool = field(default=True)
-    max_workers: int = field(default_factory=lambda: min(8, os.cpu_count() or 4))
+    max_workers: int = _CPU_DEFAULT_WORKERS
     test_cov_threshold: int = 85
     git_push: bool = False
     enable_security: bool = False
     enable_dep_audit: bool = False
     profile: bool = False
+    overlap: bool = False
 
     # logging
     log_level: str = "INFO"
@@ -59,6 +65,12 @@ class WorkflowConfig:
 
     exclude_patterns: List[str] = field(default_factory=default_exclude_patterns)
 
+    # Derived: project_root as str, computed once for every subprocess cwd
+    project_root_str: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'project_root_str', str(self.project_root))
+
     @classmethod
     def from_args(cls, args: argparse.Namespace) -> "WorkflowConfig":
         import argparse  # Lazy import for module isolation
@@ -68,6 +80,8 @@ class WorkflowConfig:
 
         # Generate log_file if not provided
         if args.log_file is None:
+            from datetime import datetime
+
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             log_file = log_dir / f"routine_{ts}.log"
         else:
@@ -75,11 +89,11 @@ class WorkflowConfig:
 
         exclude_patterns = args.exclude_patterns if args.exclude_patterns else default_exclude_patterns()
 
-        workers = args.workers if hasattr(args, 'workers') and args.workers is not None else min(8, os.cpu_count() or 4)
+        workers = args.workers if hasattr(args, 'workers') and args.workers is not None else _CPU_DEFAULT_WORKERS
 
         # Handle CLI override for run cmd only
-        create_dump_run_cmd = args.create_dump_run_cmd if args.create_dump_run_cmd else _default_run_cmd()
-        create_dump_clean_cmd = _default_clean_cmd()  # No override; use default
+        create_dump_run_cmd = tuple(args.create_dump_run_cmd) if args.create_dump_run_cmd else _RUN_CMD
+        create_dump_clean_cmd = _CLEAN_CMD  # No override; use default
 
         # Env fallbacks for new flags
         enable_security = os.getenv('ENABLE_SECURITY', '0') == '1' or args.enable_security
@@ -89,6 +103,7 @@ class WorkflowConfig:
         lock_ttl = args.lock_ttl if hasattr(args, 'lock_ttl') else int(os.getenv('LOCK_TTL', '3600'))
 
         profile = getattr(args, 'profile', False)
+        overlap = getattr(args, 'overlap', False)
 
         # Logging from args or env
         log_level = getattr(args, 'log_level', os.getenv('LOG_LEVEL', 'INFO'))
@@ -115,6 +130,7 @@ class WorkflowConfig:
             enable_security=enable_security,
             enable_dep_audit=enable_dep_audit,
             profile=profile,
+            overlap=overlap,
             log_level=log_level,
             log_format=log_format,
             log_rotation_max_bytes=log_rotation_max_bytes,
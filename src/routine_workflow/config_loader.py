@@ -1,5 +1,7 @@
 """Configuration loader for pyproject.toml."""
 
+import copy
+import functools
 import sys
 from pathlib import Path
 from typing import Any, Dict
@@ -15,11 +17,21 @@ def load_config(project_root: Path) -> Dict[str, Any]:
 
     Returns a dictionary with keys normalized (dashes replaced by underscores).
     If the file or section doesn't exist, returns an empty dictionary.
+    Parsed results are cached per file and invalidated when its mtime/size change.
     """
     pyproject_path = project_root / "pyproject.toml"
-    if not pyproject_path.exists():
+    try:
+        st = pyproject_path.stat()
+    except FileNotFoundError:
         return {}
 
+    # Hand out a copy so callers cannot mutate the cached entry (values may be lists)
+    return copy.deepcopy(_load_config_cached(pyproject_path, st.st_mtime_ns, st.st_size))
+
+
+@functools.lru_cache(maxsize=16)
+def _load_config_cached(pyproject_path: Path, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse pyproject.toml; ``mtime_ns``/``size`` only serve as the cache key."""
     try:
         with open(pyproject_path, "rb") as f:
             data = tomllib.load(f)
@@ -2,7 +2,8 @@
 
 """Constants for the routine-workflow package."""
 
-from typing import Dict, Set
+import sys
+from typing import Dict, FrozenSet
 
 # Maps all accepted aliases to their canonical step ID
 STEP_ALIASES: Dict[str, str] = {
@@ -40,8 +41,12 @@ PRIMARY_ALIASES: Dict[str, str] = {
     "step6.5": "audit",
 }
 
+# Intern keys and targets so lookups with interned user tokens hit the
+# identity fast path in dict/set probes
+STEP_ALIASES = {sys.intern(k): sys.intern(v) for k, v in STEP_ALIASES.items()}
+
 # Canonical step names
-STEP_NAMES: Set[str] = {
+STEP_NAMES: FrozenSet[str] = frozenset(sys.intern(s) for s in (
     "step1", "step2", "step2.5", "step3", "step3.5",
     "step4", "step5", "step6", "step6.5"
-}
+))
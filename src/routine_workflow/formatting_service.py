@@ -23,7 +23,8 @@ def perform_reformat(runner: WorkflowRunner) -> None:
         return
 
     if cmd_exists('ruff'):
-        run_command(runner, 'Ruff initial format', ['ruff', 'format', '.'])
+        # Its "N files reformatted" summary is superseded by the final format below
+        run_command(runner, 'Ruff initial format', ['ruff', 'format', '.'], capture=False)
 
     if cmd_exists('autoflake'):
         run_command(runner, 'Autoflake cleanup', [
@@ -3,47 +3,66 @@
 """Rich-powered --help renderer."""
 
 import argparse
-from typing import Dict, Set
+from typing import Any, List, Tuple
 
 from .constants import STEP_NAMES, PRIMARY_ALIASES
 
+_SORTED_STEPS = tuple(sorted(STEP_NAMES))
+
+
+def option_rows(parser: argparse.ArgumentParser) -> List[Tuple[str, str]]:
+    """Return ``(flags, description)`` rows for the options table."""
+    rows: List[Tuple[str, str]] = []
+    for action in parser._actions:
+        if getattr(action, 'dest', None) == 'help':  # skip built-in help action
+            continue
+        # Build a succinct flag string (shorts + longs)
+        flag_str = ' '.join(action.option_strings) if action.option_strings else action.dest.upper()
+        desc = action.help or ''
+        if (action.default is not argparse.SUPPRESS) and (action.default is not None) and (not isinstance(action.default, bool)):
+            # Show non-boolean defaults inline (booleans are obvious from presence/absence)
+            desc += f" [dim](default: {action.default})[/dim]"
+        rows.append((flag_str, desc))
+    return rows
+
+
 def render_rich_help(console, parser: argparse.ArgumentParser) -> None:
     """Render a friendly --help using rich panels and tables.
 
     This mirrors the argparse data but prints it with richer formatting.
     """
+    for renderable in _build_renderables(parser):
+        console.print(renderable)
+
+
+def _build_renderables(parser: argparse.ArgumentParser) -> List[Any]:
+    """Build the panels and tables that make up the rich help screen."""
     from rich.text import Text
     from rich.table import Table
     from rich.panel import Panel
-    from rich.markdown import Markdown
+    from rich.console import Group
+    from rich.syntax import Syntax
+
+    renderables: List[Any] = []
 
     # Usage (bold yellow box)
     usage = parser.format_usage()
-    console.print(Panel(Text(usage, style="bold yellow"), title="Usage", border_style="yellow"))
+    renderables.append(Panel(Text(usage, style="bold yellow"), title="Usage", border_style="yellow"))
 
     # Description
     description = parser.description
     if description:
-        console.print(f"[bold magenta]Description:[/bold magenta] {description}")
+        renderables.append(f"[bold magenta]Description:[/bold magenta] {description}")
 
     # Options Table (green flags, dim defaults)
     options_table = Table(title="[bold magenta]Options[/bold magenta]", show_header=True, header_style="bold cyan")
     options_table.add_column("Flag", style="green", no_wrap=True)
     options_table.add_column("Description", style="white")
 
-    for action in parser._actions:
-        if getattr(action, 'dest', None) == 'help':  # skip built-in help action
-            continue
-        # Build a succinct flag string (shorts + longs)
-        flag_str = ' '.join(action.option_strings) if action.option_strings else action.dest.upper()
-        desc = action.help or ''
-        if (action.default is not argparse.SUPPRESS) and (action.default is not None) and (not isinstance(action.default, bool)):
-            # Show non-boolean defaults inline (booleans are obvious from presence/absence)
-            default = f" [dim](default: {action.default})[/dim]"
-            desc += default
-        options_table.add_row(flag_str, desc)
+    for row in option_rows(parser):
+        options_table.add_row(*row)
 
-    console.print(options_table)
+    renderables.append(options_table)
 
     # --- UPDATED Steps Table (now shows aliases) ---
     steps_table = Table(title="[bold magenta]Available Workflow Steps[/bold magenta]", show_header=True, header_style="bold cyan")
@@ -63,30 +82,33 @@ def render_rich_help(console, parser: argparse.ArgumentParser) -> None:
         "step6.5": "Dependency vulnerability audit (pip-audit)",
     }
 
-    for step_id in sorted(STEP_NAMES):
+    for step_id in _SORTED_STEPS:
         alias = PRIMARY_ALIASES.get(step_id, "N/A")
         desc = step_descriptions.get(step_id, "Custom/undefined step")
         steps_table.add_row(alias, step_id, desc)
 
-    console.print(steps_table)
+    renderables.append(steps_table)
     # --- End UPDATED Steps Table ---
 
-    # Examples Panel (render the parser epilog as Markdown code blocks)
-    epilog_lines = [line.rstrip() for line in (parser.epilog or "").splitlines() if line.strip()]
-    examples_content = "# Usage Examples\n"
-    for line in epilog_lines:
-        if line.startswith('#') or line.lower().startswith('examples:'):
+    # Examples Panel (epilog commands as pre-highlighted bash lines; no Markdown parse)
+    examples: List[Any] = [Text("Usage Examples", style="bold")]
+    for raw in (parser.epilog or "").splitlines():
+        line = raw.rstrip()
+        if not line:
+            continue
+        stripped = line.lstrip()
+        if stripped.startswith('#') or stripped.lower().startswith('examples:'):
             continue
-        # --- FIXED: Use line.strip() to handle leading whitespace ---
-        if line.strip().startswith('routine-workflow'):
-            examples_content += f"- ```bash\n{line.strip()}\n```\n"
+        if stripped.startswith('routine-workflow'):
+            examples.append(Syntax(stripped, "bash", theme="ansi_dark", word_wrap=True))
         else:
-            examples_content += f"{line}\n"
+            examples.append(Text(line))
 
     examples_panel = Panel(
-        Markdown(examples_content),
+        Group(*examples),
         title="[bold green]Quick Starts[/bold green]",
         border_style="green",
         expand=False,
     )
-    console.print(examples_panel)
+    renderables.append(examples_panel)
+    return renderables
@@ -6,8 +6,7 @@
 from __future__ import annotations
 
 import os
-import shutil
-import time  # New: for TTL checks
+import sys
 from contextlib import contextmanager
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -15,102 +14,89 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .runner import WorkflowRunner
 
-from .config import WorkflowConfig
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+
+def _try_lock(fd: int) -> None:
+    """Take a non-blocking exclusive lock on ``fd``; raise BlockingIOError if held."""
+    if sys.platform == 'win32':
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError as e:
+            raise BlockingIOError(str(e)) from e
+    else:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock(fd: int) -> None:
+    if sys.platform == 'win32':
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def lock_file_path(lock_dir: Path) -> Path:
+    """The flock'd file guarding runs configured with ``lock_dir``.
+
+    Always a sibling of ``lock_dir`` rather than ``lock_dir`` itself: older releases
+    mkdir'd ``lock_dir`` as the lock, and a leftover directory there must not block us.
+    """
+    return lock_dir.with_name(lock_dir.name + '.flock')
 
 
 def acquire_lock(runner: WorkflowRunner) -> None:
-    config = runner.config
+    # The kernel drops the lock when the holder dies, so no stale-lock eviction is needed
+    lock_path = lock_file_path(runner.config.lock_dir)
+    fd = None
     try:
-        # Atomic mkdir for lock dir (fail if exists)
-        config.lock_dir.mkdir(parents=True, exist_ok=False)
-        pid_path = config.lock_dir / 'pid'
-        pid_path.write_text(str(os.getpid()))
-        ts_path = config.lock_dir / 'timestamp'  # New: Epoch timestamp
-        ts_path.write_text(str(time.time()))
-        runner._pid_path = pid_path  # Set for release validation
-        runner._lock_acquired = True
-        runner.logger.info(f"Lock acquired: {config.lock_dir} (PID {os.getpid()})")
-    except FileExistsError:
-        # New: TTL-based eviction attempt
-        evicted = False
-        if config.lock_ttl > 0:
-            try:
-                pid_path = config.lock_dir / 'pid'
-                ts_path = config.lock_dir / 'timestamp'
-                if ts_path.exists():
-                    ts = float(ts_path.read_text())
-                    if time.time() - ts > config.lock_ttl:
-                        # Stale by TTL: evict
-                        shutil.rmtree(config.lock_dir)
-                        runner.logger.info(f"Evicted stale lock by TTL ({config.lock_ttl}s): {config.lock_dir}")
-                        evicted = True
-                    else:
-                        # Fresh by TTL, but check PID liveness
-                        if pid_path.exists():
-                            pid_str = pid_path.read_text().strip()
-                            try:
-                                pid = int(pid_str)
-                                os.kill(pid, 0)  # Raises OSError if dead
-                            except (ValueError, OSError):
-                                # Dead PID: evict
-                                shutil.rmtree(config.lock_dir)
-                                runner.logger.info(f"Evicted stale lock (dead PID): {config.lock_dir}")
-                                evicted = True
-                        else:
-                            # No PID: treat as stale
-                            shutil.rmtree(config.lock_dir)
-                            runner.logger.info(f"Evicted stale lock (no PID): {config.lock_dir}")
-                            evicted = True
-                else:
-                    # No timestamp: treat as stale
-                    shutil.rmtree(config.lock_dir)
-                    runner.logger.info(f"Evicted stale lock (no timestamp): {config.lock_dir}")
-                    evicted = True
-            except Exception as e:
-                runner.logger.warning(f"Failed to evict stale lock: {e} — treating as active")
-                evicted = False
-
-        if not evicted:
-            runner.logger.error(f"Lock exists: {config.lock_dir} — concurrent run detected")
-            raise SystemExit(3)
-        else:
-            # Retry acquire after eviction
-            config.lock_dir.mkdir(parents=True, exist_ok=False)
-            pid_path = config.lock_dir / 'pid'
-            pid_path.write_text(str(os.getpid()))
-            ts_path = config.lock_dir / 'timestamp'
-            ts_path.write_text(str(time.time()))
-            runner._pid_path = pid_path
-            runner._lock_acquired = True
-            runner.logger.info(f"Lock acquired post-eviction: {config.lock_dir} (PID {os.getpid()})")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(lock_path), os.O_CREAT | os.O_RDWR, 0o644)
+        _try_lock(fd)
+    except BlockingIOError:
+        os.close(fd)
+        runner.logger.error(f"Lock exists: {lock_path} — concurrent run detected")
+        raise SystemExit(3)
     except Exception as e:
+        if fd is not None:
+            os.close(fd)
         runner.logger.exception(f"Failed to acquire lock: {e}")
         raise SystemExit(3)
 
+    # PID is informational only; ownership is the flock itself. Write first, then trim
+    # any longer leftover, so readers never see an empty file. (os.replace would swap the
+    # inode out from under the flock, so the file is updated in place.)
+    try:
+        pid = str(os.getpid()).encode()
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, pid)
+        os.ftruncate(fd, len(pid))
+    except OSError as e:
+        runner.logger.warning(f"Could not record PID in lock file: {e}")
+    runner._lock_fd = fd
+    runner._lock_acquired = True
+    runner.logger.info(f"Lock acquired: {lock_path} (PID {os.getpid()})")
+
 
 def release_lock(runner: WorkflowRunner) -> None:
     if not runner._lock_acquired:
         return
-    config = runner.config
+    fd = runner._lock_fd
     try:
-        pid_path = runner._pid_path
-        if pid_path and pid_path.exists():
-            pid_text = pid_path.read_text().strip()
-            if pid_text == str(os.getpid()):
-                shutil.rmtree(config.lock_dir)
-                runner.logger.info("Lock directory removed")
-            else:
-                runner.logger.warning("Lock owned by different PID — leaving it in place")
-        else:
-            # No PID file — best-effort stale removal
-            if config.lock_dir.exists():
-                shutil.rmtree(config.lock_dir)
-                runner.logger.info("Stale lock dir removed")
+        _unlock(fd)
+        runner.logger.info("Lock released")
     except Exception as e:
         runner.logger.warning(f"Error while releasing lock: {e}")
     finally:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
         runner._lock_acquired = False
-        runner._pid_path = None  # Reset for next run
+        runner._lock_fd = None  # Reset for next run
 
 
 @contextmanager
@@ -123,9 +109,11 @@ def lock_context(runner: WorkflowRunner):
 
 
 def cleanup_and_exit(runner: WorkflowRunner, exit_code: int = 0) -> None:
-    # Best-effort release locks and exit
+    # Best-effort release locks and exit. While steps overlap, another step may still be
+    # running: the lock is then released by lock_context once every step has stopped.
     try:
-        release_lock(runner)
+        if not runner._steps_overlapping:
+            release_lock(runner)
     finally:
         runner.logger.info(f"Exiting with code {exit_code}")
         raise SystemExit(exit_code)
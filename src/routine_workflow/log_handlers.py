@@ -0,0 +1,60 @@
+# src/routine_workflow/log_handlers.py
+
+"""Logging handlers used by the workflow's file log."""
+
+from __future__ import annotations
+
+import logging
+import os
+from logging.handlers import RotatingFileHandler
+from typing import Optional, Tuple
+
+
+class SizeCachedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that tracks the file size itself instead of asking the stream per record.
+
+    The running size is only reconciled with the real file once it nears ``maxBytes``,
+    and each record is formatted once even though rollover checks and emit both need it.
+    """
+
+    # Fraction of maxBytes below which the running estimate is trusted outright
+    _TRUST_RATIO = 0.9
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        try:
+            self._approx_size = os.path.getsize(self.baseFilename)
+        except OSError:
+            self._approx_size = 0
+        self._last_formatted: Optional[Tuple[logging.LogRecord, str]] = None
+
+    def format(self, record: logging.LogRecord) -> str:
+        last = self._last_formatted
+        if last is not None and last[0] is record:
+            return last[1]
+        text = super().format(record)
+        self._last_formatted = (record, text)
+        return text
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        if self.maxBytes <= 0:
+            return 0
+        self._approx_size += len(self.format(record)) + 1
+        if self._approx_size < self.maxBytes * self._TRUST_RATIO:
+            return 0
+        if super().shouldRollover(record):
+            return 1
+        # Close to the limit: resync with the real size (chars vs bytes drift)
+        self._approx_size = self.stream.tell() if self.stream else 0
+        return 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            super().emit(record)
+        finally:
+            # Rollover check and write are done with the text; don't pin the record's args/exc_info
+            self._last_formatted = None
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._approx_size = 0
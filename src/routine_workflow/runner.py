@@ -6,9 +6,9 @@
 from __future__ import annotations
 
 import os
-import signal
+import threading
 import time
-from typing import List, Tuple, Dict
+from typing import List, Optional, Tuple, Dict
 
 from .config import WorkflowConfig
 from .lock import lock_context, cleanup_and_exit
@@ -24,36 +24,103 @@ from .steps import (
     dep_audit,  # Step 6.5
 )
 from .utils import setup_logging, setup_signal_handlers
-from .constants import STEP_NAMES
 from .errors import WorkflowError, format_error
 
 
+# Steps that must finish before a step may start (full pipeline only). Reformat, tests,
+# cache clean and scan share files and caches, so they stay a chain; deleting old dumps
+# touches none of that and overlaps with it.
+_STEP_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "step1": (),
+    "step2": (),
+    "step2.5": ("step2",),
+    "step3": ("step2.5",),
+    "step3.5": ("step3",),
+    "step4": ("step1", "step3.5"),
+    "step5": ("step4",),
+    "step6": ("step5",),
+    "step6.5": ("step6",),
+}
+
+# Widest the DAG above ever runs: step1 beside whichever link of the step2 chain is active
+_MAX_STEP_OVERLAP = 2
+
+
 class WorkflowRunner:
-    def __init__(self, config: WorkflowConfig, steps: List[str] | None = None):
+    def __init__(self, config: WorkflowConfig, steps: Optional[List[str]] = None):
         self.config = config
         self.steps = steps
         self._lock_acquired = False
-        self._pid_path = None
+        self._lock_fd = None
+        # Workflow-wide timeout: a Timer sets the event; steps and run_command honour the deadline
+        self._deadline: Optional[float] = None
+        self._deadline_event = threading.Event()
+        self._pool = None  # Step executor, created on first concurrent run
+        # Set while steps overlap; cleanup_and_exit then leaves the lock to lock_context
+        self._steps_overlapping = False
         # Must verify config is a WorkflowConfig to avoid TypeError when accessing attrs in setup_logging
         self.logger = setup_logging(config)
         setup_signal_handlers(self)
 
+    @property
+    def pool(self):
+        """Thread pool shared by the run's concurrent phases; created on first use."""
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._pool = ThreadPoolExecutor(max_workers=_MAX_STEP_OVERLAP, thread_name_prefix="rw")
+        return self._pool
+
+    def _run_concurrently(self, to_run: List[Tuple[str, callable]], run_step) -> None:
+        """Run steps on executor threads, each starting once its dependencies finish.
+
+        The first step to raise (SystemExit from cleanup_and_exit included) stops any
+        further submissions; steps already running are waited for before the exception
+        is re-raised here, so nothing outlives the run or the lock.
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        pool = self.pool
+        names = {name for name, _ in to_run}
+        pending = list(to_run)  # pipeline order
+        done: set = set()
+        running: Dict[object, str] = {}
+        error: Optional[BaseException] = None
+
+        self._steps_overlapping = True
+        try:
+            while pending or running:
+                if error is None:
+                    for item in list(pending):
+                        deps = _STEP_DEPENDENCIES.get(item[0], ())
+                        if all(d in done or d not in names for d in deps):
+                            pending.remove(item)
+                            running[pool.submit(run_step, *item)] = item[0]
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    exc = future.exception()
+                    if exc is None:
+                        done.add(name)
+                    elif error is None:
+                        error = exc
+        finally:
+            # Only reached early on a main-thread interrupt; let running steps drain
+            wait(running)
+            self._steps_overlapping = False
+        if error is not None:
+            raise error
+
     def run(self) -> int:
-        # Install overall timeout via SIGALRM when supported and requested
-        alarm_installed = False
-        if self.config.workflow_timeout and hasattr(signal, "SIGALRM"):
-            def _alarm_handler(signum, frame):
-                self.logger.error(
-                    f"Workflow timed out after {self.config.workflow_timeout} seconds"
-                )
-                cleanup_and_exit(self, 124)
-
-            signal.signal(signal.SIGALRM, _alarm_handler)
-            try:
-                signal.alarm(int(self.config.workflow_timeout))
-                alarm_installed = True
-            except Exception as e:
-                self.logger.warning(f"Could not set workflow timeout alarm: {e}")
+        # Overall timeout: a daemon Timer flags the deadline; checked between steps
+        deadline_timer = None
+        if self.config.workflow_timeout:
+            self._deadline = time.monotonic() + self.config.workflow_timeout
+            deadline_timer = threading.Timer(self.config.workflow_timeout, self._deadline_event.set)
+            deadline_timer.daemon = True
+            deadline_timer.start()
 
         self.logger.info("=" * 60)
         self.logger.info("ROUTINE WORKFLOW START")
@@ -95,24 +162,39 @@ class WorkflowRunner:
                         self.logger.warning("No valid steps specified; exiting early")
                         return 0
 
-                backup_success = None
+                step_results: Dict[str, object] = {}
                 step_durations: Dict[str, float] = {}
 
-                workflow_start_time = time.time()
+                def _check_deadline() -> None:
+                    if self._deadline_event.is_set():
+                        self.logger.error(
+                            f"Workflow timed out after {self.config.workflow_timeout} seconds"
+                        )
+                        cleanup_and_exit(self, 124)
 
-                for name, step_func in to_run:
+                def _run_step(name: str, step_func) -> None:
+                    _check_deadline()
                     self.logger.info(f"Executing {name}...")
 
                     step_start = time.time()
                     try:
-                        if name == "step4":
-                            backup_success = step_func(self)
-                        else:
-                            step_func(self)
+                        step_results[name] = step_func(self)
                     finally:
                         duration = time.time() - step_start
                         step_durations[name] = duration
 
+                workflow_start_time = time.time()
+
+                # Only the full pipeline overlaps, and only on request; explicit steps run in order
+                if self.config.overlap and not self.steps:
+                    self._run_concurrently(to_run, _run_step)
+                else:
+                    for name, step_func in to_run:
+                        _run_step(name, step_func)
+                # A deadline hit inside the last step only fails that step's commands; still a timeout
+                _check_deadline()
+
+                backup_success = step_results.get("step4")
                 workflow_duration = time.time() - workflow_start_time
                 self.logger.info(f"Workflow complete. Executed steps: {', '.join(n for n, _ in to_run)}")
 
@@ -122,7 +204,7 @@ class WorkflowRunner:
                     print("=" * 40)
                     print(f"{'Step':<20} | {'Duration (s)':<15}")
                     print("-" * 40)
-                    for step, duration in step_durations.items():
+                    for step, duration in ((n, step_durations[n]) for n, _ in to_run if n in step_durations):
                         print(f"{step:<20} | {duration:.4f}s")
                     print("-" * 40)
                     print(f"{'Total Workflow':<20} | {workflow_duration:.4f}s")
@@ -143,8 +225,8 @@ class WorkflowRunner:
                 self.logger.exception(f"Workflow error: {e}")
                 return 1
             finally:
-                if alarm_installed:
-                    try:
-                        signal.alarm(0)
-                    except Exception:
-                        pass
+                if deadline_timer is not None:
+                    deadline_timer.cancel()
+                if self._pool is not None:
+                    self._pool.shutdown(wait=True)
+                    self._pool = None
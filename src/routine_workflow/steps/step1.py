@@ -24,7 +24,7 @@ def delete_old_dumps(runner: WorkflowRunner) -> None:
         return
 
     # Build from config base; infer root via cwd (no positional path)
-    cmd = config.create_dump_clean_cmd[:]
+    cmd = list(config.create_dump_clean_cmd)
     if config.dry_run:
         cmd.append('-d')  # Tool-native dry preview
     else:
@@ -37,7 +37,8 @@ def delete_old_dumps(runner: WorkflowRunner) -> None:
         runner, description, cmd,
         cwd=config.project_root,
         timeout=300.0,  # Aligned with step3/5; ample for large archives
-        fatal=False  # Advisory; continue on fail
+        fatal=False,  # Advisory; continue on fail
+        dry_run_safe=True,  # -d keeps dry runs to a native preview
     )
 
     if success["success"]:
@@ -11,6 +11,9 @@ if TYPE_CHECKING:
 
 from ..utils import cmd_exists, run_command
 
+# pytest --collect-only summary, e.g. "42 tests collected"
+_COLLECTED_RE = re.compile(r'(\d+)\s+tests?\s+collected')
+
 
 def run_tests(runner: WorkflowRunner) -> bool:
     runner.logger.info('=' * 60)
@@ -44,7 +47,9 @@ def run_tests(runner: WorkflowRunner) -> bool:
         cwd=config.project_root,
         timeout=timeout,
         fatal=False,
-        stream=True  # Enable live streaming for real-time collection/run logs
+        # Real runs stream live; the preview is captured so its summary can be parsed below
+        stream=not config.dry_run,
+        dry_run_safe=True,  # --collect-only only reads the tests, so the preview really runs
     )
 
     success = result["success"]
@@ -52,7 +57,7 @@ def run_tests(runner: WorkflowRunner) -> bool:
 
     if success:
         if config.dry_run:
-            match = re.search(r'(\d+)\s+tests?\s+collected', stdout)
+            match = _COLLECTED_RE.search(stdout)
             num = int(match.group(1)) if match else "unknown"
             runner.logger.info(f'Test suite preview: {num} tests discovered')
         else:
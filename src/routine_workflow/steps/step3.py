@@ -28,23 +28,21 @@ def clean_caches(runner: WorkflowRunner) -> None:
     cmd = ['pypurge', str(config.project_root)]
     cmd.append('--allow-root')  # Always for privileged access
 
+    # Dry runs really execute pypurge (dry_run_safe), so they must never carry -y,
+    # whatever auto_yes says; real runs always do
     if config.dry_run:
         cmd.append('-p')  # Preview mode
     else:
         cmd.append('-y')  # Force non-interactive
 
-    # Redundant auto_yes check not strictly needed if we trust dry_run, 
-    # but good for consistency if user passes -y explicit to routine-workflow
-    if config.auto_yes and '-y' not in cmd: 
-        cmd.append('-y')
-
     description = 'Clean caches'
 
     success = run_command(
         runner, description, cmd,
         cwd=config.project_root,
         timeout=300.0,
-        fatal=False  # Advisory; continue on fail
+        fatal=False,  # Advisory; continue on fail
+        dry_run_safe=True,  # -p keeps dry runs to a native preview
     )
 
     if success["success"]:
@@ -24,11 +24,14 @@ def generate_dumps(runner: WorkflowRunner) -> None:
 
     # Assume config.create_dump_run_cmd is base like ['create-dump', 'batch', 'run', '--dirs', '.,packages,services']
     # Override/extend with dynamic flags; fallback if not set
-    cmd = config.create_dump_run_cmd or ['create-dump', 'batch', 'run', '--dirs', '., packages, packages/platform_core, packages/telethon_adapter_kit, services, services/forwarder_bot']
+    base = config.create_dump_run_cmd or ('create-dump', 'batch', 'run', '--dirs', '., packages, packages/platform_core, packages/telethon_adapter_kit, services, services/forwarder_bot')
+    flags = []
     if not config.dry_run:
-        cmd.append('-nd')  # Force real run (default is dry for 'run' subcommand)
+        flags.append('-nd')  # Force real run (default is dry for 'run' subcommand)
     if config.auto_yes:
-        cmd.append('-y')  # Skip prompts (confirmation on -nd)
+        flags.append('-y')  # Skip prompts (confirmation on -nd)
+    # Build a fresh list; the config's command is shared and immutable
+    cmd = [*base, *flags]
 
     description = 'Batch generate code dumps'
 
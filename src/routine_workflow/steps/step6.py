@@ -42,11 +42,7 @@ def commit_hygiene(runner: WorkflowRunner) -> bool:
         return True
 
     # --- Real Run Logic ---
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    commit_msg = f'routine_hygiene: {timestamp}'
-
     cmd_add = ['git', 'add', '.']
-    cmd_commit = ['git', 'commit', '-m', commit_msg]
     cmd_push = ['git', 'push', '-u', 'origin', 'main']
 
     # Git add all changes
@@ -54,6 +50,11 @@ def commit_hygiene(runner: WorkflowRunner) -> bool:
     if not run_command(runner, 'git add', cmd_add, fatal=True)["success"]:
         return False
 
+    # Stamp the message only once there is something to commit
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    commit_msg = f'routine_hygiene: {timestamp}'
+    cmd_commit = ['git', 'commit', '-m', commit_msg]
+
     # Commit if changes present
     # We set fatal=False here, as a failed commit (no changes) is not a fatal error.
     commit_result = run_command(runner, 'git commit', cmd_commit, fatal=False)
@@ -4,34 +4,43 @@
 
 from __future__ import annotations
 
-import fnmatch
+import functools
 import importlib.util
 import json
 import logging
 import os
-import shlex
+import re
 import shutil
 import signal
 import subprocess
+import sys
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from logging.handlers import RotatingFileHandler
+import time
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Union, TYPE_CHECKING
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .runner import WorkflowRunner
 
-from .config import WorkflowConfig
+from .config import _CPU_COUNT, WorkflowConfig
 from .lock import cleanup_and_exit
 from .errors import CommandNotFoundError
 
 
+@functools.lru_cache(maxsize=None)
 def _has_rich() -> bool:
-    """Check if rich is available (optional dep for enhanced logging)."""
+    """Check if rich is available (optional dep for enhanced logging); probed once per process."""
     return importlib.util.find_spec("rich") is not None
 
 
+def _line_formats() -> Tuple[str, str]:
+    """Lazy %-style formats for child stdout/stderr lines; markup only when Rich renders it."""
+    if _has_rich():
+        return "[green]  %s[/green]", "[red]  %s[/red]"
+    return "  %s", "  %s"
+
+
 class JSONFormatter(logging.Formatter):
     """Format logs as JSON objects."""
 
@@ -61,7 +70,15 @@ class JSONFormatter(logging.Formatter):
         return json.dumps(log_record)
 
 
+# Log records held in memory before a batched write to the log file
+_FILE_LOG_BUFFER = 512
+
+
 def setup_logging(config: WorkflowConfig) -> logging.Logger:
+    from logging.handlers import MemoryHandler
+
+    from .log_handlers import SizeCachedRotatingFileHandler
+
     logger = logging.getLogger("routine_workflow")
 
     # Set level from config
@@ -72,7 +89,7 @@ def setup_logging(config: WorkflowConfig) -> logging.Logger:
         logger.warning("Logging handlers already exist; reusing existing setup")
     else:
         # File Handler
-        fh = RotatingFileHandler(
+        fh = SizeCachedRotatingFileHandler(
             config.log_file,
             maxBytes=config.log_rotation_max_bytes,
             backupCount=config.log_rotation_backup_count,
@@ -85,7 +102,11 @@ def setup_logging(config: WorkflowConfig) -> logging.Logger:
             fmt = logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
             fh.setFormatter(fmt)
 
-        logger.addHandler(fh)
+        # Records reach the file in batches; an ERROR flushes at once, and logging's
+        # own atexit shutdown closes (and so flushes) the buffer on normal exit
+        logger.addHandler(MemoryHandler(
+            _FILE_LOG_BUFFER, flushLevel=logging.ERROR, target=fh, flushOnClose=True
+        ))
 
         # Console Handler
         if _has_rich():
@@ -122,11 +143,80 @@ def setup_signal_handlers(runner: WorkflowRunner) -> None:
         except Exception:
             os._exit(1)
 
-    # Only set common signals; SIGALRM is set conditionally in run()
+    # Only set common signals; the workflow timeout uses a Timer in run()
     signal.signal(signal.SIGINT, _handler)
     signal.signal(signal.SIGTERM, _handler)
 
 
+# Captured output kept for callers (e.g. step2_5 parsing pytest's summary)
+_CAPTURE_MAX_LINES = 2000
+# Child output lines per log record in captured mode: typical tools land in one
+# record per stream, while very chatty ones still flush at a bounded size
+_LOG_BATCH_LINES = 1000
+# Upper bound on waiting for stream readers after the child exits (grandchildren may hold the pipe)
+_STREAM_DRAIN_TIMEOUT = 5.0
+
+
+def _pump_lines(proc: subprocess.Popen, timeout: float, on_line) -> None:
+    """Feed complete stdout/stderr lines of ``proc`` to ``on_line(kind, line)`` until EOF.
+
+    Raises subprocess.TimeoutExpired once ``timeout`` seconds of wall clock have passed.
+    """
+    deadline = time.monotonic() + timeout
+
+    if sys.platform == 'win32':
+        # select() on Windows only accepts sockets; fall back to a full read
+        out, err = proc.communicate(timeout=timeout)
+        for kind, data in (('stdout', out), ('stderr', err)):
+            for line in (data or b'').decode('utf-8', errors='replace').splitlines():
+                on_line(kind, line)
+        return
+
+    import selectors
+
+    pending = {'stdout': b'', 'stderr': b''}
+    with selectors.DefaultSelector() as sel:
+        for kind in ('stdout', 'stderr'):
+            pipe = getattr(proc, kind)
+            if pipe is not None:  # None when the stream was sent to DEVNULL
+                sel.register(pipe, selectors.EVENT_READ, kind)
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+            for key, _ in sel.select(timeout=remaining):
+                kind = key.data
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    if pending[kind]:
+                        on_line(kind, pending[kind].decode('utf-8', errors='replace').rstrip('\r'))
+                    continue
+                *lines, pending[kind] = (pending[kind] + chunk).split(b'\n')
+                for raw in lines:
+                    on_line(kind, raw.decode('utf-8', errors='replace').rstrip('\r'))
+
+
+def _feed_stdin(pipe, data: bytes) -> None:
+    try:
+        pipe.write(data)
+    except (BrokenPipeError, OSError):
+        pass  # child exited without reading everything; its exit code tells the story
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def _remaining_timeout(runner: WorkflowRunner, timeout: float) -> float:
+    """Clip a per-command timeout to whatever is left of the workflow deadline."""
+    deadline = runner._deadline
+    if deadline is None:
+        return timeout
+    return max(0.0, min(timeout, deadline - time.monotonic()))
+
+
 def run_command(
     runner: WorkflowRunner,
     description: str,
@@ -138,9 +228,19 @@ def run_command(
     timeout: float = 300.0,
     fatal: bool = False,
     stream: bool = False,  # Live line logging for interactive tools (e.g., pytest)
+    dry_run_safe: bool = False,  # Command carries the tool's own preview flag; run it in dry-run too
+    capture: bool = True,  # False: send stdout to DEVNULL (captured mode); stderr is still kept
 ) -> Dict[str, Union[bool, str]]:
+    """Run ``cmd`` and return ``{"success", "stdout", "stderr"}``.
+
+    ``shell=True`` only applies to string commands; a sequence always runs
+    directly, without an intermediate ``/bin/sh``. In dry-run mode nothing is
+    spawned unless the caller marks the command ``dry_run_safe``.
+    """
+    import shlex
+
     config = runner.config
-    cwd_path = str(cwd) if cwd else str(config.project_root)
+    cwd_path = str(cwd) if cwd else config.project_root_str
 
     # Normalize: prefer list; if cmd is string and not using shell, shlex.split it
     if isinstance(cmd, str):
@@ -150,20 +250,33 @@ def run_command(
             cmd_to_run = shlex.split(cmd)
     else:
         if shell:
-            cmd_to_run = ' '.join(shlex.quote(str(c)) for c in cmd)
-        else:
-            cmd_to_run = list(cmd)
+            # Re-quoting argv for sh buys nothing but an extra process
+            runner.logger.warning("shell=True ignored for argument list: %s", description)
+            shell = False
+        # Popen only reads the sequence; copy only non-list inputs
+        cmd_to_run = cmd if isinstance(cmd, list) else list(cmd)
 
-    runner.logger.info(f">>> {description}: {cmd_to_run}")
+    runner.logger.info(">>> %s: %s", description, cmd_to_run)
 
-    if runner.config.dry_run:
-        runner.logger.info(f"DRY RUN: Would execute: {description} (cmd: {cmd_to_run})")
+    if runner.config.dry_run and not dry_run_safe:
+        runner.logger.info("DRY RUN: Would execute: %s (cmd: %s)", description, cmd_to_run)
         return {
             "success": True,
             "stdout": "DRY RUN: Command not executed",
             "stderr": ""
         }
 
+    timeout = _remaining_timeout(runner, timeout)
+    if timeout <= 0:
+        # Workflow deadline already spent: report the timeout without spawning anything
+        runner.logger.error("Timeout (%ss) while running: %s", timeout, description)
+        if fatal:
+            cleanup_and_exit(runner, 124)
+        return {
+            "success": False,
+            "stdout": "",
+            "stderr": f"TimeoutExpired: {subprocess.TimeoutExpired(cmd_to_run, timeout)}"
+        }
     stdout = ""
     stderr = ""
     returncode = 0
@@ -186,21 +299,26 @@ def run_command(
             def stream_pipe(pipe, log_func):
                 try:
                     for line in iter(pipe.readline, ''):
-                        if line:
+                        if line and log_func is not None:
                             log_func(line.rstrip())
                 except subprocess.TimeoutExpired:
                     # swallow timeout — main thread handles it
                     pass
                 except Exception as e:
                     # do not leak to stderr
-                    runner.logger.debug(f"stream thread suppressed: {e}")
+                    runner.logger.debug("stream thread suppressed: %s", e)
 
             # Daemon threads for non-blocking streaming
-            stdout_thread = threading.Thread(target=stream_pipe, args=(proc.stdout, lambda l: runner.logger.info(f"[green]  {l}[/green]" if _has_rich() else f"  {l}")))
+            # Bound once per call; a filtered level still drains the pipe but logs nothing
+            out_fmt, err_fmt = _line_formats()
+            logger = runner.logger
+            log_out = functools.partial(logger.info, out_fmt) if logger.isEnabledFor(logging.INFO) else None
+            log_err = functools.partial(logger.warning, err_fmt) if logger.isEnabledFor(logging.WARNING) else None
+            stdout_thread = threading.Thread(target=stream_pipe, args=(proc.stdout, log_out))
             stdout_thread.daemon = True
             stdout_thread.start()
 
-            stderr_thread = threading.Thread(target=stream_pipe, args=(proc.stderr, lambda l: runner.logger.warning(f"[red]  {l}[/red]" if _has_rich() else f"  {l}")))
+            stderr_thread = threading.Thread(target=stream_pipe, args=(proc.stderr, log_err))
             stderr_thread.daemon = True
             stderr_thread.start()
 
@@ -213,7 +331,10 @@ def run_command(
             try:
                 returncode = proc.wait(timeout=timeout)
                 stdout, stderr = "", ""  # Streamed live; no capture needed
-                
+                # Drain what the readers still hold so the tail lands before the status line
+                for t in (stdout_thread, stderr_thread):
+                    t.join(_STREAM_DRAIN_TIMEOUT)
+
             except subprocess.TimeoutExpired:
                 proc.kill()
                 # Do not call proc.wait() again — test expects only one wait call
@@ -221,37 +342,67 @@ def run_command(
                 stdout, stderr = "", ""
                 
         else:
-            # Original buffered mode
-            proc = subprocess.run(
+            # Captured mode: log output as it arrives and keep only a bounded tail
+            out_tail: deque = deque(maxlen=_CAPTURE_MAX_LINES)
+            err_tail: deque = deque(maxlen=_CAPTURE_MAX_LINES)
+            out_fmt, err_fmt = _line_formats()
+            # Skip record building outright when the level filters it
+            sinks = {
+                'stdout': (out_tail, runner.logger.info, out_fmt, runner.logger.isEnabledFor(logging.INFO)),
+                'stderr': (err_tail, runner.logger.warning, err_fmt, runner.logger.isEnabledFor(logging.WARNING)),
+            }
+            # Lines are grouped into one record per _LOG_BATCH_LINES to amortise handler dispatch
+            pending: Dict[str, List[str]] = {'stdout': [], 'stderr': []}
+
+            def _flush(kind: str) -> None:
+                batch = pending[kind]
+                if batch:
+                    _, log_func, fmt, _ = sinks[kind]
+                    log_func(fmt, "\n  ".join(batch))
+                    batch.clear()
+
+            def _on_line(kind: str, line: str) -> None:
+                tail, _, _, enabled = sinks[kind]
+                tail.append(line)
+                if enabled:
+                    pending[kind].append(line)
+                    if len(pending[kind]) >= _LOG_BATCH_LINES:
+                        _flush(kind)
+
+            with subprocess.Popen(
                 cmd_to_run,
                 cwd=cwd_path,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                stdin=subprocess.PIPE if input_data else None,
                 shell=shell,
-                input=input_data,
-                timeout=timeout,
-            )
-            stdout = proc.stdout or ""
-            stderr = proc.stderr or ""
-            returncode = proc.returncode
-
-            # Log lines post-run for buffered mode
-            for line in stdout.splitlines():
-                if _has_rich():
-                    runner.logger.info(f"[green]  {line}[/green]")
-                else:
-                    runner.logger.info(f"  {line}")
-            for line in stderr.splitlines():
-                if _has_rich():
-                    runner.logger.warning(f"[red]  {line}[/red]")
-                else:
-                    runner.logger.warning(f"  {line}")
+            ) as proc:
+                if input_data:
+                    # Feed stdin from a thread so a child that echoes as it reads
+                    # cannot fill its stdout pipe while we are still writing
+                    threading.Thread(
+                        target=_feed_stdin, args=(proc.stdin, input_data.encode()), daemon=True
+                    ).start()
+                deadline = time.monotonic() + timeout
+                try:
+                    _pump_lines(proc, timeout, _on_line)
+                    # A child can close both pipes and keep running; the wait is bounded too
+                    returncode = proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    raise subprocess.TimeoutExpired(cmd_to_run, timeout)
+                finally:
+                    _flush('stdout')
+                    _flush('stderr')
+
+            stdout = "\n".join(out_tail)
+            stderr = "\n".join(err_tail)
 
         success = returncode == 0
         if success:
-            runner.logger.info(f"✓ {description} (code {returncode})")
+            runner.logger.info("✓ %s (code %s)", description, returncode)
         else:
-            runner.logger.warning(f"✖ {description} (code {returncode})")
+            runner.logger.warning("✖ %s (code %s)", description, returncode)
             if fatal:
                 runner.logger.error("Fatal command failure — aborting")
                 cleanup_and_exit(runner, returncode or 1)
@@ -271,7 +422,7 @@ def run_command(
                 "stderr": ""
             }
 
-        runner.logger.error(f"Timeout ({timeout}s) while running: {description}")
+        runner.logger.error("Timeout (%ss) while running: %s", timeout, description)
         if fatal:
             cleanup_and_exit(runner, 124)
         return {
@@ -284,7 +435,7 @@ def run_command(
         # If we have a direct command name, try to extract it, or use the first word of command
         cmd_name = cmd_to_run[0] if isinstance(cmd_to_run, list) and cmd_to_run else str(cmd_to_run)
 
-        runner.logger.error(f"Command not found for: {description}")
+        runner.logger.error("Command not found for: %s", description)
         if fatal:
             # Raise new error type instead of generic exit
             # cleanup_and_exit is basically a wrapper around sys.exit,
@@ -297,7 +448,7 @@ def run_command(
             "stderr": f"FileNotFoundError: {str(e)}"
         }
     except Exception as e:
-        runner.logger.exception(f"Unhandled exception running command: {description} — {e}")
+        runner.logger.exception("Unhandled exception running command: %s — %s", description, e)
         if fatal:
             cleanup_and_exit(runner, 1)
         return {
@@ -307,31 +458,193 @@ def run_command(
         }
 
 
+@functools.lru_cache(maxsize=None)
+def _which(cmd: str) -> Optional[str]:
+    # PATH does not change during a run; avoid re-scanning it for every step
+    return shutil.which(cmd)
+
+
 def cmd_exists(cmd: str) -> bool:
-    return shutil.which(cmd) is not None
+    return _which(cmd) is not None
+
+
+@functools.lru_cache(maxsize=8)
+def _compiled_excludes(patterns: Tuple[str, ...]) -> Pattern[str]:
+    """Fold all exclude globs into one anchored alternation regex."""
+    import fnmatch
+
+    if not patterns:
+        return re.compile(r'(?!)')  # never matches
+    # fnmatch's '*' already crosses '/', so 'dir/*' covers everything below dir/
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns))
+
+
+_GLOB_CHARS = frozenset('*?[')
+
+
+class _ExcludeMatcher:
+    """Exclude globs split by cost: literal 'dir/*' prefixes and exact paths never reach the regex."""
+
+    __slots__ = ('prefixes', 'exact', 'regex', 'dir_regex')
+
+    def __init__(self, patterns: Tuple[str, ...]) -> None:
+        prefixes: List[str] = []
+        exact = set()
+        globs: List[str] = []
+        dir_globs: List[str] = []
+        for pat in patterns:
+            # fnmatch's '*' (and '**') crosses '/', so a literal 'dir/*' is just a prefix test
+            head = pat[:-3] if pat.endswith('/**') else pat[:-2] if pat.endswith('/*') else None
+            if head is not None and _GLOB_CHARS.isdisjoint(head):
+                prefixes.append(head + '/')
+            elif _GLOB_CHARS.isdisjoint(pat):
+                exact.add(pat)
+            else:
+                globs.append(pat)
+                if head is not None:
+                    dir_globs.append(head)
+        self.prefixes = tuple(prefixes)
+        self.exact = frozenset(exact)
+        self.regex = _compiled_excludes(tuple(globs))
+        self.dir_regex = _compiled_excludes(tuple(dir_globs))
+
+    def match(self, rel: str) -> bool:
+        return rel.startswith(self.prefixes) or rel in self.exact or self.regex.match(rel) is not None
+
+    def prunes(self, rel_dir: str) -> bool:
+        """True if everything below ``rel_dir`` is excluded."""
+        return (rel_dir + '/').startswith(self.prefixes) or self.dir_regex.match(rel_dir) is not None
+
+
+@functools.lru_cache(maxsize=8)
+def _exclude_matcher(patterns: Tuple[str, ...]) -> _ExcludeMatcher:
+    return _ExcludeMatcher(patterns)
+
+
+def _is_excluded(matcher: _ExcludeMatcher, root_str: str, file_path: Path) -> bool:
+    # String slicing instead of Path.relative_to(), which builds a PurePath per call
+    prefix = root_str.rstrip(os.sep) + os.sep
+    path_str = os.fspath(file_path)
+    if not path_str.startswith(prefix):
+        # if we can't relativize, treat as excluded
+        return True
+    rel_path = path_str[len(prefix):]
+    if os.sep != '/':
+        rel_path = rel_path.replace(os.sep, '/')
+    return matcher.match(rel_path)
 
 
 def should_exclude(config: WorkflowConfig, file_path: Path) -> bool:
+    matcher = _exclude_matcher(tuple(config.exclude_patterns))
+    return _is_excluded(matcher, config.project_root_str, file_path)
+
+
+def gather_py_files(config: WorkflowConfig) -> List[Path]:
+    matcher = _exclude_matcher(tuple(config.exclude_patterns))
+    root = config.project_root
+
+    # Depth-first scandir walk; excluded subtrees (.venv, .git, ...) are never entered
+    found: List[str] = []
+    stack = [(str(root), '')]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        rel = rel_dir + name
+                        if not matcher.prunes(rel):
+                            stack.append((entry.path, rel + '/'))
+                    # Relative path is only built for .py candidates, not every file seen
+                    elif name.endswith('.py') and entry.is_file() and not matcher.match(rel_dir + name):
+                        found.append(entry.path)
+                except OSError:
+                    continue
+    # Path objects only for the survivors; sorted once, in Path order
+    return sorted(map(Path, found))
+
+
+_AUTOIMPORT_MAX_CHUNK = 64
+# Per-file budget; a chunk gets this times its length
+_AUTOIMPORT_FILE_TIMEOUT = 120.0
+
+
+def _indent_block(data: bytes) -> str:
+    """Whole child output as one message, lines joined like batched captured-mode records."""
+    # str.replace runs in C; no intermediate list of line objects as with splitlines()
+    text = data.decode('utf-8', errors='replace').rstrip('\r\n')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n')
+    return text.replace('\n', '\n  ')
+
+
+async def _autoimport_chunk(runner: WorkflowRunner, paths: Sequence[Path], fmts: Tuple[str, str]) -> bool:
+    """Run one autoimport process over ``paths``; True on exit code 0."""
+    import asyncio
+
+    out_fmt, err_fmt = fmts
+    description = f"Autoimport {len(paths)} files"
+    # Absolute path from the memoized PATH lookup spares each spawn its own PATH walk
+    cmd = [_which("autoimport") or "autoimport", "--keep-unused-imports", *map(str, paths)]
+    timeout = _remaining_timeout(runner, _AUTOIMPORT_FILE_TIMEOUT * len(paths))
+    runner.logger.info(">>> %s: %s", description, cmd)
+    if timeout <= 0:
+        runner.logger.error("Timeout (%ss) while running: %s", timeout, description)
+        return False
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=runner.config.project_root_str,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
     try:
-        rel_path = str(file_path.relative_to(config.project_root)).replace(os.sep, '/')
-    except Exception:
-        # if we can't relativize, treat as excluded
+        out, err = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        runner.logger.error("Timeout (%ss) while running: %s", timeout, description)
+        return False
+    # Output arrives in one piece after exit; log it as one record per stream
+    if out and not out.isspace() and runner.logger.isEnabledFor(logging.INFO):
+        runner.logger.info(out_fmt, _indent_block(out))
+    if err and not err.isspace() and runner.logger.isEnabledFor(logging.WARNING):
+        runner.logger.warning(err_fmt, _indent_block(err))
+    if proc.returncode == 0:
+        runner.logger.info("✓ %s (code 0)", description)
         return True
-    for pat in config.exclude_patterns:
-        if fnmatch.fnmatch(rel_path, pat):
-            return True
-        if pat.endswith('/*') and rel_path.startswith(pat[:-2] + '/'):
-            return True
+    runner.logger.warning("✖ %s (code %s)", description, proc.returncode)
     return False
 
 
-def gather_py_files(config: WorkflowConfig) -> List[Path]:
-    files = [p for p in config.project_root.rglob('*.py') if not should_exclude(config, p)]
-    files.sort()
-    return files
+async def _autoimport_all(runner: WorkflowRunner, chunks: List[List[Path]], workers: int) -> list:
+    import asyncio
+
+    # A fixed pool of max_workers coroutines pulls chunks from a shared iterator,
+    # so scheduling cost scales with the worker count rather than the chunk count
+    fmts = _line_formats()
+    outcomes: list = [None] * len(chunks)
+    pending = iter(enumerate(chunks))
+
+    async def worker() -> None:
+        for idx, chunk in pending:
+            try:
+                outcomes[idx] = await _autoimport_chunk(runner, chunk, fmts)
+            except Exception as e:
+                outcomes[idx] = e
+
+    await asyncio.gather(*(worker() for _ in range(min(workers, len(chunks)))))
+    return outcomes
 
 
 def run_autoimport_parallel(runner: WorkflowRunner) -> None:
+    import asyncio
+    from itertools import islice
+
     config = runner.config
 
     if not cmd_exists('autoimport'):
@@ -339,31 +652,30 @@ def run_autoimport_parallel(runner: WorkflowRunner) -> None:
         return
 
     py_files = gather_py_files(config)
-    runner.logger.info(f"Processing {len(py_files)} files with {config.max_workers} workers")
+    # Each chunk is a CPU-bound interpreter; more of them than cores only adds context switches
+    workers = min(config.max_workers, _CPU_COUNT)
+    runner.logger.info("Processing %d files with %d workers", len(py_files), workers)
 
     if not py_files:
         runner.logger.info("No files to process")
         return
 
     if config.dry_run:
-        runner.logger.info(f"DRY-RUN: Would process {len(py_files)} files")
+        runner.logger.info("DRY-RUN: Would process %d files", len(py_files))
         return
 
-    success_count = 0
+    # One autoimport process per chunk rather than per file: ~4 chunks per worker
+    # keeps every slot busy while cutting interpreter start-ups from N to ~4*workers
+    # Capped so one slow chunk cannot dominate the tail of the run
+    chunk_size = min(_AUTOIMPORT_MAX_CHUNK, max(1, len(py_files) // (workers * 4)))
+    it = iter(py_files)
+    chunks = list(iter(lambda: list(islice(it, chunk_size)), []))
 
-    def _process(p: Path):
-        result = run_command(runner, f"Autoimport {p.name}", ["autoimport", "--keep-unused-imports", str(p)], cwd=p.parent, timeout=120.0)
-        ok = result["success"]
-        return (p, ok)
-
-    with ThreadPoolExecutor(max_workers=config.max_workers) as ex:
-        futures = {ex.submit(_process, p): p for p in py_files}
-        for fut in as_completed(futures):
-            try:
-                _, ok = fut.result()
-                if ok:
-                    success_count += 1
-            except Exception as e:
-                runner.logger.warning(f"autoimport worker exception: {e}")
+    success_count = 0
+    for chunk, outcome in zip(chunks, asyncio.run(_autoimport_all(runner, chunks, workers))):
+        if isinstance(outcome, BaseException):
+            runner.logger.warning("autoimport worker exception: %s", outcome)
+        elif outcome:
+            success_count += len(chunk)
 
-    runner.logger.info(f"Autoimport complete: {success_count}/{len(py_files)} successful")
+    runner.logger.info("Autoimport complete: %d/%d successful", success_count, len(py_files))
@@ -2,21 +2,21 @@
 
 """Pytest fixtures for routine_workflow."""
 
+import dataclasses
+import functools
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable
 from unittest.mock import Mock, patch
 import pytest
 import shutil
-import glob
-
-import pytest
-from unittest.mock import patch
 
 # Fix for src layout: Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
+from routine_workflow import runner as runner_module, steps
 from routine_workflow.config import WorkflowConfig
 from routine_workflow.runner import WorkflowRunner
 
@@ -47,22 +47,13 @@ def mock_config(temp_project_root: Path) -> Mock:
     
     # Core attrs as real Paths where no mocking needed
     config.project_root = temp_project_root
+    config.project_root_str = str(temp_project_root)
     config.log_dir = temp_project_root / "logs"
     config.log_dir.mkdir(exist_ok=True)
     config.log_file = config.log_dir / f"routine_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
     
-    # Mock lock_dir fully (avoids read-only Path methods)
-    mock_lock_dir = Mock()
-    mock_lock_dir.mkdir = Mock()
-    mock_lock_dir.exists.return_value = False
-    config.lock_dir = mock_lock_dir
-    
-    # Mock pid_path for release_lock
-    mock_pid_path = Mock()
-    mock_pid_path.write_text = Mock()
-    mock_pid_path.read_text.return_value = str(os.getpid())
-    mock_pid_path.exists.return_value = True
-    mock_lock_dir.__truediv__ = lambda self, name: mock_pid_path if name == 'pid' else Mock()
+    # Real path: acquire_lock flocks its sibling "<lock_dir>.flock" under the temp root
+    config.lock_dir = temp_project_root / "routine_workflow.lock"
     
     # Other attrs
     config.fail_on_backup = False
@@ -71,10 +62,26 @@ def mock_config(temp_project_root: Path) -> Mock:
     config.max_workers = min(8, os.cpu_count() or 4)
     config.workflow_timeout = 0
     config.exclude_patterns = []
+    config.overlap = False
 
     return config
 
 
+@pytest.fixture(scope="module")
+def make_config(config_base: WorkflowConfig) -> Callable[..., WorkflowConfig]:
+    """Factory for a real WorkflowConfig; tests pass only the fields they change.
+
+    Variants derive from the ``config_base`` fixture of the requesting module or
+    directory. Configs are frozen, so each distinct set of overrides is built once
+    per module and reused.
+    """
+    @functools.lru_cache(maxsize=None)
+    def _make(**overrides: Any) -> WorkflowConfig:
+        return dataclasses.replace(config_base, **overrides) if overrides else config_base
+
+    return _make
+
+
 @pytest.fixture
 def mock_runner(mock_config: Mock) -> Mock:
     """Mock WorkflowRunner with logger and config."""
@@ -82,10 +89,29 @@ def mock_runner(mock_config: Mock) -> Mock:
     runner.config = mock_config
     runner.logger = Mock()
     runner._lock_acquired = False
-    runner._pid_path = None
+    runner._lock_fd = None
+    runner._steps_overlapping = False
+    runner._deadline = None  # No workflow timeout
     return runner
 
 
+@pytest.fixture(scope="session")
+def step_targets() -> tuple:
+    """Names of the step functions the runner calls, in pipeline order."""
+    return tuple(steps.__all__)
+
+
+@pytest.fixture
+def patch_steps(monkeypatch, step_targets):
+    """Swap every runner step for ``make(name)`` (a plain Mock by default); returns them by name."""
+    def _patch(make=lambda name: Mock()):
+        mocks = {name: make(name) for name in step_targets}
+        for name, mock in mocks.items():
+            monkeypatch.setattr(runner_module, name, mock)
+        return mocks
+    return _patch
+
+
 @pytest.fixture
 def mock_args() -> Mock:
     """Full mocked CLI args."""
@@ -3,8 +3,7 @@
 """Tests for the rich banner and color palette generation."""
 
 import os
-from unittest.mock import patch, MagicMock
-import pytest
+from unittest.mock import patch
 from routine_workflow import banner
 
 def test_lerp():
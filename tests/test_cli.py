@@ -10,12 +10,11 @@ import pytest
 from pathlib import Path
 
 from routine_workflow.cli import (
-    build_parser, main, validate_steps, _has_rich,
+    build_parser, main, validate_steps, _apply_env_defaults, CliArgs,
 )
 from routine_workflow.constants import STEP_NAMES, STEP_ALIASES, PRIMARY_ALIASES
-from routine_workflow.help_renderer import render_rich_help
+from routine_workflow.help_renderer import option_rows, render_rich_help
 from routine_workflow.config import WorkflowConfig
-from routine_workflow.runner import WorkflowRunner
 
 
 @pytest.fixture
@@ -24,24 +23,12 @@ def mock_parser():
     return build_parser()
 
 
-def test_has_rich_no_rich():
-    """Test _has_rich returns False when rich is not installed."""
-    with patch('routine_workflow.cli.importlib.util.find_spec', return_value=None):
-        assert _has_rich() is False
-
-
-def test_has_rich_with_rich():
-    """Test _has_rich returns True when rich is installed."""
-    with patch('routine_workflow.cli.importlib.util.find_spec', return_value=Mock()):
-        assert _has_rich() is True
-
-
-@patch('rich.console.Console')
-@patch('rich.markdown.Markdown')
+@patch('rich.console.Group')
+@patch('rich.syntax.Syntax')
 @patch('rich.panel.Panel')
 @patch('rich.table.Table')
 @patch('rich.text.Text')
-def test_render_rich_help(mock_text, mock_table, mock_panel, mock_markdown, mock_console):
+def test_render_rich_help(mock_text, mock_table, mock_panel, mock_syntax, mock_group):
     mock_parser = Mock()
     mock_parser.format_usage.return_value = 'usage: prog [options]'
     mock_parser.description = 'Test description'
@@ -63,7 +50,7 @@ def test_render_rich_help(mock_text, mock_table, mock_panel, mock_markdown, mock
     # Panels
     mock_panel.assert_has_calls([
         call(mock_text.return_value, title='Usage', border_style='yellow'),
-        call(mock_markdown.return_value, title='[bold green]Quick Starts[/bold green]', border_style='green', expand=False)
+        call(mock_group.return_value, title='[bold green]Quick Starts[/bold green]', border_style='green', expand=False)
     ])
     console.print.assert_any_call(mock_panel.return_value)
 
@@ -84,14 +71,16 @@ def test_render_rich_help(mock_text, mock_table, mock_panel, mock_markdown, mock
         call("Step ID", style="dim", no_wrap=True),
         call("Description", style="white")
     ])
-    for step_id in sorted(STEP_NAMES):
-        alias = PRIMARY_ALIASES.get(step_id, "N/A")
-        steps_table.add_row.assert_any_call(alias, step_id, ANY)
+    assert steps_table.add_row.call_args_list == [
+        call(PRIMARY_ALIASES.get(step_id, "N/A"), step_id, ANY) for step_id in sorted(STEP_NAMES)
+    ]
     console.print.assert_any_call(steps_table)
     # --- END UPDATED ---
 
-    # --- FIXED: Assertion now matches expected markdown generation ---
-    mock_markdown.assert_called_once_with("# Usage Examples\n- ```bash\nroutine-workflow -s git\n```\ncmd2\n")
+    # Examples: commands become bash Syntax blocks, other lines plain Text
+    mock_syntax.assert_called_once_with("routine-workflow -s git", "bash", theme="ansi_dark", word_wrap=True)
+    mock_text.assert_any_call("cmd2")
+    mock_group.assert_called_once_with(mock_text.return_value, mock_syntax.return_value, mock_text.return_value)
 
 def test_render_rich_help_no_description():
     """Test no description skips print."""
@@ -107,14 +96,25 @@ def test_render_rich_help_no_description():
     assert not any('Description' in str(call[0][0]) for call in console.print.call_args_list)
 
 
+def test_option_rows_built_only_for_help():
+    """Test build_parser leaves the help table rows to the -h path."""
+    with patch('routine_workflow.help_renderer.option_rows') as mock_rows:
+        parser = build_parser()
+    mock_rows.assert_not_called()
+
+    rows = option_rows(parser)
+    assert ('-nd --no-dry-run', 'Disable dry-run (perform real execution)') in rows
+    assert all(not flags.startswith('-h') for flags, _ in rows)
+
+
 def test_build_parser_help_texts():
     """Test all arguments have help texts and defaults."""
     parser = build_parser()
     actions = {a.dest: a for a in parser._actions if a.dest != 'help'}
 
     assert 'project_root' in actions
-    assert actions['project_root'].help == 'Project root path'
-    assert actions['project_root'].default == Path(os.getenv('PROJECT_ROOT', os.getcwd()))
+    assert actions['project_root'].help.startswith('Project root path')
+    assert actions['project_root'].default is None  # Resolved after parsing
 
     assert 'dry_run' in actions
     assert actions['dry_run'].default is True
@@ -129,15 +129,36 @@ def test_build_parser_help_texts():
 
 
 def test_build_parser_remainder_arg():
-    """Test --create-dump-run-cmd accepts remainder."""
+    """Test --create-dump-run-cmd accepts trailing plain args."""
     parser = build_parser()
     args = parser.parse_args(['--create-dump-run-cmd', 'cmd1', 'cmd2', 'arg1'])
     assert args.create_dump_run_cmd == ['cmd1', 'cmd2', 'arg1']
 
 
-@patch('routine_workflow.cli._has_rich', return_value=True)
+@patch('routine_workflow.runner.WorkflowRunner')
+@patch('routine_workflow.config.WorkflowConfig.from_args')
+def test_main_create_dump_run_cmd_passthrough(mock_from_args, mock_runner):
+    """Test args after '--' become the create-dump run command, options included."""
+    mock_runner.return_value.run.return_value = 0
+    argv = ['prog', '-nd', '--create-dump-run-cmd', '--', 'create-dump', 'batch', 'run', '--dirs', 'custom', '.']
+    with patch.object(sys, 'argv', argv):
+        assert main() == 0
+
+    args = mock_from_args.call_args.args[0]
+    assert args.create_dump_run_cmd == ['create-dump', 'batch', 'run', '--dirs', 'custom', '.']
+    assert args.dry_run is False
+
+
+def test_main_passthrough_requires_flag():
+    """Test a bare '--' tail without --create-dump-run-cmd is rejected."""
+    with patch.object(sys, 'argv', ['prog', '--', 'create-dump', 'run']):
+        with pytest.raises(SystemExit) as exc:
+            main()
+    assert exc.value.code == 2
+
+
 @patch('rich.console.Console')
-def test_main_help_rich(mock_console, mock_has_rich):
+def test_main_help_rich(mock_console):
     """Test main intercepts -h and uses rich help."""
     mock_console_instance = Mock()
     mock_console.return_value = mock_console_instance
@@ -151,13 +172,13 @@ def test_main_help_rich(mock_console, mock_has_rich):
     mock_render.assert_called_once_with(mock_console_instance, ANY)
 
 
-@patch('routine_workflow.cli._has_rich', return_value=False)
-def test_main_help_fallback(mock_has_rich):
+def test_main_help_fallback():
     """Test main falls back to print_help if no rich."""
     mock_parser = Mock()
     mock_print_help = Mock()
     mock_parser.print_help = mock_print_help
-    with patch('routine_workflow.cli.build_parser', return_value=mock_parser):
+    with patch('routine_workflow.cli.build_parser', return_value=mock_parser), \
+            patch.dict(sys.modules, {'rich.console': None}):
         with patch.object(sys, 'argv', ['prog', '--help']):
             result = main()
 
@@ -165,22 +186,59 @@ def test_main_help_fallback(mock_has_rich):
     mock_print_help.assert_called_once()
 
 
-@patch('routine_workflow.cli.WorkflowRunner')
-@patch('routine_workflow.cli.WorkflowConfig.from_args')
+def test_main_version_short_circuit(capsys):
+    """Test --version prints and returns before building a parser or loading config."""
+    with patch('routine_workflow.config_loader.load_config') as mock_load, \
+            patch('routine_workflow.cli.build_parser') as mock_build, \
+            patch.object(sys, 'argv', ['prog', '--version']):
+        assert main() == 0
+
+    mock_load.assert_not_called()
+    mock_build.assert_not_called()
+    import routine_workflow
+    assert capsys.readouterr().out.strip() == f'routine-workflow {routine_workflow.__version__}'
+
+
+def test_main_help_skips_config_load(capsys):
+    """Test -h returns before touching pyproject.toml."""
+    with patch('routine_workflow.config_loader.load_config') as mock_load, \
+            patch.dict(sys.modules, {'rich.console': None}):
+        with patch.object(sys, 'argv', ['prog', '-h']):
+            result = main()
+
+    assert result == 0
+    mock_load.assert_not_called()
+    assert 'usage:' in capsys.readouterr().out
+
+
+@patch('routine_workflow.runner.WorkflowRunner')
+@patch('routine_workflow.config.WorkflowConfig.from_args')
 def test_main_full_flow(mock_from_args, mock_runner):
     """Test full main: parse → validate → config → run."""
     mock_cfg = Mock(spec=WorkflowConfig)
     mock_from_args.return_value = mock_cfg
     mock_runner.return_value.run.return_value = 0
 
-    # --- UPDATED: Use 'git' alias and invalid 'step99' ---
-    with patch.object(sys, 'argv', ['prog', '-nd', '-s', 'git', 'step99']):
+    # --- UPDATED: Use 'git' alias and canonical 'step1' ---
+    with patch.object(sys, 'argv', ['prog', '-nd', '-s', 'git', 'step1']):
         result = main()
 
     assert result == 0
     mock_from_args.assert_called_once()
-    # --- UPDATED: Asserts translation and filtering ---
-    mock_runner.assert_called_once_with(mock_cfg, steps=['step6'])  # 'git' -> 'step6'
+    # --- UPDATED: Asserts translation ---
+    mock_runner.assert_called_once_with(mock_cfg, steps=['step6', 'step1'])  # 'git' -> 'step6'
+
+
+def test_main_rejects_unknown_step(capsys):
+    """Test unknown step names fail at parse time via argparse choices."""
+    with patch.object(sys, 'argv', ['prog', '-s', 'git', 'step99']):
+        with pytest.raises(SystemExit) as exc:
+            main()
+    assert exc.value.code == 2
+    err = capsys.readouterr().err
+    assert "invalid choice: 'step99'" in err
+    listed = err.split("(choose from ", 1)[1].rsplit(")", 1)[0].replace("'", "").split(", ")
+    assert listed == sorted(listed)
 
 
 def test_validate_steps_invalid_all(capsys):
@@ -247,6 +305,27 @@ def test_validate_steps_normalization(capsys):
     captured = capsys.readouterr()
     assert 'Warning' not in captured.err
 
+def test_validate_steps_accepts_any_abstract_set():
+    """Test a non-builtin collections.abc.Set works for available_steps (no issuperset())."""
+    from collections.abc import Set
+
+    class StepSet(Set):
+        def __init__(self, items):
+            self._items = frozenset(items)
+
+        def __contains__(self, item):
+            return item in self._items
+
+        def __iter__(self):
+            return iter(self._items)
+
+        def __len__(self):
+            return len(self._items)
+
+    available = StepSet(STEP_NAMES)
+    assert validate_steps(['step1', 'step3'], available, STEP_ALIASES) == ['step1', 'step3']
+    assert validate_steps(['git'], available, STEP_ALIASES) == ['step6']
+
 # --- END NEW TESTS ---
 
 
@@ -267,7 +346,7 @@ class TestArgParsing:
 
     @pytest.mark.parametrize('steps_str, expected_steps', [
         ('step1 step2', ['step1', 'step2']),
-        ('step99', ['step99']),
+        ('step2_5', ['step2_5']),  # Underscored canonical ids are accepted
         ('git backup', ['git', 'backup']), # Tests aliases are parsed
     ])
     def test_steps_parsing(self, steps_str, expected_steps, tmp_path):
@@ -284,12 +363,12 @@ class TestArgParsing:
         """Test env vars override hardcoded defaults."""
         if env_value is not None:
             monkeypatch.setenv('PROJECT_ROOT', env_value)
-        parser_args = build_parser().parse_args([])
+        parser_args = _apply_env_defaults(build_parser().parse_args([]))
         assert parser_args.project_root == expected_default
 
 
-@patch('routine_workflow.cli.WorkflowRunner')
-@patch('routine_workflow.cli.WorkflowConfig.from_args')
+@patch('routine_workflow.runner.WorkflowRunner')
+@patch('routine_workflow.config.WorkflowConfig.from_args')
 def test_main_no_banner_nd(mock_from_args, mock_runner):
     """Test no banner when dry_run=False."""
     mock_cfg = Mock(spec=WorkflowConfig)
@@ -302,13 +381,31 @@ def test_main_no_banner_nd(mock_from_args, mock_runner):
     assert result == 0
 
 
+def test_cli_import_defers_runner():
+    """Test importing the CLI does not pull in the runner graph or banner."""
+    import subprocess
+
+    src = Path(__file__).parent.parent / "src"
+    code = (
+        "import sys, routine_workflow.cli; "
+        "print(any(m in sys.modules for m in "
+        "('routine_workflow.runner', 'routine_workflow.banner', 'routine_workflow.config')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": str(src)},
+    )
+    assert result.stdout.strip() == "False"
+
+
 def test_main_sys_exit_guard():
     """Test __name__ guard prevents direct run in import."""
     import routine_workflow.cli  # No raise
 
 
-@patch("routine_workflow.cli.WorkflowRunner")
-@patch("routine_workflow.cli.WorkflowConfig.from_args")
+@patch("routine_workflow.runner.WorkflowRunner")
+@patch("routine_workflow.config.WorkflowConfig.from_args")
 def test_main(mock_from_args: Mock, mock_runner: Mock):
     """Test main orchestrates config + runner."""
     mock_cfg = Mock(spec=WorkflowConfig)
@@ -324,8 +421,8 @@ def test_main(mock_from_args: Mock, mock_runner: Mock):
     mock_runner.return_value.run.assert_called_once()
 
 
-@patch("routine_workflow.cli.WorkflowRunner")
-@patch("routine_workflow.cli.WorkflowConfig.from_args")
+@patch("routine_workflow.runner.WorkflowRunner")
+@patch("routine_workflow.config.WorkflowConfig.from_args")
 def test_main_steps(mock_from_args: Mock, mock_runner: Mock):
     """Test main passes steps to runner."""
     mock_cfg = Mock(spec=WorkflowConfig)
@@ -344,9 +441,9 @@ def test_main_steps(mock_from_args: Mock, mock_runner: Mock):
 def test_main_dry_run_banner(capsys):
     """Test dry-run banner prints on default invocation."""
     with patch.object(sys, "argv", ["prog"]):
-        with patch("routine_workflow.cli.WorkflowRunner") as mock_runner:
+        with patch("routine_workflow.runner.WorkflowRunner") as mock_runner:
             mock_runner.return_value.run.return_value = 0
-            with patch("routine_workflow.cli.WorkflowConfig.from_args") as mock_cfg:
+            with patch("routine_workflow.config.WorkflowConfig.from_args") as mock_cfg:
                 mock_cfg.return_value = Mock(spec=WorkflowConfig)
                 main()
 
@@ -354,6 +451,29 @@ def test_main_dry_run_banner(capsys):
     assert "🛡️  Safety mode: Dry-run enabled" in captured.out
 
 
+@pytest.mark.parametrize('isatty, no_banner, expected', [
+    (True, None, True),
+    (True, '1', False),
+    (False, None, False),
+])
+@patch('routine_workflow.runner.WorkflowRunner')
+@patch('routine_workflow.config.WorkflowConfig.from_args')
+def test_main_banner_only_on_tty(mock_from_args, mock_runner, isatty, no_banner, expected, monkeypatch):
+    """Test the logo is skipped for piped output and NO_BANNER=1."""
+    mock_runner.return_value.run.return_value = 0
+    if no_banner is None:
+        monkeypatch.delenv('NO_BANNER', raising=False)
+    else:
+        monkeypatch.setenv('NO_BANNER', no_banner)
+
+    with patch('routine_workflow.banner.print_logo') as mock_logo, \
+            patch.object(sys, 'stdout', Mock(isatty=Mock(return_value=isatty))), \
+            patch.object(sys, 'argv', ['prog']):
+        assert main() == 0
+
+    assert mock_logo.called is expected
+
+
 def test_validate_steps_invalid(capsys):
     """Test validate_steps warns on invalids and exits if all invalid."""
     invalid_steps = ["step99"]
@@ -390,16 +510,51 @@ def test_parse_arguments_defaults():
     """Test arg parsing with defaults."""
     with patch.object(sys, "argv", ["prog"]):
         parser = build_parser()
-        args = parser.parse_args([])
+        args = _apply_env_defaults(parser.parse_args([]))
 
     assert args.dry_run is True
     assert args.project_root == Path.cwd()
+    assert args.lock_ttl == int(os.getenv('LOCK_TTL', '3600'))
     assert args.steps is None
     assert args.workers == min(8, os.cpu_count() or 4)
     assert args.enable_security is False
     assert args.enable_dep_audit is False
 
 
+def test_apply_env_defaults_keeps_explicit_values(monkeypatch):
+    """Test env fallbacks only fill options left unset on the command line."""
+    monkeypatch.setenv('LOCK_TTL', '10')
+    monkeypatch.setenv('WORKFLOW_TIMEOUT', '99')
+    args = _apply_env_defaults(build_parser().parse_args(['--lock-ttl', '5', '-l', '/x/logs']))
+
+    assert args.lock_ttl == 5
+    assert args.log_dir == Path('/x/logs')
+    assert args.workflow_timeout == 99
+
+
+def test_cli_args_slots_cover_parser_dests():
+    """Test CliArgs declares exactly the parser's destinations."""
+    dests = {a.dest for a in build_parser()._actions if a.dest not in ('help', 'version')}
+    assert set(CliArgs.__slots__) == dests
+
+    args = CliArgs.from_namespace(_apply_env_defaults(build_parser().parse_args(['-nd'])))
+    assert args.dry_run is False
+    assert not hasattr(args, '__dict__')
+
+
+@patch('routine_workflow.runner.WorkflowRunner')
+@patch('routine_workflow.config.WorkflowConfig.from_args')
+def test_main_passes_cli_args(mock_from_args, mock_runner):
+    """Test main hands a CliArgs instance to WorkflowConfig.from_args."""
+    mock_runner.return_value.run.return_value = 0
+    with patch.object(sys, 'argv', ['prog', '-s', 'git']):
+        assert main() == 0
+
+    args = mock_from_args.call_args.args[0]
+    assert isinstance(args, CliArgs)
+    assert args.steps == ['step6']
+
+
 def test_parse_arguments_custom():
     """Test custom args."""
     # --- UPDATED: Use 'git' alias in test ---
@@ -431,4 +586,39 @@ def test_parse_arguments_shortcuts():
 
     assert args.project_root == Path("/custom/root")
     assert args.log_dir == Path("/custom/logs")
-    assert args.workflow_timeout == 1800
\ No newline at end of file
+    assert args.workflow_timeout == 1800
+
+def test_validate_steps_underscored_canonical(capsys):
+    """Test underscored canonical ids resolve to their dotted form."""
+    result = validate_steps(['step2_5', 'step6_5'], STEP_NAMES, STEP_ALIASES)
+    assert result == ['step2.5', 'step6.5']
+    assert 'Warning' not in capsys.readouterr().err
+
+
+def test_validate_steps_custom_aliases():
+    """Test non-default step/alias tables are honoured."""
+    result = validate_steps(['x', 'stepA'], {'stepA'}, {'x': 'stepA'})
+    assert result == ['stepA', 'stepA']
+
+
+def test_step_names_immutable():
+    """Test canonical step names are a frozenset."""
+    assert isinstance(STEP_NAMES, frozenset)
+
+
+def test_validate_steps_all_canonical_fast_path(capsys):
+    """Test an all-canonical list (repeats included) is returned unchanged."""
+    steps = sorted(STEP_NAMES) + ['step1']
+    with patch('routine_workflow.cli._build_resolver') as mock_build:
+        result = validate_steps(steps, set(STEP_NAMES), STEP_ALIASES)
+    assert result == steps
+    mock_build.assert_not_called()
+    assert 'Warning' not in capsys.readouterr().err
+
+
+def test_validate_steps_single_alias(capsys):
+    """Test a single alias resolves directly; a single invalid token still exits."""
+    assert validate_steps(['dumps'], STEP_NAMES, STEP_ALIASES) == ['step5']
+    with pytest.raises(SystemExit):
+        validate_steps(['nope'], STEP_NAMES, STEP_ALIASES)
+    assert 'Skipping invalid steps: nope' in capsys.readouterr().err
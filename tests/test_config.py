@@ -2,7 +2,7 @@
 
 """Unit tests for config.py."""
 
-from datetime import datetime
+import os
 from pathlib import Path
 import pytest
 from unittest.mock import patch, Mock
@@ -15,10 +15,10 @@ from routine_workflow.defaults import default_exclude_patterns
 
 
 @patch('routine_workflow.config.default_exclude_patterns')
-@patch('routine_workflow.config.os.cpu_count', return_value=4)  # Mock for consistent default
+@patch('routine_workflow.config._CPU_DEFAULT_WORKERS', 4)  # Consistent default
 @patch.object(Path, 'mkdir')  # Avoid real FS in from_args
 @patch('pathlib.Path.resolve')  # Mock resolve for controlled return
-def test_from_args_with_defaults(mock_resolve, mock_mkdir: Mock, mock_cpu: Mock, mock_defaults: Mock, mock_args: Mock):
+def test_from_args_with_defaults(mock_resolve, mock_mkdir: Mock, mock_defaults: Mock, mock_args: Mock):
     """Test config creation from args (triggers defaults)."""
     # Setup required mock attrs
     mock_args.project_root = Path('/tmp/test')
@@ -44,11 +44,11 @@ def test_from_args_with_defaults(mock_resolve, mock_mkdir: Mock, mock_cpu: Mock,
 
     assert cfg.project_root == mock_resolve.return_value
     assert cfg.dry_run is True
-    assert cfg.max_workers == 4  # min(8, mocked=4)
+    assert cfg.max_workers == 4  # module default, patched
     assert cfg.workflow_timeout == 0
     assert cfg.exclude_patterns == ['default/*']
-    assert cfg.create_dump_run_cmd == ['create-dump', 'batch', 'run', '--dirs', '., packages, packages/platform_core, packages/telethon_adapter_kit, services, services/forwarder_bot']
-    assert cfg.create_dump_clean_cmd == ['create-dump', 'batch', 'clean']
+    assert cfg.create_dump_run_cmd == ('create-dump', 'batch', 'run', '--dirs', '., packages, packages/platform_core, packages/telethon_adapter_kit, services, services/forwarder_bot')
+    assert cfg.create_dump_clean_cmd == ('create-dump', 'batch', 'clean')
     mock_defaults.assert_called_once()
     mock_mkdir.assert_called_once_with(parents=True, exist_ok=True)
     mock_resolve.assert_called_once()  # No args; instance call implicit
@@ -88,7 +88,7 @@ def test_from_args_with_override(mock_resolve, mock_mkdir: Mock, mock_defaults:
     assert cfg.max_workers == 6
     assert cfg.workflow_timeout == 3600
     assert cfg.exclude_patterns == ['override/*']
-    assert cfg.create_dump_run_cmd == mock_args.create_dump_run_cmd
+    assert cfg.create_dump_run_cmd == tuple(mock_args.create_dump_run_cmd)
     mock_defaults.assert_not_called()
     mock_resolve.assert_called_once()  # No args; instance call implicit
 
@@ -113,21 +113,46 @@ def test_frozen_dataclass():
         real_cfg.dry_run = True  # Immutable check
 
 
-@patch('routine_workflow.config.os.cpu_count', return_value=8)
-def test_max_workers_default(mock_cpu: Mock):
-    """Test default workers computation."""
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need 3.10+")
+def test_config_uses_slots():
+    """Instances carry no __dict__ when slots are available."""
     cfg = WorkflowConfig(
         project_root=Path("."),
         log_dir=Path("."),
         log_file=Path("."),
         lock_dir=Path("."),
     )
-    assert cfg.max_workers == 8  # min(8, 8)
+    assert not hasattr(cfg, '__dict__')
+    assert 'dry_run' in WorkflowConfig.__slots__
 
 
-@patch('routine_workflow.config.os.cpu_count', return_value=2)
+def test_project_root_str_derived():
+    """project_root_str tracks project_root, including through dataclasses.replace."""
+    import dataclasses
+    cfg = WorkflowConfig(
+        project_root=Path("/tmp/a"),
+        log_dir=Path("."),
+        log_file=Path("."),
+        lock_dir=Path("."),
+    )
+    assert cfg.project_root_str == str(Path("/tmp/a"))
+    assert dataclasses.replace(cfg, project_root=Path("/tmp/b")).project_root_str == str(Path("/tmp/b"))
+
+
+def test_max_workers_default():
+    """Test default workers computed once at import."""
+    cfg = WorkflowConfig(
+        project_root=Path("."),
+        log_dir=Path("."),
+        log_file=Path("."),
+        lock_dir=Path("."),
+    )
+    assert cfg.max_workers == min(8, os.cpu_count() or 4)
+
+
+@patch('routine_workflow.config._CPU_DEFAULT_WORKERS', 8)
 @patch('pathlib.Path.resolve')
-def test_max_workers_override(mock_resolve, mock_cpu: Mock, mock_args: Mock):
+def test_max_workers_override(mock_resolve, mock_args: Mock):
     """Test workers from args."""
     # Setup minimal mocks
     mock_args.project_root = Path('.')
@@ -1,7 +1,7 @@
 
 import sys
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 # Try importing tomli/tomllib depending on python version
 if sys.version_info >= (3, 11):
@@ -48,3 +48,22 @@ def test_load_config_normalization(tmp_path):
     assert config["another_setting_complex"] == 123
     assert config["normal_setting"] is True
     assert "some-setting" not in config
+
+def test_load_config_cached_until_file_changes(tmp_path):
+    """Test repeated loads reuse the parse until pyproject.toml is modified."""
+    import os
+
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[tool.routine-workflow]\nworkers = 2\n', encoding="utf-8")
+
+    with patch("routine_workflow.config_loader.tomllib.load", wraps=tomllib.load) as mock_load:
+        first = load_config(tmp_path)
+        first["workers"] = 99  # Mutating the result must not poison the cache
+        assert load_config(tmp_path) == {"workers": 2}
+        assert mock_load.call_count == 1
+
+        pyproject.write_text('[tool.routine-workflow]\nworkers = 3\n', encoding="utf-8")
+        st = pyproject.stat()
+        os.utime(pyproject, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert load_config(tmp_path) == {"workers": 3}
+        assert mock_load.call_count == 2
@@ -1,5 +1,4 @@
 
-import pytest
 from routine_workflow.errors import (
     WorkflowError,
     CommandNotFoundError,
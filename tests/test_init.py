@@ -3,9 +3,9 @@
 """Tests for __init__.py (version fetching and exports)."""
 
 import importlib
+import subprocess
 import sys
-from unittest.mock import patch, Mock
-import pytest
+from unittest.mock import patch
 
 sys.path.insert(0, 'src')  # Ensure import
 import routine_workflow  # Initial load to define module
@@ -22,7 +22,7 @@ def test_version_installed():
 @patch('subprocess.run')  # Global patch for local import
 def test_version_git_fallback(mock_run):
     """Test __version__ from git describe in dev env."""
-    mock_run.return_value = Mock(returncode=0, stdout="v6.4.4\n")  # str for text=True match
+    mock_run.return_value = subprocess.CompletedProcess([], 0, stdout="v6.4.4\n")  # str for text=True match
     with patch.dict(sys.modules, {'importlib.metadata': None}):  # Force ImportError on metadata import
         importlib.reload(routine_workflow)  # Re-execute to hit fallback
     assert routine_workflow.__version__ == "v6.4.4"  # strip() removes \n
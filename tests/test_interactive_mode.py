@@ -1,8 +1,7 @@
 import argparse
-import sys
 import pytest
 from unittest.mock import patch
-from routine_workflow.prompt_service import run_interactive_mode, prompt_steps
+from routine_workflow.prompt_service import run_interactive_mode
 
 def test_interactive_mode_all_steps_real_run():
     args = argparse.Namespace()
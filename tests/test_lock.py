@@ -3,203 +3,175 @@
 """Tests for locking mechanisms."""
 
 import os
-from unittest.mock import patch, Mock, MagicMock, ANY
+import subprocess
+from unittest.mock import patch, Mock
 import pytest
 import sys
 sys.path.insert(0, 'src')  # Ensure import
 
-from routine_workflow.lock import acquire_lock, release_lock, lock_context, cleanup_and_exit
+from routine_workflow.lock import (
+    _try_lock, _unlock, acquire_lock, cleanup_and_exit, lock_context, lock_file_path, release_lock,
+)
 from routine_workflow.config import WorkflowConfig
 from pathlib import Path
 
 
 @pytest.fixture
-def mock_runner():
-    """Mock runner with config and logger."""
+def mock_runner(tmp_path: Path):
+    """Mock runner with config and logger; lock path lives under tmp_path."""
     runner = Mock()
     runner.logger = Mock()
     config = Mock(spec=WorkflowConfig)
+    config.lock_dir = tmp_path / "routine_workflow.lock"
     config.lock_ttl = 3600  # Default
     runner.config = config
     runner._lock_acquired = False
-    runner._pid_path = None
+    runner._lock_fd = None
+    runner._steps_overlapping = False
     return runner
 
 
-@pytest.fixture
-def mock_lock_dir():
-    """Mocked lock_dir Path with sub-path mocks for pid/timestamp."""
-    lock_dir = Mock(spec=Path)
-    lock_dir.__str__ = Mock(return_value="/tmp/mock_lock")  # Override dunder as new Mock
-    pid_path = Mock(spec=Path)
-    ts_path = Mock(spec=Path)
-    def truediv(self, other):
-        if other == 'pid':
-            return pid_path
-        elif other == 'timestamp':
-            return ts_path
-        raise ValueError(f"Unexpected subpath: {other}")
-    lock_dir.__truediv__ = truediv
-    lock_dir.mkdir = Mock()
-    lock_dir.exists.return_value = False  # Default for fresh
-    return lock_dir, pid_path, ts_path
-
-
-@patch('routine_workflow.lock.shutil.rmtree')
-@patch('routine_workflow.lock.os.getpid', return_value=1234)
-@patch('routine_workflow.lock.time.time', return_value=1720000000.0)
-def test_acquire_lock_success(mock_time, mock_pid, mock_rmtree, mock_lock_dir, mock_runner):
-    """Test lock acquire creates dir/pid/timestamp."""
-    lock_dir, pid_path, ts_path = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    mock_runner.config.lock_ttl = 3600
+def _make_runner(config):
+    runner = Mock()
+    runner.logger = Mock()
+    runner.config = config
+    runner._lock_acquired = False
+    runner._lock_fd = None
+    runner._steps_overlapping = False
+    return runner
+
+
+def test_acquire_lock_success(mock_runner):
+    """Test lock acquire opens the lock file, flocks it and records the PID."""
+    lock_path = lock_file_path(mock_runner.config.lock_dir)
 
     acquire_lock(mock_runner)
+    try:
+        assert mock_runner._lock_acquired is True
+        assert isinstance(mock_runner._lock_fd, int)
+        assert lock_path.read_text() == str(os.getpid())
+        mock_runner.logger.info.assert_called_once_with(f"Lock acquired: {lock_path} (PID {os.getpid()})")
+    finally:
+        release_lock(mock_runner)
 
-    lock_dir.mkdir.assert_called_once_with(parents=True, exist_ok=False)
-    pid_path.write_text.assert_called_once_with('1234')
-    ts_path.write_text.assert_called_once_with('1720000000.0')
-    assert mock_runner._lock_acquired is True
-    mock_runner.logger.info.assert_called_once_with("Lock acquired: /tmp/mock_lock (PID 1234)")
 
+def test_acquire_lock_overwrites_longer_pid(mock_runner):
+    """A leftover longer PID from a previous holder is fully replaced."""
+    lock_path = lock_file_path(mock_runner.config.lock_dir)
+    lock_path.write_text("9" * 20)
 
-@patch('routine_workflow.lock.shutil.rmtree')
-@patch('routine_workflow.lock.os.getpid', return_value=1234)
-@patch('routine_workflow.lock.time.time', return_value=1720000000.0)
-def test_acquire_lock_ttl_disabled(mock_time, mock_pid, mock_rmtree, mock_lock_dir, mock_runner):
-    """Test no eviction if lock_ttl=0; fail on exists."""
-    lock_dir, _, _ = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    lock_dir.mkdir.side_effect = FileExistsError("Exists")
-    mock_runner.config.lock_ttl = 0
+    acquire_lock(mock_runner)
+    try:
+        assert lock_path.read_text() == str(os.getpid())
+    finally:
+        release_lock(mock_runner)
 
-    with pytest.raises(SystemExit) as exc:
-        acquire_lock(mock_runner)
 
-    assert exc.value.code == 3
-    mock_rmtree.assert_not_called()
-    mock_runner.logger.error.assert_called_once_with("Lock exists: /tmp/mock_lock — concurrent run detected")
-
-
-@patch('routine_workflow.lock.shutil.rmtree')
-@patch('routine_workflow.lock.os.getpid', return_value=1234)
-@patch('routine_workflow.lock.time.time', return_value=1720000000.0)
-def test_acquire_lock_eviction_by_ttl(mock_time, mock_pid, mock_rmtree, mock_lock_dir, mock_runner):
-    """Test eviction if timestamp > TTL; then retry acquire."""
-    lock_dir, pid_path, ts_path = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    lock_dir.exists.return_value = True
-    ts_path.exists.return_value = True
-    ts_path.read_text.return_value = str(mock_time.return_value - 7200)  # 2h old > 1h TTL
-    lock_dir.mkdir.side_effect = [FileExistsError("Stale"), None]  # First fails, retry succeeds
-    mock_runner.config.lock_ttl = 3600
+def test_acquire_lock_beside_legacy_lock_dir(mock_runner):
+    """A leftover mkdir-style lock directory at lock_dir does not block the flock file."""
+    legacy = mock_runner.config.lock_dir
+    legacy.mkdir()
 
     acquire_lock(mock_runner)
+    try:
+        assert mock_runner._lock_acquired is True
+        assert lock_file_path(legacy) != legacy
+        assert legacy.is_dir()
+    finally:
+        release_lock(mock_runner)
 
-    mock_rmtree.assert_called_once_with(lock_dir)
-    mock_runner.logger.info.assert_any_call("Evicted stale lock by TTL (3600s): /tmp/mock_lock")
-    assert lock_dir.mkdir.call_count == 2
-    pid_path.write_text.assert_called_once_with('1234')
-    ts_path.write_text.assert_called_once_with('1720000000.0')
-    mock_runner.logger.info.assert_called_with("Lock acquired post-eviction: /tmp/mock_lock (PID 1234)")
-
-
-@patch('routine_workflow.lock.shutil.rmtree')
-@patch('routine_workflow.lock.os.getpid', return_value=1234)
-@patch('routine_workflow.lock.time.time', return_value=1720000000.0)
-def test_acquire_lock_no_eviction_live_pid(mock_time, mock_pid, mock_rmtree, mock_lock_dir, mock_runner):
-    """Test no eviction if PID alive (os.kill succeeds); fail acquire."""
-    lock_dir, pid_path, ts_path = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    lock_dir.exists.return_value = True
-    ts_path.exists.return_value = True
-    ts_path.read_text.return_value = str(mock_time.return_value - 1800)  # Fresh < TTL
-    pid_path.exists.return_value = True
-    lock_dir.mkdir.side_effect = FileExistsError("Active")
-    mock_runner.config.lock_ttl = 3600
-    with patch('routine_workflow.lock.os.kill', return_value=None):  # Alive
 
-        with pytest.raises(SystemExit) as exc:
-            acquire_lock(mock_runner)
-
-    assert exc.value.code == 3
-    mock_rmtree.assert_not_called()
-    mock_runner.logger.error.assert_called_once_with("Lock exists: /tmp/mock_lock — concurrent run detected")
-
-
-@patch('routine_workflow.lock.shutil.rmtree')
-@patch('routine_workflow.lock.os.getpid', return_value=1234)
-@patch('routine_workflow.lock.time.time', return_value=1720000000.0)
-def test_acquire_lock_eviction_no_timestamp(mock_time, mock_pid, mock_rmtree, mock_lock_dir, mock_runner):
-    """Test eviction if no timestamp file; then retry."""
-    lock_dir, pid_path, ts_path = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    lock_dir.exists.return_value = True
-    ts_path.exists.return_value = False  # No TS
-    lock_dir.mkdir.side_effect = [FileExistsError("No TS"), None]
-    mock_runner.config.lock_ttl = 3600
+def test_acquire_lock_creates_missing_parent(mock_runner, tmp_path):
+    """A --lock-dir under a parent that does not exist yet still locks."""
+    mock_runner.config.lock_dir = tmp_path / "missing" / "deeper" / "rw.lock"
 
     acquire_lock(mock_runner)
+    try:
+        assert mock_runner._lock_acquired is True
+        assert lock_file_path(mock_runner.config.lock_dir).read_text() == str(os.getpid())
+    finally:
+        release_lock(mock_runner)
 
-    mock_rmtree.assert_called_once_with(lock_dir)
-    mock_runner.logger.info.assert_any_call("Evicted stale lock (no timestamp): /tmp/mock_lock")
-    assert lock_dir.mkdir.call_count == 2
-
-
-@patch('routine_workflow.lock.shutil.rmtree')
-@patch('routine_workflow.lock.os.getpid', return_value=1234)
-@patch('routine_workflow.lock.time.time', return_value=1720000000.0)
-def test_acquire_lock_eviction_no_pid(mock_time, mock_pid, mock_rmtree, mock_lock_dir, mock_runner):
-    """Test eviction if no PID file; then retry."""
-    lock_dir, pid_path, ts_path = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    lock_dir.exists.return_value = True
-    ts_path.exists.return_value = True  # Assume TS exists for this path
-    ts_path.read_text.return_value = str(mock_time.return_value - 1800)  # Fresh
-    pid_path.exists.return_value = False  # No PID
-    lock_dir.mkdir.side_effect = [FileExistsError("No PID"), None]
-    mock_runner.config.lock_ttl = 3600
 
+def test_acquire_lock_contended(mock_runner):
+    """Test a second acquire on a held lock exits with code 3."""
+    other = _make_runner(mock_runner.config)
     acquire_lock(mock_runner)
+    try:
+        with pytest.raises(SystemExit) as exc:
+            acquire_lock(other)
+        assert exc.value.code == 3
+        assert other._lock_acquired is False
+        other.logger.error.assert_called_once_with(
+            f"Lock exists: {lock_file_path(mock_runner.config.lock_dir)} — concurrent run detected"
+        )
+    finally:
+        release_lock(mock_runner)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="flock semantics")
+def test_acquire_lock_held_by_other_process(mock_runner):
+    """Test a lock held by another live process is honoured."""
+    lock_path = lock_file_path(mock_runner.config.lock_dir)
+    script = (
+        "import fcntl, os, sys, time\n"
+        f"fd = os.open({str(lock_path)!r}, os.O_CREAT | os.O_RDWR)\n"
+        "fcntl.flock(fd, fcntl.LOCK_EX)\n"
+        "print('locked', flush=True)\n"
+        "sys.stdin.read()\n"
+    )
+    proc = subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert proc.stdout.readline().strip() == 'locked'
+        with pytest.raises(SystemExit) as exc:
+            acquire_lock(mock_runner)
+        assert exc.value.code == 3
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=10)
 
-    mock_rmtree.assert_called_once_with(lock_dir)
-    mock_runner.logger.info.assert_any_call("Evicted stale lock (no PID): /tmp/mock_lock")
-    assert lock_dir.mkdir.call_count == 2
+    # Holder exited: the kernel dropped its lock, no eviction needed
+    acquire_lock(mock_runner)
+    release_lock(mock_runner)
 
 
-@patch('routine_workflow.lock.shutil.rmtree')
-def test_release_lock_success(mock_rmtree, mock_lock_dir, mock_runner):
-    """Test release removes lock dir."""
-    lock_dir, pid_path, _ = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    mock_runner._lock_acquired = True
-    pid_path.read_text.return_value = str(os.getpid())
-    pid_path.exists.return_value = True
-    mock_runner._pid_path = pid_path
-    lock_dir.exists.return_value = True
+def test_release_then_reacquire(mock_runner):
+    """Test release unlocks and closes the fd so the lock can be taken again."""
+    acquire_lock(mock_runner)
+    fd = mock_runner._lock_fd
 
     release_lock(mock_runner)
 
-    pid_path.read_text.assert_called_once()
-    mock_rmtree.assert_called_once_with(lock_dir)
     assert mock_runner._lock_acquired is False
-    mock_runner.logger.info.assert_called_once_with("Lock directory removed")
+    assert mock_runner._lock_fd is None
+    mock_runner.logger.info.assert_called_with("Lock released")
+    with pytest.raises(OSError):
+        os.fstat(fd)
 
+    other = _make_runner(mock_runner.config)
+    acquire_lock(other)
+    assert other._lock_acquired is True
+    release_lock(other)
 
-@patch('routine_workflow.lock.shutil.rmtree')
-def test_release_lock_stale_pid(mock_rmtree, mock_lock_dir, mock_runner):
-    """Test leaves stale lock (different PID)."""
-    lock_dir, pid_path, _ = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    mock_runner._lock_acquired = True
-    pid_path.read_text.return_value = '9999'  # Different PID
-    pid_path.exists.return_value = True
-    mock_runner._pid_path = pid_path
 
-    release_lock(mock_runner)
+def test_release_lock_not_acquired(mock_runner):
+    """Test release is a no-op when nothing was acquired."""
+    with patch('routine_workflow.lock._unlock') as mock_unlock:
+        release_lock(mock_runner)
+
+    mock_unlock.assert_not_called()
+
 
-    mock_rmtree.assert_not_called()
-    mock_runner.logger.warning.assert_called_once_with("Lock owned by different PID — leaving it in place")
+def test_release_lock_unlock_error(mock_runner):
+    """Test unlock failures are logged and state is still reset."""
+    acquire_lock(mock_runner)
+
+    with patch('routine_workflow.lock._unlock', side_effect=OSError("boom")):
+        release_lock(mock_runner)
+
+    mock_runner.logger.warning.assert_called_once_with("Error while releasing lock: boom")
+    assert mock_runner._lock_acquired is False
+    assert mock_runner._lock_fd is None
 
 
 def test_lock_context(mock_runner):
@@ -214,6 +186,16 @@ def test_lock_context(mock_runner):
     mock_release.assert_called_once_with(mock_runner)
 
 
+def test_cleanup_and_exit_leaves_lock_while_steps_overlap(mock_runner):
+    """A step exiting mid-overlap must not free the lock under its sibling."""
+    mock_runner._steps_overlapping = True
+    with patch('routine_workflow.lock.release_lock') as mock_release:
+        with pytest.raises(SystemExit):
+            cleanup_and_exit(mock_runner, 1)
+
+    mock_release.assert_not_called()
+
+
 def test_cleanup_and_exit(mock_runner):
     """Test cleanup calls release."""
     with patch('routine_workflow.lock.release_lock') as mock_release:
@@ -226,77 +208,63 @@ def test_cleanup_and_exit(mock_runner):
     mock_release.assert_called_once_with(mock_runner)
 
 
-@patch('routine_workflow.lock.shutil.rmtree')
-def test_release_lock_no_pid_best_effort(mock_rmtree, mock_lock_dir, mock_runner):
-    """Test best-effort removal if no PID file."""
-    lock_dir, pid_path, _ = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    mock_runner._lock_acquired = True
-    pid_path.exists.return_value = False
-    mock_runner._pid_path = pid_path
-    lock_dir.exists.return_value = True
-
-    release_lock(mock_runner)
-
-    mock_rmtree.assert_called_once_with(lock_dir)
-    mock_runner.logger.info.assert_called_once_with("Stale lock dir removed")
+def test_acquire_lock_exception(mock_runner):
+    """Test general exception in acquire_lock."""
+    with patch('routine_workflow.lock.os.open', side_effect=PermissionError("denied")):
+        with pytest.raises(SystemExit) as exc:
+            acquire_lock(mock_runner)
 
+    assert exc.value.code == 3
+    mock_runner.logger.exception.assert_called_once_with('Failed to acquire lock: denied')
+    assert mock_runner._lock_acquired is False
 
-@patch('routine_workflow.lock.shutil.rmtree')
-def test_acquire_lock_exception(mock_rmtree, mock_lock_dir, mock_runner):
-    """Test general exception in acquire_lock."""
-    lock_dir, _, _ = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    lock_dir.mkdir.side_effect = Exception("IOError")
 
-    with patch.object(mock_runner.logger, 'exception') as mock_exc:
+def test_acquire_lock_exception_after_open_closes_fd(mock_runner):
+    """Test a non-contention failure once the file is open closes the descriptor."""
+    with patch('routine_workflow.lock._try_lock', side_effect=OSError("no locks")), \
+            patch('routine_workflow.lock.os.close', wraps=os.close) as mock_close:
         with pytest.raises(SystemExit) as exc:
             acquire_lock(mock_runner)
 
     assert exc.value.code == 3
-    mock_exc.assert_called_once_with('Failed to acquire lock: IOError')
-    
-    
-@patch('routine_workflow.lock.shutil.rmtree')
-@patch('routine_workflow.lock.os.getpid', return_value=1234)
-def test_acquire_lock_eviction_error(mock_pid, mock_rmtree, mock_lock_dir, mock_runner):
-    """Test warn on eviction error; fail acquire."""
-    lock_dir, pid_path, ts_path = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    lock_dir.exists.return_value = True
-    ts_path.exists.return_value = True
-    ts_path.read_text.return_value = str(1720000000.0 - 1800)  # Fresh, to reach rmtree
-    pid_path.exists.return_value = True
-    pid_path.read_text.return_value = "1234"  # Valid PID
-    lock_dir.mkdir.side_effect = FileExistsError("Evict fail")
-    mock_rmtree.side_effect = PermissionError("Evict fail")
-    mock_runner.config.lock_ttl = 3600
-
-    with pytest.raises(SystemExit) as exc:
-        acquire_lock(mock_runner)
+    mock_close.assert_called_once()
+    mock_runner.logger.exception.assert_called_once_with('Failed to acquire lock: no locks')
 
-    assert exc.value.code == 3
-    mock_runner.logger.warning.assert_called_once_with("Failed to evict stale lock: Evict fail — treating as active")
-    mock_runner.logger.error.assert_called_once_with("Lock exists: /tmp/mock_lock — concurrent run detected")
-
-@patch('routine_workflow.lock.shutil.rmtree')
-@patch('routine_workflow.lock.os.getpid', return_value=1234)
-@patch('routine_workflow.lock.time.time', return_value=1720000000.0)
-def test_acquire_lock_eviction_by_dead_pid(mock_time, mock_pid, mock_rmtree, mock_lock_dir, mock_runner):
-    """Test eviction if PID dead (os.kill raises OSError); then retry."""
-    lock_dir, pid_path, ts_path = mock_lock_dir
-    mock_runner.config.lock_dir = lock_dir
-    lock_dir.exists.return_value = True
-    ts_path.exists.return_value = True
-    ts_path.read_text.return_value = str(mock_time.return_value - 1800)  # Fresh < TTL
-    pid_path.exists.return_value = True
-    pid_path.read_text.return_value = "invalid"  # Triggers ValueError in int(pid_str)
-    lock_dir.mkdir.side_effect = [FileExistsError("Stale"), None]  # First fails, retry succeeds
-    mock_runner.config.lock_ttl = 3600
-    with patch('routine_workflow.lock.os.kill', side_effect=OSError("Dead")):  # Simulates dead PID
 
+def test_acquire_lock_pid_write_failure(mock_runner):
+    """Test a failed PID write only warns; the lock is still held."""
+    with patch('routine_workflow.lock.os.write', side_effect=OSError("disk full")):
         acquire_lock(mock_runner)
+    try:
+        assert mock_runner._lock_acquired is True
+        mock_runner.logger.warning.assert_called_once_with('Could not record PID in lock file: disk full')
+    finally:
+        release_lock(mock_runner)
+
+
+@pytest.fixture
+def windows_locking(monkeypatch):
+    """lock.py's msvcrt branch selected, with msvcrt itself faked."""
+    fake = Mock(LK_NBLCK=2, LK_UNLCK=0)
+    monkeypatch.setattr('routine_workflow.lock.sys.platform', 'win32')
+    monkeypatch.setattr('routine_workflow.lock.msvcrt', fake, raising=False)
+    return fake
+
+
+def test_try_lock_windows_contended(windows_locking):
+    """Test msvcrt's OSError on a held region surfaces as BlockingIOError."""
+    windows_locking.locking.side_effect = OSError("region locked")
+
+    with pytest.raises(BlockingIOError):
+        _try_lock(7)
+
+    windows_locking.locking.assert_called_once_with(7, windows_locking.LK_NBLCK, 1)
+
+
+def test_unlock_windows(windows_locking):
+    """Test the msvcrt unlock rewinds to the locked byte first."""
+    with patch('routine_workflow.lock.os.lseek') as mock_lseek:
+        _unlock(7)
 
-    mock_rmtree.assert_called_once_with(lock_dir)
-    mock_runner.logger.info.assert_any_call("Evicted stale lock (dead PID): /tmp/mock_lock")
-    assert lock_dir.mkdir.call_count == 2
+    mock_lseek.assert_called_once_with(7, 0, os.SEEK_SET)
+    windows_locking.locking.assert_called_once_with(7, windows_locking.LK_UNLCK, 1)
@@ -1,22 +1,23 @@
 
 import logging
-import os
-import shutil
+import logging.handlers
 import json
-from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 import pytest
 from routine_workflow.config import WorkflowConfig
 from routine_workflow.utils import setup_logging
 
-@pytest.fixture
-def mock_config(tmp_path):
+@pytest.fixture(scope="module")
+def config_base(tmp_path_factory):
+    """Base for make_config: JSON, DEBUG, 1 KiB rotation, with its log dir in place."""
+    root = tmp_path_factory.mktemp("logging")
+    (root / "logs").mkdir()
     return WorkflowConfig(
-        project_root=tmp_path,
-        log_dir=tmp_path / "logs",
-        log_file=tmp_path / "logs/test.log",
-        lock_dir=tmp_path / "lock",
+        project_root=root,
+        log_dir=root / "logs",
+        log_file=root / "logs/test.log",
+        lock_dir=root / "lock",
         log_level="DEBUG",
         log_format="json",
         log_rotation_max_bytes=1024,
@@ -25,9 +26,20 @@ def mock_config(tmp_path):
         dry_run=True,
     )
 
+@pytest.fixture
+def mock_config(make_config):
+    """The module's base config (JSON, DEBUG, 1 KiB rotation)."""
+    return make_config()
+
+def _flush(logger):
+    for handler in logger.handlers:
+        handler.flush()
+
 def test_setup_logging_configures_logger(mock_config):
     """Test that setup_logging configures the logger with new parameters."""
-    with patch("routine_workflow.utils.RotatingFileHandler") as MockRotatingFileHandler:
+    logging.getLogger("routine_workflow").handlers = [] # Clear handlers
+
+    with patch("routine_workflow.log_handlers.SizeCachedRotatingFileHandler") as MockRotatingFileHandler:
         # Mock the handler instance to have a proper level attribute
         handler_instance = MagicMock()
         handler_instance.level = logging.NOTSET
@@ -52,8 +64,6 @@ def test_setup_logging_configures_logger(mock_config):
 def test_json_formatting_integration(mock_config):
     """Test actual JSON formatting works."""
     # This test will actually write to a file
-    mock_config.log_dir.mkdir(parents=True, exist_ok=True)
-
     # We need to ensure we don't mock RotatingFileHandler here, or we use a real one
     # The previous test mocked it, but patch is a context manager so it should be clean.
     # However, logger singleton persists. We should reset it.
@@ -63,6 +73,7 @@ def test_json_formatting_integration(mock_config):
 
     logger = setup_logging(mock_config)
     logger.info("Test message", extra={"foo": "bar"})
+    _flush(logger)
 
     # Read the log file
     log_content = mock_config.log_file.read_text()
@@ -75,20 +86,88 @@ def test_json_formatting_integration(mock_config):
     assert log_data['level'] == "INFO"
     assert log_data['foo'] == "bar"
 
-def test_text_formatting(mock_config):
+def test_text_formatting(mock_config, make_config, monkeypatch):
     """Test standard text formatting."""
-    mock_config.log_dir.mkdir(parents=True, exist_ok=True)
-
+    # Pin the clock as the formatter sees it so the whole line can be compared
+    monkeypatch.setattr(logging.Formatter, "formatTime", lambda self, record, datefmt=None: "2025-11-04 12:00:00")
     # Override config to use text format
-    # dataclasses are frozen, so we use replace or create new
-    from dataclasses import replace
-    text_config = replace(mock_config, log_format="text", log_file=mock_config.log_dir / "text.log")
+    text_config = make_config(log_format="text", log_file=mock_config.log_dir / "text.log")
 
     logger = logging.getLogger("routine_workflow")
     logger.handlers = [] # Clear handlers
 
     logger = setup_logging(text_config)
     logger.info("Text message")
+    _flush(logger)
 
+    log_lines = text_config.log_file.read_text().splitlines()
+    assert log_lines[-1] == "[2025-11-04 12:00:00] INFO: Text message"
+
+def test_file_writes_are_batched(mock_config, make_config):
+    """File records are buffered until an ERROR arrives; the console is not."""
+    text_config = make_config(log_format="text", log_file=mock_config.log_dir / "batched.log")
+
+    logger = logging.getLogger("routine_workflow")
+    logger.handlers = []
+
+    logger = setup_logging(text_config)
+    assert any(isinstance(h, logging.handlers.MemoryHandler) for h in logger.handlers)
+    logger.info("buffered")
+    assert "buffered" not in text_config.log_file.read_text()
+
+    logger.error("boom")
     log_content = text_config.log_file.read_text()
-    assert "INFO: Text message" in log_content
+    assert "INFO: buffered" in log_content
+    assert "ERROR: boom" in log_content
+
+
+def test_size_cached_handler_rotates(tmp_path):
+    """Rollover still happens at maxBytes while the file size is tracked in memory."""
+    from routine_workflow.log_handlers import SizeCachedRotatingFileHandler
+
+    log_file = tmp_path / "rot.log"
+    handler = SizeCachedRotatingFileHandler(log_file, maxBytes=1000, backupCount=2, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, "x" * 99, None, None)
+
+    with patch("os.path.getsize") as mock_getsize:
+        for _ in range(25):
+            handler.emit(record)
+    handler.close()
+
+    mock_getsize.assert_not_called()
+    assert (tmp_path / "rot.log.1").exists()
+    assert log_file.stat().st_size <= 1000
+    assert (tmp_path / "rot.log.1").stat().st_size <= 1000
+
+
+def test_size_cached_handler_formats_once(tmp_path):
+    from routine_workflow.log_handlers import SizeCachedRotatingFileHandler
+
+    handler = SizeCachedRotatingFileHandler(tmp_path / "f.log", maxBytes=10_000, encoding="utf-8")
+    formatter = MagicMock()
+    formatter.format.return_value = "line"
+    handler.setFormatter(formatter)
+
+    handler.emit(logging.LogRecord("t", logging.INFO, __file__, 1, "msg", None, None))
+    handler.close()
+
+    assert formatter.format.call_count == 1
+
+
+def test_size_cached_handler_releases_record(tmp_path):
+    """The format cache does not keep an emitted record (args, exc_info) alive."""
+    import gc
+    import weakref
+    from routine_workflow.log_handlers import SizeCachedRotatingFileHandler
+
+    handler = SizeCachedRotatingFileHandler(tmp_path / "f.log", maxBytes=10_000, encoding="utf-8")
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, "msg %s", (object(),), None)
+    ref = weakref.ref(record)
+
+    handler.emit(record)
+    del record
+    gc.collect()
+    handler.close()
+
+    assert ref() is None
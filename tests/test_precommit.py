@@ -3,7 +3,6 @@ import pytest
 import sys
 import yaml
 from unittest.mock import patch, MagicMock
-from pathlib import Path
 from routine_workflow.cli import main
 from routine_workflow.pre_commit_installer import install_pre_commit_hook
 
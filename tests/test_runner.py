@@ -2,30 +2,19 @@
 
 """Tests for runner orchestration."""
 
-import signal
-from unittest.mock import patch, Mock, ANY, call
+import dataclasses
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch, Mock, MagicMock, call
 import pytest
 from pathlib import Path
 import logging
 
+from routine_workflow import runner as runner_module
 from routine_workflow.runner import WorkflowRunner
 from routine_workflow.config import WorkflowConfig
-from routine_workflow.steps import (
-    delete_old_dumps,
-    reformat_code,
-    clean_caches,
-    backup_project,
-    generate_dumps,
-    run_tests,
-    security_scan,
-    commit_hygiene,
-    dep_audit,
-)  # Import for patching
 
 
-import pytest
-import logging
-
 @pytest.fixture(autouse=True)
 def clear_routine_logger():
     logger = logging.getLogger("routine_workflow")
@@ -35,339 +24,27 @@ def clear_routine_logger():
     yield
 
 
-@patch("routine_workflow.runner.setup_logging")
-@patch("routine_workflow.runner.setup_signal_handlers")
-def test_init(mock_handlers: Mock, mock_logging: Mock, mock_config: WorkflowConfig):
-    """Test runner init sets up logging/signals."""
-    # Ensure log_level is a string to avoid TypeError in setup_logging (if it were real)
+def _quiet_config(mock_config):
+    # Real setup_logging needs concrete values here
     mock_config.log_level = "INFO"
     mock_config.log_rotation_max_bytes = 1000
     mock_config.log_rotation_backup_count = 5
-    runner = WorkflowRunner(mock_config)
+    return mock_config
+
+
+def test_init(monkeypatch, mock_config: WorkflowConfig):
+    """Test runner init sets up logging/signals."""
+    mock_logging = Mock()
+    mock_handlers = Mock()
+    monkeypatch.setattr(runner_module, "setup_logging", mock_logging)
+    monkeypatch.setattr(runner_module, "setup_signal_handlers", mock_handlers)
+    runner = WorkflowRunner(_quiet_config(mock_config))
 
     mock_logging.assert_called_once_with(mock_config)
     mock_handlers.assert_called_once_with(runner)
     assert runner.config == mock_config
     assert runner._lock_acquired is False
-    assert runner._pid_path is None
-
-
-@patch('routine_workflow.runner.delete_old_dumps')
-@patch('routine_workflow.runner.reformat_code')
-@patch('routine_workflow.runner.run_tests')
-@patch('routine_workflow.runner.clean_caches')
-@patch('routine_workflow.runner.security_scan')
-@patch('routine_workflow.runner.backup_project')
-@patch('routine_workflow.runner.generate_dumps')
-@patch('routine_workflow.runner.commit_hygiene')
-@patch('routine_workflow.runner.dep_audit')
-@patch('routine_workflow.runner.lock_context')
-def test_run_success(mock_lock, mock_dep_audit, mock_commit, mock_generate, mock_backup, mock_security, mock_clean, mock_run_tests, mock_reformat, mock_delete, mock_config: WorkflowConfig):
-    """Test successful run calls all steps."""
-    mock_backup.return_value = True
-    mock_lock.__enter__.return_value = None
-    mock_config.log_level = "INFO"
-    mock_config.log_rotation_max_bytes = 1000
-    mock_config.log_rotation_backup_count = 5
-
-    runner = WorkflowRunner(mock_config)
-    with patch.object(runner, 'logger') as mock_log:
-        result = runner.run()
-
-    assert result == 0
-    mock_delete.assert_called_once_with(runner)
-    mock_reformat.assert_called_once_with(runner)
-    mock_run_tests.assert_called_once_with(runner)
-    mock_clean.assert_called_once_with(runner)
-    mock_security.assert_called_once_with(runner)
-    mock_backup.assert_called_once_with(runner)
-    mock_generate.assert_called_once_with(runner)
-    mock_commit.assert_called_once_with(runner)
-    mock_dep_audit.assert_called_once_with(runner)
-    mock_log.info.assert_any_call('WORKFLOW SUCCESS')
-
-
-@patch('routine_workflow.runner.lock_context')
-def test_run_backup_fail(mock_lock, mock_config: WorkflowConfig):
-    """Test abort on backup fail."""
-    mock_config.fail_on_backup = True
-    mock_config.log_level = "INFO"
-    mock_config.log_rotation_max_bytes = 1000
-    mock_config.log_rotation_backup_count = 5
-
-    runner = WorkflowRunner(mock_config)
-    with patch('routine_workflow.runner.delete_old_dumps'), \
-         patch('routine_workflow.runner.reformat_code'), \
-         patch('routine_workflow.runner.run_tests'), \
-         patch('routine_workflow.runner.clean_caches'), \
-         patch('routine_workflow.runner.security_scan'), \
-         patch('routine_workflow.runner.backup_project') as mock_backup, \
-         patch('routine_workflow.runner.generate_dumps'), \
-         patch('routine_workflow.runner.commit_hygiene'), \
-         patch('routine_workflow.runner.dep_audit'), \
-         patch.object(runner, 'logger'):
-
-        mock_backup.return_value = False
-        mock_lock.__enter__.return_value = None
-        result = runner.run()
-
-    assert result == 2
-    mock_backup.assert_called_once_with(runner)
-
-
-@patch('routine_workflow.runner.lock_context')
-def test_run_exception(mock_lock, mock_config: WorkflowConfig):
-    """Test exception handling returns 1."""
-    mock_lock.__enter__.return_value = None  # Enter succeeds
-    mock_config.log_level = "INFO"
-    mock_config.log_rotation_max_bytes = 1000
-    mock_config.log_rotation_backup_count = 5
-    runner = WorkflowRunner(mock_config)
-    with patch('routine_workflow.runner.delete_old_dumps') as mock_delete, \
-         patch.object(runner, 'logger') as mock_log:
-        mock_delete.side_effect = Exception('Test error')
-        result = runner.run()
-
-    assert result == 1
-    mock_log.exception.assert_called_once()
-
-
-@patch('routine_workflow.runner.setup_signal_handlers')  # Skip SIGINT/SIGTERM
-@patch('routine_workflow.runner.signal.alarm')
-@patch('routine_workflow.runner.signal.signal')
-@patch('routine_workflow.runner.delete_old_dumps')
-@patch('routine_workflow.runner.reformat_code')
-@patch('routine_workflow.runner.run_tests')
-@patch('routine_workflow.runner.clean_caches')
-@patch('routine_workflow.runner.security_scan')
-@patch('routine_workflow.runner.backup_project')
-@patch('routine_workflow.runner.generate_dumps')
-@patch('routine_workflow.runner.commit_hygiene')
-@patch('routine_workflow.runner.dep_audit')
-@patch('routine_workflow.runner.lock_context')
-def test_workflow_timeout_alarm(
-    mock_lock, mock_dep_audit, mock_commit, mock_generate, mock_backup, mock_security, mock_clean, mock_run_tests, mock_reformat, mock_delete,
-    mock_signal, mock_alarm, mock_handlers, mock_config: WorkflowConfig
-):
-    """Test SIGALRM setup and teardown."""
-    # Mock config attrs to prevent step failures
-    mock_config.create_dump_run_cmd = ['create-dump', 'batch', 'run']
-    mock_config.test_cov_threshold = 85
-    mock_config.enable_security = False
-    mock_config.git_push = False
-    mock_config.log_level = "INFO"
-    mock_config.log_rotation_max_bytes = 1000
-    mock_config.log_rotation_backup_count = 5
-    runner = WorkflowRunner(mock_config)
-    runner.config.workflow_timeout = 300
-
-    mock_backup.return_value = True
-    mock_lock.__enter__.return_value = None
-
-    result = runner.run()
-
-    mock_signal.assert_any_call(signal.SIGALRM, ANY)  # SIGALRM call
-    assert mock_alarm.call_count == 2
-    mock_alarm.assert_any_call(300)
-    mock_alarm.assert_any_call(0)
-    assert result == 0  # Success with mocked steps
-
-
-@patch('routine_workflow.runner.setup_signal_handlers')  # Skip SIGINT/SIGTERM
-@patch('routine_workflow.runner.delete_old_dumps')
-@patch('routine_workflow.runner.reformat_code')
-@patch('routine_workflow.runner.run_tests')
-@patch('routine_workflow.runner.clean_caches')
-@patch('routine_workflow.runner.security_scan')
-@patch('routine_workflow.runner.backup_project')
-@patch('routine_workflow.runner.generate_dumps')
-@patch('routine_workflow.runner.commit_hygiene')
-@patch('routine_workflow.runner.dep_audit')
-@patch('routine_workflow.runner.lock_context')
-@patch('routine_workflow.runner.signal.alarm')
-@patch('routine_workflow.runner.signal.signal')
-def test_run_no_timeout(
-    mock_signal, mock_alarm, mock_lock, mock_dep_audit, mock_commit, mock_generate, mock_backup, mock_security, mock_clean, mock_run_tests, mock_reformat, mock_delete, mock_handlers, mock_config: WorkflowConfig
-):
-    """Test no alarm setup if timeout=0."""
-    mock_lock.__enter__.return_value = None
-    mock_config.workflow_timeout = 0
-    mock_config.test_cov_threshold = 85
-    mock_config.enable_security = False
-    mock_config.git_push = False
-    mock_config.log_level = "INFO"
-    mock_config.log_rotation_max_bytes = 1000
-    mock_config.log_rotation_backup_count = 5
-    runner = WorkflowRunner(mock_config)
-
-    result = runner.run()
-
-    mock_alarm.assert_not_called()
-    mock_signal.assert_not_called()
-    assert result == 0  # Success path
-
-
-@patch('routine_workflow.runner.setup_signal_handlers')  # Skip SIGINT/SIGTERM
-@patch('routine_workflow.runner.delete_old_dumps')
-@patch('routine_workflow.runner.reformat_code')
-@patch('routine_workflow.runner.run_tests')
-@patch('routine_workflow.runner.clean_caches')
-@patch('routine_workflow.runner.security_scan')
-@patch('routine_workflow.runner.backup_project')
-@patch('routine_workflow.runner.generate_dumps')
-@patch('routine_workflow.runner.commit_hygiene')
-@patch('routine_workflow.runner.dep_audit')
-@patch('routine_workflow.runner.lock_context')
-@patch('routine_workflow.runner.signal.alarm')
-@patch('routine_workflow.runner.signal.signal')
-def test_run_alarm_setup_exception(
-    mock_signal, mock_alarm, mock_lock, mock_dep_audit, mock_commit, mock_generate, mock_backup, mock_security, mock_clean, mock_run_tests, mock_reformat, mock_delete, mock_handlers, mock_config: WorkflowConfig
-):
-    """Test alarm setup warning on exception."""
-    mock_lock.__enter__.return_value = None
-    mock_config.workflow_timeout = 300
-    mock_config.test_cov_threshold = 85
-    mock_config.enable_security = False
-    mock_config.git_push = False
-    mock_config.log_level = "INFO"
-    mock_config.log_rotation_max_bytes = 1000
-    mock_config.log_rotation_backup_count = 5
-    runner = WorkflowRunner(mock_config)
-    with patch.object(runner, 'logger') as mock_log:
-        mock_alarm.side_effect = Exception('Alarm error')
-        result = runner.run()
-
-    mock_log.warning.assert_called_with('Could not set workflow timeout alarm: Alarm error')
-    assert result == 0  # Success despite alarm fail
-
-
-@patch('routine_workflow.runner.setup_signal_handlers')  # Skip SIGINT/SIGTERM
-@patch('routine_workflow.runner.delete_old_dumps')
-@patch('routine_workflow.runner.reformat_code')
-@patch('routine_workflow.runner.run_tests')
-@patch('routine_workflow.runner.clean_caches')
-@patch('routine_workflow.runner.security_scan')
-@patch('routine_workflow.runner.backup_project')
-@patch('routine_workflow.runner.generate_dumps')
-@patch('routine_workflow.runner.commit_hygiene')
-@patch('routine_workflow.runner.dep_audit')
-@patch('routine_workflow.runner.lock_context')
-@patch('routine_workflow.runner.signal.alarm')
-@patch('routine_workflow.runner.signal.signal')
-def test_run_alarm_teardown_exception(
-    mock_signal, mock_alarm, mock_lock, mock_dep_audit, mock_commit, mock_generate, mock_backup, mock_security, mock_clean, mock_run_tests, mock_reformat, mock_delete, mock_handlers, mock_config: WorkflowConfig
-):
-    """Test alarm teardown exception ignored."""
-    mock_lock.__enter__.return_value = None
-    mock_config.workflow_timeout = 300
-    mock_config.test_cov_threshold = 85
-    mock_config.enable_security = False
-    mock_config.git_push = False
-    mock_config.log_level = "INFO"
-    mock_config.log_rotation_max_bytes = 1000
-    mock_config.log_rotation_backup_count = 5
-    runner = WorkflowRunner(mock_config)
-    with patch.object(runner, 'logger') as mock_log:
-        mock_alarm.side_effect = [None, Exception('Teardown error')]  # Setup ok, teardown fails
-        result = runner.run()
-
-    assert mock_alarm.call_count == 2
-    mock_log.warning.assert_not_called()  # Exception in finally suppressed
-    assert result == 0
-
-
-@patch('routine_workflow.runner.setup_signal_handlers')  # Skip SIGINT/SIGTERM
-@patch('routine_workflow.runner.delete_old_dumps')
-@patch('routine_workflow.runner.reformat_code')
-@patch('routine_workflow.runner.run_tests')
-@patch('routine_workflow.runner.clean_caches')
-@patch('routine_workflow.runner.security_scan')
-@patch('routine_workflow.runner.backup_project')
-@patch('routine_workflow.runner.generate_dumps')
-@patch('routine_workflow.runner.commit_hygiene')
-@patch('routine_workflow.runner.dep_audit')
-@patch('routine_workflow.runner.lock_context')
-def test_run_chdir(
-    mock_lock, mock_dep_audit, mock_commit, mock_generate, mock_backup, mock_security, mock_clean, mock_run_tests, mock_reformat, mock_delete, mock_handlers, mock_config: WorkflowConfig
-):
-    """Test chdir to project_root."""
-    mock_lock.__enter__.return_value = None
-    mock_config.project_root = Path('/test/root')
-    mock_config.test_cov_threshold = 85
-    mock_config.enable_security = False
-    mock_config.git_push = False
-    mock_config.log_level = "INFO"
-    mock_config.log_rotation_max_bytes = 1000
-    mock_config.log_rotation_backup_count = 5
-    runner = WorkflowRunner(mock_config)
-    with patch('os.chdir') as mock_chdir:
-        result = runner.run()
-
-    mock_chdir.assert_called_once_with(mock_config.project_root)
-    assert result == 0
-
-
-@patch("routine_workflow.runner.signal.alarm")
-@patch("routine_workflow.runner.generate_dumps")
-@patch("routine_workflow.runner.delete_old_dumps")
-@patch("routine_workflow.runner.clean_caches")
-@patch("routine_workflow.runner.security_scan")
-@patch("routine_workflow.runner.reformat_code")
-@patch("routine_workflow.runner.run_tests")
-@patch("routine_workflow.runner.backup_project")
-@patch("routine_workflow.runner.lock_context")
-def test_run_specific_steps(
-    mock_lock, mock_backup, mock_run_tests, mock_reformat, mock_security, mock_clean, mock_delete, mock_generate, mock_alarm,
-    minimal_config: WorkflowConfig,
-    caplog: pytest.LogCaptureFixture,
-):
-    """Test selective steps: filter, warn skips, invoke only targeted steps."""
-    # Setup mocks: steps return success; lock enters/exits cleanly
-    mock_lock.return_value.__enter__.return_value = None  # No-op lock
-    mock_delete.return_value = None
-    mock_reformat.return_value = None
-    mock_run_tests.return_value = True
-    mock_clean.return_value = None
-    mock_security.return_value = True
-    mock_backup.return_value = True
-    mock_generate.return_value = None
-    mock_alarm.return_value = None  # No-op timeout
-
-    # Enable caplog for INFO/WARNING
-    caplog.set_level(logging.INFO)
-
-    # Real runner with partial steps; enable propagation for caplog
-    runner = WorkflowRunner(minimal_config, steps=["step2", "step4"])
-    runner.logger.propagate = True  # Route named logger to root for capture
-    result = runner.run()
-
-    # Assertions: filtering, warnings, invocations, outcome
-    assert result == 0
-
-    # Verify warning for skips (via caplog records; order-independent)
-    skip_warnings = [rec for rec in caplog.records if "Skipping steps:" in rec.message]
-    assert len(skip_warnings) == 1
-    expected_steps = {"step1", "step2.5", "step3", "step3.5", "step5", "step6", "step6.5"}
-    actual_steps = set(skip_warnings[0].message.split(": ")[1].strip().split(", "))
-    assert actual_steps == expected_steps
-
-    # Verify success log
-    success_logs = [rec for rec in caplog.records if "WORKFLOW SUCCESS" in rec.message]
-    assert len(success_logs) == 1
-
-    # Only targeted steps called (others not)
-    mock_reformat.assert_called_once_with(runner)  # step2
-    mock_backup.assert_called_once_with(runner)    # step4
-    mock_delete.assert_not_called()
-    mock_run_tests.assert_not_called()
-    mock_clean.assert_not_called()
-    mock_security.assert_not_called()
-    mock_generate.assert_not_called()
-
-    # Lock acquired/released
-    mock_lock.assert_called_once()
-    mock_lock.return_value.__exit__.assert_called_once_with(None, None, None)
-    
+    assert runner._lock_fd is None
 
 
 @pytest.fixture
@@ -395,27 +72,27 @@ def minimal_config(tmp_path: Path) -> WorkflowConfig:
     )
 
 
-@patch("routine_workflow.runner.delete_old_dumps")
-@patch("routine_workflow.runner.reformat_code")
+@patch("routine_workflow.runner.delete_old_dumps", new_callable=Mock)
+@patch("routine_workflow.runner.reformat_code", new_callable=Mock)
 def test_runner_custom_order(mock_step2, mock_step1, minimal_config: WorkflowConfig):
     """Test custom step order: execute in user-specified sequence."""
     # Patch only targeted steps; fixture already sets project_root=tmp_path
     runner = WorkflowRunner(minimal_config, steps=["step2", "step1"])  # Reverse: reformat then delete
-    with patch.object(runner, "logger"):  # Suppress logs for isolation
-        runner.run()
+    runner.logger = Mock()  # Suppress logs for isolation
+    runner.run()
 
     # Assert invocations (order preserved by loop; step2 before step1)
     mock_step2.assert_has_calls([call(runner)], any_order=False)
     mock_step1.assert_has_calls([call(runner)], any_order=False)
 
 
-@patch("routine_workflow.runner.clean_caches")
+@patch("routine_workflow.runner.clean_caches", new_callable=Mock)
 def test_runner_repeat_step(mock_step3, minimal_config: WorkflowConfig):
     """Test step repetition: invoke callable multiple times."""
     # Patch target; fixture handles paths
     runner = WorkflowRunner(minimal_config, steps=["step3", "step3"])  # Repeat clean
-    with patch.object(runner, "logger"):
-        runner.run()
+    runner.logger = Mock()
+    runner.run()
 
     # Assert repeated invocation
     assert mock_step3.call_count == 2
@@ -424,28 +101,279 @@ def test_runner_repeat_step(mock_step3, minimal_config: WorkflowConfig):
 def test_run_invalid_steps(minimal_config: WorkflowConfig):
     """Test that the runner handles invalid steps."""
     runner = WorkflowRunner(minimal_config, steps=["invalid_step"])
-    with patch.object(runner, 'logger') as mock_log:
-        result = runner.run()
+    mock_log = runner.logger = Mock()
+    result = runner.run()
     assert result == 0
-    mock_log.warning.assert_any_call("Some steps skipped due to invalid names")
-    mock_log.warning.assert_any_call("No valid steps specified; exiting early")
-
-@patch("routine_workflow.runner.backup_project", return_value=False)
-def test_run_backup_fail_and_fail_on_backup(mock_backup, minimal_config: WorkflowConfig):
-    """Test that the runner exits with code 2 if backup fails and fail_on_backup is True."""
-
-    config = WorkflowConfig(**{**minimal_config.__dict__, 'fail_on_backup': True})
-    runner = WorkflowRunner(config)
-
-    with patch.object(runner, 'logger') as mock_log, \
-         patch("routine_workflow.runner.delete_old_dumps"), \
-         patch("routine_workflow.runner.reformat_code"), \
-         patch("routine_workflow.runner.run_tests"), \
-         patch("routine_workflow.runner.clean_caches"), \
-         patch("routine_workflow.runner.security_scan"), \
-         patch("routine_workflow.runner.generate_dumps"), \
-         patch("routine_workflow.runner.commit_hygiene"), \
-         patch("routine_workflow.runner.dep_audit"):
+    # [0] is "Skipping steps: ..." listing the unselected steps
+    assert mock_log.warning.call_args_list[1:] == [
+        call("Some steps skipped due to invalid names"), call("No valid steps specified; exiting early"),
+    ]
+
+class TestRunnerStepsPatched:
+    """Runs with every step function, the lock and signal setup swapped for mocks."""
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def _patched_deps(cls, step_targets):
+        # Bound once for the class; _reset_mocks only resets them
+        mocks = SimpleNamespace(**{name: Mock() for name in step_targets})
+        mocks.lock_context = MagicMock()  # Used as a context manager
+        mocks.setup_signal_handlers = Mock()
+        cls.mocks = mocks
+        with pytest.MonkeyPatch.context() as mp:
+            for name, mock in vars(mocks).items():
+                mp.setattr(runner_module, name, mock)
+            yield
+
+    @pytest.fixture(autouse=True)
+    def _reset_mocks(self, step_targets):
+        for name, mock in vars(self.mocks).items():
+            mock.reset_mock(side_effect=True)
+            if name in step_targets:
+                mock.return_value = None
+        self.mocks.backup_project.return_value = True
+
+    def test_run_success(self, mock_config: WorkflowConfig, step_targets):
+        """Test successful run calls all steps."""
+        runner = WorkflowRunner(_quiet_config(mock_config))
+        mock_log = runner.logger = Mock()
+        result = runner.run()
+
+        assert result == 0
+        for name in step_targets:
+            getattr(self.mocks, name).assert_called_once_with(runner)
+        mock_log.info.assert_any_call('WORKFLOW SUCCESS')
+
+    def test_run_backup_fail(self, mock_config: WorkflowConfig):
+        """Test abort on backup fail."""
+        mock_config.fail_on_backup = True
+        runner = WorkflowRunner(_quiet_config(mock_config))
+        self.mocks.backup_project.return_value = False
+
+        runner.logger = Mock()
+        result = runner.run()
+
+        assert result == 2
+        self.mocks.backup_project.assert_called_once_with(runner)
+
+    def test_run_exception(self, mock_config: WorkflowConfig):
+        """Test exception handling returns 1."""
+        runner = WorkflowRunner(_quiet_config(mock_config))
+        self.mocks.delete_old_dumps.side_effect = Exception('Test error')
+
+        mock_log = runner.logger = Mock()
+        result = runner.run()
+
+        assert result == 1
+        mock_log.exception.assert_called_once()
+
+    def test_workflow_timeout_timer(self, monkeypatch, mock_config: WorkflowConfig):
+        """Test deadline Timer setup and teardown."""
+        mock_timer = Mock()
+        monkeypatch.setattr(runner_module.threading, "Timer", mock_timer)
+        runner = WorkflowRunner(_quiet_config(mock_config))
+        runner.config.workflow_timeout = 300
+
         result = runner.run()
-    assert result == 2
-    mock_log.error.assert_any_call("Backup failed; aborting workflow per config")
+
+        mock_timer.assert_called_once_with(300, runner._deadline_event.set)
+        assert mock_timer.return_value.daemon is True
+        mock_timer.return_value.start.assert_called_once()
+        mock_timer.return_value.cancel.assert_called_once()
+        assert isinstance(runner._deadline, float)
+        assert result == 0  # Success with mocked steps
+
+    def test_run_no_timeout(self, mock_config: WorkflowConfig):
+        """Test no deadline Timer if timeout=0."""
+        mock_config.workflow_timeout = 0
+        runner = WorkflowRunner(_quiet_config(mock_config))
+
+        result = runner.run()
+
+        # _deadline is only ever set alongside starting the Timer
+        assert runner._deadline is None
+        assert result == 0  # Success path
+
+    def test_run_timeout_between_steps(self, mock_config: WorkflowConfig):
+        """Test an expired deadline stops the workflow before the next step with 124."""
+        mock_config.workflow_timeout = 300
+        runner = WorkflowRunner(_quiet_config(mock_config), steps=["step1", "step2"])
+        self.mocks.delete_old_dumps.side_effect = lambda r: r._deadline_event.set()
+
+        mock_log = runner.logger = Mock()
+        with pytest.raises(SystemExit) as exc:
+            runner.run()
+
+        assert exc.value.code == 124
+        self.mocks.reformat_code.assert_not_called()
+        mock_log.error.assert_called_with('Workflow timed out after 300 seconds')
+
+    def test_run_timeout_in_final_step(self, mock_config: WorkflowConfig):
+        """Test a deadline expiring during the last step still exits 124, not success."""
+        mock_config.workflow_timeout = 300
+        runner = WorkflowRunner(_quiet_config(mock_config), steps=["step1", "step2"])
+        self.mocks.reformat_code.side_effect = lambda r: r._deadline_event.set()
+
+        mock_log = runner.logger = Mock()
+        with pytest.raises(SystemExit) as exc:
+            runner.run()
+
+        assert exc.value.code == 124
+        self.mocks.reformat_code.assert_called_once_with(runner)
+        mock_log.error.assert_called_with('Workflow timed out after 300 seconds')
+        assert call('WORKFLOW SUCCESS') not in mock_log.info.call_args_list
+
+    def test_run_chdir(self, monkeypatch, mock_config: WorkflowConfig):
+        """Test chdir to project_root."""
+        mock_chdir = Mock()
+        monkeypatch.setattr(runner_module.os, "chdir", mock_chdir)
+        mock_config.project_root = Path('/test/root')
+        runner = WorkflowRunner(_quiet_config(mock_config))
+
+        result = runner.run()
+
+        mock_chdir.assert_called_once_with(mock_config.project_root)
+        assert result == 0
+
+    def test_run_specific_steps(self, minimal_config: WorkflowConfig,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        """Test selective steps: filter, warn skips, invoke only targeted steps."""
+        # Enable caplog for INFO/WARNING
+        caplog.set_level(logging.INFO)
+
+        # Real runner with partial steps; enable propagation for caplog
+        runner = WorkflowRunner(minimal_config, steps=["step2", "step4"])
+        runner.logger.propagate = True  # Route named logger to root for capture
+        result = runner.run()
+
+        # Assertions: filtering, warnings, invocations, outcome
+        assert result == 0
+
+        # Verify warning for skips (via caplog records; order-independent)
+        skip_warnings = [rec for rec in caplog.records if "Skipping steps:" in rec.message]
+        assert len(skip_warnings) == 1
+        expected_steps = {"step1", "step2.5", "step3", "step3.5", "step5", "step6", "step6.5"}
+        actual_steps = set(skip_warnings[0].message.split(": ")[1].strip().split(", "))
+        assert actual_steps == expected_steps
+
+        # Verify success log
+        success_logs = [rec for rec in caplog.records if "WORKFLOW SUCCESS" in rec.message]
+        assert len(success_logs) == 1
+
+        # Only targeted steps called (others not)
+        self.mocks.reformat_code.assert_called_once_with(runner)  # step2
+        self.mocks.backup_project.assert_called_once_with(runner)  # step4
+        for name in ("delete_old_dumps", "run_tests", "clean_caches", "security_scan", "generate_dumps"):
+            getattr(self.mocks, name).assert_not_called()
+
+        # Lock acquired/released
+        self.mocks.lock_context.assert_called_once()
+        self.mocks.lock_context.return_value.__exit__.assert_called_once_with(None, None, None)
+
+    def test_run_backup_fail_and_fail_on_backup(self, minimal_config: WorkflowConfig):
+        """Test that the runner exits with code 2 if backup fails and fail_on_backup is True."""
+
+        config = dataclasses.replace(minimal_config, fail_on_backup=True)
+        runner = WorkflowRunner(config)
+        self.mocks.backup_project.return_value = False
+
+        mock_log = runner.logger = Mock()
+        result = runner.run()
+        assert result == 2
+        mock_log.error.assert_any_call("Backup failed; aborting workflow per config")
+
+
+def _recording_step(log, overlap_gate=None):
+    """Step factory for patch_steps: each step appends (event, step) to ``log``."""
+    def _make(target):
+        def _step(runner):
+            log.append(("start", target))
+            if overlap_gate is not None and target == "delete_old_dumps":
+                # Only returns if reformat_code starts while this step is still running
+                assert overlap_gate.wait(timeout=5)
+            if overlap_gate is not None and target == "reformat_code":
+                overlap_gate.set()
+            log.append(("end", target))
+            return True
+        return Mock(side_effect=_step)
+    return _make
+
+
+def test_run_overlaps_independent_steps(minimal_config: WorkflowConfig, patch_steps):
+    """With --overlap, step1 overlaps the reformat chain; dependencies still order the rest."""
+    log = []
+    runner = WorkflowRunner(dataclasses.replace(minimal_config, overlap=True))
+    runner.logger = Mock()
+    patch_steps(_recording_step(log, overlap_gate=threading.Event()))
+
+    assert runner.run() == 0
+
+    idx = {entry: i for i, entry in enumerate(log)}
+    assert idx[("start", "reformat_code")] < idx[("end", "delete_old_dumps")]
+    assert idx[("end", "reformat_code")] < idx[("start", "run_tests")]
+    assert idx[("end", "security_scan")] < idx[("start", "backup_project")]
+    assert idx[("end", "delete_old_dumps")] < idx[("start", "backup_project")]
+    assert idx[("end", "commit_hygiene")] < idx[("start", "dep_audit")]
+
+
+def test_run_steps_share_runner_pool(minimal_config: WorkflowConfig, patch_steps):
+    """Concurrent steps run on the runner's named pool, which is shut down afterwards."""
+    threads = set()
+    runner = WorkflowRunner(dataclasses.replace(minimal_config, overlap=True))
+    runner.logger = Mock()
+    patch_steps(lambda name: Mock(side_effect=lambda r: threads.add(threading.current_thread().name)))
+
+    assert runner.run() == 0
+
+    assert threads and all(name.startswith("rw_") for name in threads)
+    assert runner._pool is None
+
+
+def test_run_overlap_step_exit_waits_for_running_step(minimal_config: WorkflowConfig, patch_steps):
+    """A step exiting mid-overlap surfaces on the caller only after its sibling stops, lock held."""
+    log = []
+    release = threading.Event()
+    runner = WorkflowRunner(dataclasses.replace(minimal_config, overlap=True))
+    runner.logger = Mock()
+
+    def _slow_step1(r):
+        log.append(("start", "delete_old_dumps"))
+        release.wait(timeout=5)
+        log.append(("end", "delete_old_dumps", r._lock_acquired))
+
+    def _exiting_step2(r):
+        log.append(("start", "reformat_code"))
+        release.set()
+        runner_module.cleanup_and_exit(r, 5)
+
+    mocks = patch_steps()
+    mocks["delete_old_dumps"].side_effect = _slow_step1
+    mocks["reformat_code"].side_effect = _exiting_step2
+
+    with pytest.raises(SystemExit) as exc:
+        runner.run()
+    log.append(("raised",))
+
+    assert exc.value.code == 5
+    mocks["run_tests"].assert_not_called()
+    # step1 still held the lock when it finished; lock_context released it afterwards
+    assert log[-2:] == [("end", "delete_old_dumps", True), ("raised",)]
+    assert runner._lock_acquired is False
+    assert runner._steps_overlapping is False
+    assert runner._pool is None
+
+
+def test_run_one_step_at_a_time_by_default(minimal_config: WorkflowConfig, patch_steps, step_targets):
+    """Without --overlap, every step runs strictly in pipeline order."""
+    log = []
+    runner = WorkflowRunner(minimal_config)
+    runner.logger = Mock()
+    patch_steps(_recording_step(log))
+
+    assert runner.run() == 0
+
+    expected = []
+    for target in step_targets:
+        expected += [("start", target), ("end", target)]
+    assert log == expected
@@ -0,0 +1,47 @@
+# tests/test_steps/conftest.py
+
+"""Shared fixtures for step tests."""
+
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from routine_workflow.config import WorkflowConfig
+
+
+# Non-path WorkflowConfig fields shared by every step test; built once at import
+_CONFIG_DEFAULTS = MappingProxyType(dict(
+    fail_on_backup=False,
+    auto_yes=False,
+    dry_run=False,
+    max_workers=4,
+    workflow_timeout=0,
+    test_cov_threshold=85,
+    git_push=False,
+    enable_security=False,
+    enable_dep_audit=False,
+))
+
+
+@pytest.fixture(scope="module")
+def config_base(tmp_path_factory: pytest.TempPathFactory) -> WorkflowConfig:
+    """Base for make_config: one config per module under a shared directory.
+
+    Step tests mock every command and never write there.
+    """
+    root = tmp_path_factory.mktemp("step_cfg")
+    return WorkflowConfig(
+        project_root=root,
+        log_dir=root / "logs",
+        log_file=root / "test.log",
+        lock_dir=root / "lock",
+        exclude_patterns=[],  # Mutable, so not part of the shared defaults
+        **_CONFIG_DEFAULTS,
+    )
+
+
+@pytest.fixture
+def mock_runner(mock_config: Mock) -> SimpleNamespace:
+    """Stand-in runner: steps only read .config and .logger, so a namespace replaces a spec'd Mock."""
+    return SimpleNamespace(config=mock_config, logger=Mock(), _deadline=None)
@@ -2,25 +2,21 @@
 
 """Tests for step1: Delete old dumps."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, patch, call
 from pathlib import Path
+from types import SimpleNamespace
 import pytest
 
 from routine_workflow.steps.step1 import delete_old_dumps
-from routine_workflow.runner import WorkflowRunner
-from routine_workflow.utils import cmd_exists, run_command
 
 
 @pytest.fixture
-def mock_runner() -> Mock:
-    """Mock WorkflowRunner with minimal config."""
-    runner = Mock(spec=WorkflowRunner)
-    runner.logger = Mock()  # Essential for log access
+def mock_runner() -> SimpleNamespace:
+    """Stand-in runner with minimal config; step1 only reads .config and .logger."""
     config = Mock(spec='WorkflowConfig')
     config.create_dump_clean_cmd = ['create-dump', 'batch', 'clean']
     config.project_root = Path('/tmp/project')
-    runner.config = config
-    return runner
+    return SimpleNamespace(config=config, logger=Mock(), _deadline=None)  # Logger is a Mock for log access
 
 
 def test_delete_old_dumps_header(mock_runner: Mock):
@@ -29,8 +25,9 @@ def test_delete_old_dumps_header(mock_runner: Mock):
 
     delete_old_dumps(mock_runner)
 
-    mock_runner.logger.info.assert_any_call('=' * 60)
-    mock_runner.logger.info.assert_any_call('STEP 1: Delete old code dumps (via create-dump tool)')
+    assert mock_runner.logger.info.call_args_list[:3] == [
+        call('=' * 60), call('STEP 1: Delete old code dumps (via create-dump tool)'), call('=' * 60),
+    ]
 
 
 @patch('routine_workflow.steps.step1.cmd_exists')
@@ -58,11 +55,25 @@ def test_delete_old_dumps_dry_run(mock_exists, mock_run, mock_runner: Mock):
     expected_cmd = ['create-dump', 'batch', 'clean', '-d']
     mock_run.assert_called_once_with(
         mock_runner, 'Clean old code dumps', expected_cmd,
-        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False
+        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False, dry_run_safe=True
     )
     mock_runner.logger.info.assert_any_call('Code-dump cleanup completed successfully')
 
 
+@patch('routine_workflow.steps.step1.run_command')
+@patch('routine_workflow.steps.step1.cmd_exists', return_value=True)
+def test_delete_old_dumps_dry_run_ignores_auto_yes(mock_exists, mock_run, mock_runner: Mock):
+    """Test a dry run with auto-yes executes only the -d preview: no -nd, no -y."""
+    mock_runner.config.dry_run = True
+    mock_runner.config.auto_yes = True
+    mock_run.return_value = {'success': True}
+
+    delete_old_dumps(mock_runner)
+
+    assert mock_run.call_args.args[2] == ['create-dump', 'batch', 'clean', '-d']
+    assert mock_run.call_args.kwargs['dry_run_safe'] is True
+
+
 @patch('routine_workflow.steps.step1.run_command')
 @patch('routine_workflow.steps.step1.cmd_exists')
 def test_delete_old_dumps_real_run(mock_exists, mock_run, mock_runner: Mock):
@@ -77,7 +88,7 @@ def test_delete_old_dumps_real_run(mock_exists, mock_run, mock_runner: Mock):
     expected_cmd = ['create-dump', 'batch', 'clean', '-nd', '-y']
     mock_run.assert_called_once_with(
         mock_runner, 'Clean old code dumps', expected_cmd,
-        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False
+        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False, dry_run_safe=True
     )
     mock_runner.logger.info.assert_called_with('Code-dump cleanup completed successfully')
 
@@ -96,7 +107,7 @@ def test_delete_old_dumps_failure(mock_exists, mock_run, mock_runner: Mock):
     expected_cmd = ['create-dump', 'batch', 'clean', '-nd', '-y']
     mock_run.assert_called_once_with(
         mock_runner, 'Clean old code dumps', expected_cmd,
-        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False
+        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False, dry_run_safe=True
     )
     mock_runner.logger.warning.assert_called_with('Code-dump cleanup failed or skipped')
 
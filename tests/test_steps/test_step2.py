@@ -2,11 +2,9 @@
 
 """Tests for step2: Reformat code."""
 
-from unittest.mock import patch, Mock
-import pytest
+from unittest.mock import patch, Mock, call
 
 from routine_workflow.steps.step2 import reformat_code
-from routine_workflow.runner import WorkflowRunner
 
 
 @patch("routine_workflow.formatting_service.run_autoimport_parallel")
@@ -64,8 +62,9 @@ def test_reformat_code_ruff_only(mock_cmd: Mock, mock_exists: Mock, mock_autoimp
 
     assert mock_cmd.call_count == 3  # ruff initial, ruff check, ruff final
     mock_autoimport.assert_not_called()
-    mock_runner.logger.info.assert_any_call('autoimport not installed - skipping')
-    mock_runner.logger.info.assert_any_call("Reformat complete")
+    assert mock_runner.logger.info.call_args_list[3:] == [
+        call('autoimport not installed - skipping'), call("Reformat complete"),
+    ]
 
 
 @patch("routine_workflow.formatting_service.run_autoimport_parallel")
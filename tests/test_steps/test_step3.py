@@ -4,11 +4,8 @@
 
 from unittest.mock import patch, Mock
 import pytest
-from pathlib import Path
 
 from routine_workflow.steps.step3 import clean_caches
-from routine_workflow.runner import WorkflowRunner
-from routine_workflow.utils import run_command, cmd_exists
 
 
 def test_clean_caches_missing(mock_runner: Mock):
@@ -33,7 +30,6 @@ def test_clean_caches_no_pypurge(mock_cmd_exists, mock_runner: Mock):
 @patch('routine_workflow.steps.step3.run_command')
 def test_clean_caches_exists(mock_run, mock_exists, mock_runner: Mock):
     """Test runs pypurge if exists."""
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.dry_run = False
     mock_runner.config.auto_yes = False
     # --- FIXED: Return a dict, not a bool ---
@@ -43,7 +39,7 @@ def test_clean_caches_exists(mock_run, mock_exists, mock_runner: Mock):
 
     mock_run.assert_called_once_with(
         mock_runner, 'Clean caches', ['pypurge', str(mock_runner.config.project_root), '--allow-root', '-y'],
-        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False
+        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False, dry_run_safe=True
     )
     mock_runner.logger.info.assert_called_with('Cache cleanup completed successfully')
 
@@ -52,7 +48,6 @@ def test_clean_caches_exists(mock_run, mock_exists, mock_runner: Mock):
 @patch('routine_workflow.steps.step3.run_command')
 def test_clean_caches_dry_run(mock_run, mock_exists, mock_runner: Mock):
     """Test dry-run uses -p flag."""
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.dry_run = True
     mock_runner.config.auto_yes = False
     # --- FIXED: Return a dict, not a bool ---
@@ -62,7 +57,7 @@ def test_clean_caches_dry_run(mock_run, mock_exists, mock_runner: Mock):
 
     mock_run.assert_called_once_with(
         mock_runner, 'Clean caches', ['pypurge', str(mock_runner.config.project_root), '--allow-root', '-p'],
-        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False
+        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False, dry_run_safe=True
     )
     mock_runner.logger.info.assert_called_with('Cache cleanup completed successfully')
 
@@ -71,7 +66,6 @@ def test_clean_caches_dry_run(mock_run, mock_exists, mock_runner: Mock):
 @patch('routine_workflow.steps.step3.run_command')
 def test_clean_caches_auto_yes(mock_run, mock_exists, mock_runner: Mock):
     """Test auto-yes ensures -y flag."""
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.dry_run = False
     mock_runner.config.auto_yes = True
     # --- FIXED: Return a dict, not a bool ---
@@ -91,7 +85,7 @@ def test_clean_caches_auto_yes(mock_run, mock_exists, mock_runner: Mock):
     
     mock_run.assert_called_once_with(
         mock_runner, 'Clean caches', ['pypurge', str(mock_runner.config.project_root), '--allow-root', '-y'],
-        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False
+        cwd=mock_runner.config.project_root, timeout=300.0, fatal=False, dry_run_safe=True
     )
 
 
@@ -99,7 +93,6 @@ def test_clean_caches_auto_yes(mock_run, mock_exists, mock_runner: Mock):
 @patch('routine_workflow.steps.step3.run_command')
 def test_clean_caches_failure(mock_run, mock_exists, mock_runner: Mock):
     """Test failure handling."""
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.dry_run = False
     mock_runner.config.auto_yes = True
     # --- FIXED: Return a dict, not a bool ---
@@ -108,3 +101,17 @@ def test_clean_caches_failure(mock_run, mock_exists, mock_runner: Mock):
     clean_caches(mock_runner)
 
     mock_runner.logger.warning.assert_called_with('Cache cleanup failed or skipped')
+
+
+@patch('routine_workflow.steps.step3.cmd_exists', return_value=True)
+@patch('routine_workflow.steps.step3.run_command')
+def test_clean_caches_dry_run_ignores_auto_yes(mock_run, mock_exists, mock_runner: Mock):
+    """Test a dry run with auto-yes still sends only the -p preview, never -y."""
+    mock_runner.config.dry_run = True
+    mock_runner.config.auto_yes = True
+    mock_run.return_value = {"success": True, "stdout": "", "stderr": ""}
+
+    clean_caches(mock_runner)
+
+    assert mock_run.call_args.args[2] == ['pypurge', str(mock_runner.config.project_root), '--allow-root', '-p']
+    assert mock_run.call_args.kwargs['dry_run_safe'] is True
@@ -3,13 +3,9 @@
 """Tests for step4: Backup project."""
 
 from unittest.mock import patch, Mock
-from datetime import datetime
-import pytest
 from pathlib import Path
 
 from routine_workflow.steps.step4 import backup_project
-from routine_workflow.runner import WorkflowRunner
-from routine_workflow.utils import run_command, cmd_exists
 
 
 def test_backup_missing_script(mock_runner: Mock):
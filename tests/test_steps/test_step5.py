@@ -3,12 +3,8 @@
 """Tests for step5: Generate dumps."""
 
 from unittest.mock import patch, Mock
-from pathlib import Path
-import pytest
 
 from routine_workflow.steps.step5 import generate_dumps
-from routine_workflow.runner import WorkflowRunner
-from routine_workflow.utils import cmd_exists, run_command
 
 
 def test_generate_dumps_no_tool(mock_runner: Mock):
@@ -40,7 +36,6 @@ def test_generate_dumps_success(mock_exists, mock_run, mock_runner: Mock):
     """Test successful tool invocation."""
     mock_runner.config.dry_run = False
     mock_runner.config.auto_yes = True
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.create_dump_run_cmd = ['create-dump', 'batch', 'run']
     mock_exists.return_value = True
     mock_run.return_value = True
@@ -60,7 +55,6 @@ def test_generate_dumps_failure(mock_exists, mock_run, mock_runner: Mock):
     """Test handles tool failure gracefully."""
     mock_runner.config.dry_run = False
     mock_runner.config.auto_yes = False
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.create_dump_run_cmd = ['create-dump', 'batch', 'run']
     mock_exists.return_value = True
     mock_run.return_value = False
@@ -80,7 +74,6 @@ def test_generate_dumps_cmd_fallback(mock_exists, mock_run, mock_runner: Mock):
     """Test fallback cmd if create_dump_run_cmd not set."""
     mock_runner.config.dry_run = False
     mock_runner.config.auto_yes = False
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.create_dump_run_cmd = None  # Trigger fallback
     mock_exists.return_value = True
     mock_run.return_value = True
@@ -99,7 +92,6 @@ def test_generate_dumps_no_yes(mock_exists, mock_run, mock_runner: Mock):
     """Test no -y flag if not auto_yes."""
     mock_runner.config.dry_run = False
     mock_runner.config.auto_yes = False
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.create_dump_run_cmd = ['create-dump', 'batch', 'run']
     mock_exists.return_value = True
     mock_run.return_value = True
@@ -129,7 +121,6 @@ def test_generate_dumps_fallback_failure(mock_exists, mock_run, mock_runner: Moc
     """Test failure with fallback cmd."""
     mock_runner.config.dry_run = False
     mock_runner.config.auto_yes = True
-    mock_runner.config.project_root = Path('/tmp/project')
     mock_runner.config.create_dump_run_cmd = None  # Trigger fallback
     mock_exists.return_value = True
     mock_run.return_value = False
@@ -141,3 +132,18 @@ def test_generate_dumps_fallback_failure(mock_exists, mock_run, mock_runner: Moc
         cwd=mock_runner.config.project_root, timeout=600.0, fatal=False
     )
     mock_runner.logger.warning.assert_called_with('Code-dump generation failed or skipped')
+
+
+@patch('routine_workflow.steps.step5.run_command')
+@patch('routine_workflow.steps.step5.cmd_exists', return_value=True)
+def test_generate_dumps_leaves_config_cmd_untouched(mock_exists, mock_run, mock_runner: Mock):
+    """Flags go on a fresh list; the shared config tuple is never extended."""
+    mock_runner.config.dry_run = False
+    mock_runner.config.auto_yes = True
+    mock_runner.config.create_dump_run_cmd = ('create-dump', 'batch', 'run')
+
+    generate_dumps(mock_runner)
+    generate_dumps(mock_runner)
+
+    assert mock_runner.config.create_dump_run_cmd == ('create-dump', 'batch', 'run')
+    assert mock_run.call_args.args[2] == ['create-dump', 'batch', 'run', '-nd', '-y']
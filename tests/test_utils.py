@@ -1,25 +1,29 @@
 
-import pytest
-import sys
+import asyncio
+import dataclasses
+import fnmatch
+import json
 import logging
-import subprocess
-import threading
-import shutil
 import os
 import signal
-from unittest.mock import patch, Mock, MagicMock, ANY
+import subprocess
+import sys
+import time
+from logging import StreamHandler
+from logging.handlers import MemoryHandler
 from pathlib import Path
-from logging import StreamHandler, Formatter
-from logging.handlers import RotatingFileHandler
+from types import SimpleNamespace
+from unittest.mock import ANY, AsyncMock, MagicMock, Mock, call, patch
+
+import pytest
 
-from routine_workflow.utils import (
-    setup_logging, run_command, cmd_exists, should_exclude,
-    gather_py_files, run_autoimport_parallel, setup_signal_handlers,
-    JSONFormatter, _has_rich
-)
 from routine_workflow.config import WorkflowConfig
-from routine_workflow.runner import WorkflowRunner
 from routine_workflow.errors import CommandNotFoundError
+from routine_workflow.utils import (
+    JSONFormatter, _ExcludeMatcher, _has_rich, _indent_block, _which, cmd_exists,
+    gather_py_files, run_autoimport_parallel, run_command, setup_logging,
+    setup_signal_handlers, should_exclude,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -32,32 +36,52 @@ def clear_logger():
     yield
 
 
-@pytest.fixture
-def temp_project_root(tmp_path: Path) -> Path:
-    """Create a temporary project root with a log directory."""
-    log_dir = tmp_path / "logs"
-    log_dir.mkdir()
-    return tmp_path
+@pytest.fixture(scope="module")
+def temp_project_root(tmp_path_factory) -> Path:
+    """Create a temporary project root with a log directory (once per module)."""
+    root = tmp_path_factory.mktemp("project")
+    (root / "logs").mkdir()
+    return root
 
-@pytest.fixture
-def mock_config(tmp_path: Path) -> WorkflowConfig:
-    """Fixture for a mock WorkflowConfig."""
-    log_dir = tmp_path / "logs"
-    log_dir.mkdir()
+@pytest.fixture(scope="module")
+def mock_config(temp_project_root: Path) -> WorkflowConfig:
+    """Fixture for a mock WorkflowConfig.
+
+    Frozen, so one instance serves the whole module; tests needing other values
+    derive their own with dataclasses.replace.
+    """
     return WorkflowConfig(
-        project_root=tmp_path,
-        log_dir=log_dir,
-        log_file=log_dir / "workflow.log",
-        lock_dir=tmp_path / "workflow.lock",
+        project_root=temp_project_root,
+        log_dir=temp_project_root / "logs",
+        log_file=temp_project_root / "logs" / "workflow.log",
+        lock_dir=temp_project_root / "workflow.lock",
         dry_run=False,
     )
 
+# Files of the shared gather_py_files tree; venv/, .git/ and conftest.py are excluded by default
+_PY_TREE = ("b.py", "a.py", "venv/lib/site.py", ".git/hooks/h.py", "src/pkg/mod.py", "src/conftest.py", "notes.txt")
+
+@pytest.fixture(scope="module")
+def shared_py_tree(tmp_path_factory) -> Path:
+    """Project tree for the gather_py_files tests, laid out once per module and only read."""
+    root = tmp_path_factory.mktemp("shared_tree")
+    for rel in _PY_TREE:
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).touch()
+    return root
+
+@pytest.fixture(scope="module")
+def tree_config(mock_config: WorkflowConfig, shared_py_tree: Path) -> WorkflowConfig:
+    """mock_config rooted at the shared gather_py_files tree."""
+    return dataclasses.replace(mock_config, project_root=shared_py_tree)
+
 @pytest.fixture
-def mock_runner(mock_config: WorkflowConfig) -> WorkflowRunner:
-    """Fixture for a mock WorkflowRunner."""
-    runner = WorkflowRunner(mock_config)
-    runner.logger = MagicMock(spec=logging.Logger)
-    return runner
+def mock_runner(mock_config: WorkflowConfig) -> SimpleNamespace:
+    """Stand-in runner: the helpers under test only read .config, .logger and ._deadline.
+
+    A real WorkflowRunner would also configure logging and install signal handlers per test.
+    """
+    return SimpleNamespace(config=mock_config, logger=MagicMock(spec=logging.Logger), _deadline=None)
 
 
 # --- JSONFormatter Tests ---
@@ -65,7 +89,6 @@ def test_json_formatter_basic():
     formatter = JSONFormatter()
     record = logging.LogRecord("name", logging.INFO, "pathname", 10, "message", (), None)
     formatted = formatter.format(record)
-    import json
     data = json.loads(formatted)
     assert data["message"] == "message"
     assert data["level"] == "INFO"
@@ -75,7 +98,6 @@ def test_json_formatter_with_extra():
     record = logging.LogRecord("name", logging.INFO, "pathname", 10, "message", (), None)
     record.custom_attr = "custom_value"
     formatted = formatter.format(record)
-    import json
     data = json.loads(formatted)
     assert data["custom_attr"] == "custom_value"
 
@@ -88,29 +110,62 @@ def test_json_formatter_with_exception():
     
     record = logging.LogRecord("name", logging.ERROR, "pathname", 10, "error message", (), exc_info)
     formatted = formatter.format(record)
-    import json
     data = json.loads(formatted)
     assert "exception" in data
     assert "ValueError: test error" in data["exception"]
 
 
 # --- setup_logging Tests ---
-def test_setup_logging_json_format(temp_project_root: Path):
-    log_dir = temp_project_root / "logs"
-    log_file = log_dir / "routine_test.log"
-    config = WorkflowConfig(
-        project_root=temp_project_root,
-        log_dir=log_dir,
-        log_file=log_file,
-        lock_dir=temp_project_root / "lock",
-        log_format="json"
-    )
-    
-    with patch('routine_workflow.utils._has_rich', return_value=False):
+@pytest.fixture(scope="module")
+def logging_config(mock_config: WorkflowConfig) -> WorkflowConfig:
+    """mock_config with its own log file, shared by the setup_logging handler checks."""
+    return dataclasses.replace(mock_config, log_file=mock_config.log_dir / "routine_test.log")
+
+
+def _check_json(logger, config, handlers):
+    # The file handler sits behind a MemoryHandler
+    fh = handlers.file.return_value
+    assert [h.target for h in logger.handlers if isinstance(h, MemoryHandler)] == [fh]
+    assert isinstance(fh.setFormatter.call_args.args[0], JSONFormatter)
+
+
+def _check_plain(logger, config, handlers):
+    assert len(logger.handlers) == 2
+    assert any(type(h) is StreamHandler for h in logger.handlers)
+    handlers.rich.assert_not_called()
+
+
+def _check_rich(logger, config, handlers):
+    level = getattr(logging, config.log_level.upper(), logging.INFO)
+    assert len(logger.handlers) == 2  # File handler and Rich handler
+    handlers.rich.assert_called_once_with(show_level=True, show_path=False, omit_repeated_times=True)
+    # The level is set on the instance, not passed to the constructor
+    handlers.rich.return_value.setLevel.assert_called_once_with(level)
+    assert any(h is handlers.rich.return_value for h in logger.handlers)
+
+
+@pytest.mark.parametrize("has_rich,log_format,check", [
+    pytest.param(False, "json", _check_json, id="json_format"),
+    pytest.param(False, "text", _check_plain, id="plain"),
+    pytest.param(True, "text", _check_rich, id="rich_format"),
+])
+def test_setup_logging(logging_config: WorkflowConfig, has_rich, log_format, check):
+    config = dataclasses.replace(logging_config, log_format=log_format)
+    rich_logging = MagicMock()
+    # A StreamHandler-shaped instance so the logger accepts it as a handler
+    rich_handler = MagicMock(spec=logging.StreamHandler)
+    rich_handler.level = getattr(logging, config.log_level.upper(), logging.INFO)
+    rich_logging.RichHandler.return_value = rich_handler
+    # Start from a bare logger: pytest's capture handlers can land on it after clear_logger ran
+    logging.getLogger("routine_workflow").handlers.clear()
+
+    # The file handler is faked too: these checks never need the log file opened
+    with patch.dict(sys.modules, {'rich.logging': rich_logging}), \
+            patch('routine_workflow.utils._has_rich', return_value=has_rich), \
+            patch('routine_workflow.log_handlers.SizeCachedRotatingFileHandler') as file_handler_cls:
         logger = setup_logging(config)
 
-    fh = next(h for h in logger.handlers if isinstance(h, RotatingFileHandler))
-    assert isinstance(fh.formatter, JSONFormatter)
+    check(logger, config, SimpleNamespace(rich=rich_logging.RichHandler, file=file_handler_cls))
 
 
 def test_setup_logging_existing_handlers(mock_config: WorkflowConfig):
@@ -123,57 +178,32 @@ def test_setup_logging_existing_handlers(mock_config: WorkflowConfig):
     assert len(logger.handlers) == 1
     assert isinstance(logger.handlers[0], logging.NullHandler)
 
-def test_setup_logging_plain(mock_config: WorkflowConfig):
-    """Test setup_logging when rich is not available."""
-    with patch('routine_workflow.utils._has_rich', return_value=False):
-        logger = setup_logging(mock_config)
 
-    assert len(logger.handlers) == 2
-    # Verify StreamHandler
-    sh = next(h for h in logger.handlers if isinstance(h, StreamHandler) and not isinstance(h, RotatingFileHandler))
-    assert isinstance(sh, StreamHandler)
+# --- run_command Tests ---
+# Captured before any test patches it: the mock_popen patch replaces the attribute on
+# the subprocess module itself, so subprocess.Popen is the Mock while it is active
+_REAL_POPEN = subprocess.Popen
 
 
-@patch.dict(sys.modules, {'rich.logging': MagicMock()})
-@patch('routine_workflow.utils._has_rich', return_value=True)
-def test_setup_logging_rich_format(mock_has_rich, mock_config: WorkflowConfig):
-    """Test setup_logging when rich is available."""
-    # Ensure a fresh logger instance for this test
-    logger = logging.getLogger("routine_workflow")
-    logger.handlers.clear() # Ensure a fresh logger instance for this test
+@pytest.fixture
+def mock_popen(monkeypatch) -> Mock:
+    """subprocess.Popen as seen by run_command, replaced by a bare Mock.
 
-    # Now retrieve the mocked RichHandler from the mocked rich.logging module
-    MockRichHandler = sys.modules['rich.logging'].RichHandler
-    
-    # Create a spec-compliant mock for RichHandler's instance
-    mock_handler_instance = MagicMock(spec=logging.StreamHandler)
-    # Crucially, set the 'level' attribute on the mock instance itself
-    mock_handler_instance.level = getattr(logging, mock_config.log_level.upper(), logging.INFO)
-    mock_handler_instance.setLevel.return_value = None # Mock setLevel to do nothing
-
-    # Configure the mock RichHandler class to return our specific mock instance
-    MockRichHandler.return_value = mock_handler_instance
-    
-    logger = setup_logging(mock_config) # Call setup_logging only once
-
-    assert len(logger.handlers) == 2 # File handler and Rich handler
-    # Verify RichHandler was called to create an instance
-    MockRichHandler.assert_called_once_with(
-        show_level=True,
-        show_path=False,
-        omit_repeated_times=True
-    )
-    # Verify setLevel was called on the instance
-    mock_handler_instance.setLevel.assert_called_once_with(getattr(logging, mock_config.log_level.upper(), logging.INFO))
-    # Verify our specific mock instance was added to the logger's handlers
-    assert any(h is mock_handler_instance for h in logger.handlers)
+    Opt-in rather than autouse: most run_command tests spawn real interpreters.
+    Set ``side_effect = _REAL_POPEN`` to spy on real spawns.
+    """
+    m = Mock()
+    monkeypatch.setattr("routine_workflow.utils.subprocess.Popen", m)
+    return m
 
 
+@pytest.fixture
+def rich_output(monkeypatch):
+    """Rich markup on for run_command's line logging (conftest forces it off by default)."""
+    monkeypatch.setattr("routine_workflow.utils._has_rich", lambda: True)
 
-# --- run_command Tests ---
-@patch("routine_workflow.utils.subprocess.Popen")
-@patch('routine_workflow.utils._has_rich', return_value=False)
-def test_run_command_stream_exception_in_thread(mock_has_rich, mock_popen, mock_runner: Mock):
+
+def test_run_command_stream_exception_in_thread(mock_popen, mock_runner: Mock):
     """Test exception handling in streaming thread."""
     mock_proc = MagicMock()
     mock_proc.wait.return_value = 0
@@ -186,40 +216,68 @@ def test_run_command_stream_exception_in_thread(mock_has_rich, mock_popen, mock_
 
     assert result["success"] is True
     # Logger should have debug message about suppression
-    mock_runner.logger.debug.assert_any_call("stream thread suppressed: Read error")
-
-@patch("routine_workflow.utils.subprocess.run")
-def test_run_command_file_not_found_no_fatal(mock_run, mock_runner):
-    mock_run.side_effect = FileNotFoundError("Not found")
+    assert any(
+        c.args[0] == "stream thread suppressed: %s" and str(c.args[1]) == "Read error"
+        for c in mock_runner.logger.debug.call_args_list
+    )
 
-    result = run_command(mock_runner, "test", ["cmd"])
+_EXIT_3 = [sys.executable, "-c", "raise SystemExit(3)"]
+_SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+@pytest.mark.parametrize("cmd,popen_error,fatal,stderr_prefix,log_method,log_args,exit_code", [
+    pytest.param(["cmd"], FileNotFoundError("Not found"), False, "FileNotFoundError: ",
+                 "error", ("Command not found for: %s", "test"), None, id="not_found"),
+    pytest.param(["cmd"], Exception("General failure"), False, "Exception: General failure",
+                 "exception", ("Unhandled exception running command: %s — %s", "test"), None, id="exception"),
+    pytest.param(["cmd"], Exception("General failure"), True, "Exception: General failure",
+                 "exception", ("Unhandled exception running command: %s — %s", "test"), 1, id="exception_fatal"),
+    pytest.param(_EXIT_3, None, False, "", "warning", ("✖ %s (code %s)", "test", 3), None, id="bad_rc"),
+    pytest.param(_EXIT_3, None, True, "", "warning", ("✖ %s (code %s)", "test", 3), 3, id="bad_rc_fatal"),
+    pytest.param(_SLEEP, None, False, "TimeoutExpired: ", "error", ("Timeout (%ss) while running: %s", 0.3, "test"), None,
+                 id="timeout", marks=pytest.mark.slow),
+    pytest.param(_SLEEP, None, True, "TimeoutExpired: ", "error", ("Timeout (%ss) while running: %s", 0.3, "test"), 124,
+                 id="timeout_fatal", marks=pytest.mark.slow),
+])
+def test_run_command_failure_matrix(request, monkeypatch, mock_runner, cmd, popen_error, fatal,
+                                    stderr_prefix, log_method, log_args, exit_code):
+    """Each failure mode returns success=False, logs once, and only exits when fatal."""
+    mock_exit = Mock()
+    monkeypatch.setattr("routine_workflow.utils.cleanup_and_exit", mock_exit)
+    if popen_error is not None:
+        request.getfixturevalue("mock_popen").side_effect = popen_error
+
+    result = run_command(mock_runner, "test", cmd, timeout=0.3, fatal=fatal)
 
     assert result["success"] is False
-    assert "FileNotFoundError" in result["stderr"]
-    mock_runner.logger.error.assert_called_with("Command not found for: test")
+    assert result["stderr"].startswith(stderr_prefix)
+    assert any(c.args[:len(log_args)] == log_args for c in getattr(mock_runner.logger, log_method).call_args_list)
+    if exit_code is None:
+        mock_exit.assert_not_called()
+    else:
+        mock_exit.assert_called_once_with(mock_runner, exit_code)
 
-@patch("routine_workflow.utils.subprocess.run")
-def test_run_command_exception_no_fatal(mock_run, mock_runner):
-    mock_run.side_effect = Exception("General failure")
 
-    result = run_command(mock_runner, "test", ["cmd"])
+def test_run_command_file_not_found_fatal_raises(mock_popen, mock_runner):
+    """A missing executable surfaces as CommandNotFoundError instead of exiting."""
+    mock_popen.side_effect = FileNotFoundError("Not found")
+    with pytest.raises(CommandNotFoundError):
+        run_command(mock_runner, "test", ["cmd"], fatal=True)
 
-    assert result["success"] is False
-    assert "Exception: General failure" in result["stderr"]
+def test_run_command_rich_logging(rich_output, mock_runner):
+    script = "import sys; print('out line'); print('err line', file=sys.stderr)"
 
-@patch("routine_workflow.utils.subprocess.run")
-@patch('routine_workflow.utils._has_rich', return_value=True)
-def test_run_command_rich_logging(mock_has_rich, mock_run, mock_runner):
-    mock_run.return_value = MagicMock(returncode=0, stdout="out line", stderr="err line")
-    
-    run_command(mock_runner, "test", ["cmd"])
+    result = run_command(mock_runner, "test", [sys.executable, "-c", script])
+
+    assert result == {"success": True, "stdout": "out line", "stderr": "err line"}
 
-    mock_runner.logger.info.assert_any_call("[green]  out line[/green]")
-    mock_runner.logger.warning.assert_any_call("[red]  err line[/red]")
+    # [0] is the ">>> description: cmd" echo
+    assert mock_runner.logger.info.call_args_list[1:] == [
+        call("[green]  %s[/green]", "out line"), call("✓ %s (code %s)", "test", 0),
+    ]
+    assert mock_runner.logger.warning.call_args_list == [call("[red]  %s[/red]", "err line")]
 
-@patch("routine_workflow.utils.subprocess.Popen")
-@patch('routine_workflow.utils._has_rich', return_value=True)
-def test_run_command_stream_rich_logging(mock_has_rich, mock_popen, mock_runner):
+def test_run_command_stream_rich_logging(rich_output, mock_popen, mock_runner):
     mock_proc = MagicMock()
     mock_proc.stdout.readline.side_effect = ["out line\n", ""]
     mock_proc.stderr.readline.side_effect = ["err line\n", ""]
@@ -234,52 +292,200 @@ def test_run_command_stream_rich_logging(mock_has_rich, mock_popen, mock_runner)
 
     # Assertions might be flaky without joining threads, but since we mock wait/readline,
     # threads should exit quickly.
-    import time
     time.sleep(0.1)
 
-    mock_runner.logger.info.assert_any_call("[green]  out line[/green]")
-    mock_runner.logger.warning.assert_any_call("[red]  err line[/red]")
+    mock_runner.logger.info.assert_any_call("[green]  %s[/green]", "out line")
+    mock_runner.logger.warning.assert_any_call("[red]  %s[/red]", "err line")
+
+
+def test_run_command_stream_drains_before_status(mock_runner):
+    """Streamed lines are all logged before the command's status line."""
+    script = "import sys\nfor i in range(500): print(i)\n"
+    result = run_command(mock_runner, "chatty", [sys.executable, "-c", script], stream=True)
+
+    assert result["success"] is True
+    calls = mock_runner.logger.info.call_args_list
+    status = calls.index(call("✓ %s (code %s)", "chatty", 0))
+    assert call("  %s", "499") in calls[:status]
 
 
-@patch("routine_workflow.utils.subprocess.run")
-def test_run_command_string_command_no_shell(mock_run, mock_runner):
-    """Test that string command is shlex split if shell=False."""
-    mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+_UPPER_STDIN = "import sys; print(sys.stdin.read().upper())"
 
-    run_command(mock_runner, "test", "ls -l", shell=False)
 
-    mock_run.assert_called_with(
-        ["ls", "-l"],
-        cwd=ANY,
-        capture_output=True,
-        text=True,
-        shell=False,
-        input=None,
-        timeout=300.0
+@pytest.mark.parametrize("cmd,kwargs,argv,stdin,stdout,warnings", [
+    # A string command is shlex-split when shell=False
+    pytest.param("echo 'hello world'", {"shell": False}, ["echo", "hello world"], None, "hello world",
+                 [], id="string_no_shell"),
+    # An argument list runs directly even if shell=True is passed
+    pytest.param(["echo", "file with space"], {"shell": True}, ["echo", "file with space"], None, "file with space",
+                 [call("shell=True ignored for argument list: %s", "test")], id="list_shell_ignored"),
+    pytest.param([sys.executable, "-c", _UPPER_STDIN], {"input_data": "abc"}, [sys.executable, "-c", _UPPER_STDIN],
+                 subprocess.PIPE, "ABC", [], id="input_data"),
+])
+def test_run_command_popen_arguments(mock_popen, mock_runner, cmd, kwargs, argv, stdin, stdout, warnings):
+    """shell and input_data are threaded into the Popen call as expected."""
+    mock_popen.side_effect = _REAL_POPEN
+
+    result = run_command(mock_runner, "test", cmd, **kwargs)
+
+    mock_popen.assert_called_once_with(
+        argv, cwd=ANY, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=stdin, shell=False,
     )
+    assert result["stdout"] == stdout
+    assert mock_runner.logger.warning.call_args_list == warnings
 
-@patch("routine_workflow.utils.subprocess.run")
-def test_run_command_list_command_shell(mock_run, mock_runner):
-    """Test that list command is joined and quoted if shell=True."""
-    mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
-    
-    run_command(mock_runner, "test", ["ls", "-l", "file with space"], shell=True)
+def test_run_command_dry_run_spawns_nothing(mock_popen, mock_runner):
+    mock_runner.config = dataclasses.replace(mock_runner.config, dry_run=True)
 
-    # shlex.quote should wrap 'file with space'
-    # 'ls' and '-l' remain same.
-    # command should be "ls -l 'file with space'"
+    result = run_command(mock_runner, "test", ["rm", "-rf", "build"])
+
+    mock_popen.assert_not_called()
+    assert result["success"] is True
 
-    args, kwargs = mock_run.call_args
-    assert args[0] == "ls -l 'file with space'"
-    assert kwargs['shell'] is True
 
-@patch("routine_workflow.utils.subprocess.run")
-def test_run_command_timeout_not_stream(mock_run, mock_runner):
-    mock_run.side_effect = subprocess.TimeoutExpired("cmd", 10)
-    result = run_command(mock_runner, "test", "cmd", timeout=10)
+def test_run_command_dry_run_safe_executes(mock_runner):
+    """Commands carrying their own preview flag still run in dry-run mode."""
+    mock_runner.config = dataclasses.replace(mock_runner.config, dry_run=True)
+
+    result = run_command(mock_runner, "test", [sys.executable, "-c", "print('preview')"], dry_run_safe=True)
+
+    assert result["stdout"] == "preview"
+
+
+def test_run_command_capture_false_discards_stdout(mock_runner):
+    """capture=False sends stdout to DEVNULL but still collects stderr."""
+    script = "import sys; print('noise'); print('problem', file=sys.stderr)"
+
+    result = run_command(mock_runner, "test", [sys.executable, "-c", script], capture=False)
+
+    assert result["success"] is True
+    assert result["stdout"] == ""
+    assert result["stderr"] == "problem"
+
+
+@pytest.mark.slow
+def test_run_command_timeout_not_stream(mock_runner):
+    start = time.monotonic()
+    result = run_command(mock_runner, "test", [sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5)
+    assert time.monotonic() - start < 10
     assert result["success"] is False
     assert "TimeoutExpired" in result["stderr"]
 
+
+@pytest.mark.slow
+def test_run_command_timeout_after_stdio_closed(mock_runner):
+    """A child that closes stdout/stderr and keeps running is still killed at the timeout."""
+    script = "import os, time; os.close(1); os.close(2); time.sleep(30)"
+    start = time.monotonic()
+
+    result = run_command(mock_runner, "test", [sys.executable, "-c", script], timeout=0.5)
+
+    assert time.monotonic() - start < 10
+    assert result["success"] is False
+    assert "TimeoutExpired" in result["stderr"]
+
+
+def test_run_command_spent_deadline_spawns_nothing(mock_popen, mock_runner):
+    """A command asked for after the workflow deadline reports a timeout without spawning."""
+    mock_runner._deadline = time.monotonic() - 1
+
+    result = run_command(mock_runner, "test", ["echo", "hi"], timeout=300.0)
+
+    mock_popen.assert_not_called()
+    assert result["success"] is False
+    assert result["stderr"].startswith("TimeoutExpired: ")
+    mock_runner.logger.error.assert_called_once_with("Timeout (%ss) while running: %s", 0.0, "test")
+
+
+@pytest.mark.slow
+def test_run_command_clipped_by_workflow_deadline(mock_runner):
+    """A command cannot outlive the workflow deadline even with a long own timeout."""
+    mock_runner._deadline = time.monotonic() + 0.5
+    start = time.monotonic()
+
+    result = run_command(mock_runner, "test", [sys.executable, "-c", "import time; time.sleep(30)"], timeout=300.0)
+
+    assert time.monotonic() - start < 10
+    assert result["success"] is False
+    assert "TimeoutExpired" in result["stderr"]
+
+
+def test_run_command_skips_line_records_when_filtered(mock_runner):
+    """Per-line records are not emitted when the logger filters INFO out."""
+    mock_runner.logger.isEnabledFor.side_effect = lambda level: level >= logging.WARNING
+
+    result = run_command(mock_runner, "test", [sys.executable, "-c", "print('quiet')"])
+
+    assert result["stdout"] == "quiet"
+    assert all(c.args[:1] != ("  %s",) for c in mock_runner.logger.info.call_args_list)
+
+
+def test_run_command_stream_skips_filtered_lines(mock_runner):
+    """Streaming still drains output but logs nothing per line below the logger's level."""
+    mock_runner.logger.isEnabledFor.side_effect = lambda level: level >= logging.WARNING
+    script = "import sys; print('quiet'); print('loud', file=sys.stderr)"
+
+    result = run_command(mock_runner, "test", [sys.executable, "-c", script], stream=True)
+
+    assert result["success"] is True
+    assert all(c.args[:1] != ("  %s",) for c in mock_runner.logger.info.call_args_list)
+    mock_runner.logger.warning.assert_any_call("  %s", "loud")
+
+
+def test_run_command_captures_bounded_tail(mock_runner):
+    """Captured stdout keeps only the most recent lines; every line is still logged."""
+    script = "for i in range(2500): print(i)"
+
+    result = run_command(mock_runner, "test", [sys.executable, "-c", script])
+
+    lines = result["stdout"].splitlines()
+    assert len(lines) == 2000
+    assert lines[0] == "500" and lines[-1] == "2499"
+    # 2500 lines logged as grouped records of 1000, 1000 and 500
+    line_records = [c for c in mock_runner.logger.info.call_args_list if c.args[:1] == ("  %s",)]
+    assert len(line_records) == 3
+    assert line_records[0].args[1] == "\n  ".join(str(i) for i in range(1000))
+    assert line_records[-1].args[1].endswith("2499")
+
+
+def test_run_command_small_output_single_record(mock_runner):
+    """A modest amount of output is logged as one record per stream."""
+    script = "import sys\nfor i in range(50): print(i); print(-i, file=sys.stderr)"
+
+    run_command(mock_runner, "test", [sys.executable, "-c", script])
+
+    out_records = [c for c in mock_runner.logger.info.call_args_list if c.args[:1] == ("  %s",)]
+    err_records = [c for c in mock_runner.logger.warning.call_args_list if c.args[:1] == ("  %s",)]
+    assert len(out_records) == 1 and len(err_records) == 1
+    assert out_records[0].args[1].count("\n") == 49
+
+
+@pytest.mark.slow
+def test_run_command_large_input_echoed_while_reading(mock_runner):
+    """Input and output far beyond a pipe buffer do not deadlock."""
+    script = "import sys\nfor line in sys.stdin: sys.stdout.write(line); sys.stderr.write(line)\n"
+    data = "x" * 100 + "\n"
+
+    result = run_command(mock_runner, "echo", [sys.executable, "-c", script],
+                         input_data=data * 5000, timeout=30)
+
+    assert result["success"] is True
+    assert result["stdout"].splitlines()[-1] == "x" * 100
+
+
+# --- cmd_exists Tests ---
+def test_cmd_exists_caches_lookup():
+    _which.cache_clear()
+    with patch("routine_workflow.utils.shutil.which", return_value="/usr/bin/git") as mock_which:
+        assert cmd_exists("git") is True
+        assert cmd_exists("git") is True
+    mock_which.assert_called_once_with("git")
+
+    _which.cache_clear()
+    with patch("routine_workflow.utils.shutil.which", return_value=None):
+        assert cmd_exists("git") is False
+    _which.cache_clear()
+
 # --- gather_py_files & should_exclude Tests ---
 def test_should_exclude_relativize_fail(mock_config):
     # Path on different drive or unrelated path
@@ -291,74 +497,291 @@ def test_should_exclude_relativize_fail(mock_config):
     # Assuming project root is tmp path
     assert should_exclude(mock_config, p) is True
 
-def test_gather_py_files_sorting(mock_config):
-    # create files in random order
-    (mock_config.project_root / "b.py").touch()
-    (mock_config.project_root / "a.py").touch()
-
-    files = gather_py_files(mock_config)
+@pytest.mark.parametrize("rel, excluded", [
+    ("venv/lib/site.py", True),
+    (".git/hooks/x.py", True),
+    ("pkg/conftest.py", True),
+    ("pkg/sub/__pycache__/m.py", False),
+    ("__pycache__/m.py", True),
+    ("src/app.py", False),
+    ("scripts/check_imports.py", True),
+])
+def test_should_exclude_default_patterns(mock_config, rel, excluded):
+    """Compiled regex agrees with per-pattern fnmatch semantics."""
+    assert should_exclude(mock_config, mock_config.project_root / rel) is excluded
+
+
+def test_should_exclude_sibling_prefix(mock_config):
+    """A sibling directory sharing the root's name prefix is not inside the root."""
+    sibling = Path(str(mock_config.project_root) + "-other") / "src" / "app.py"
+    assert should_exclude(mock_config, sibling) is True
+
+
+def test_exclude_matcher_agrees_with_fnmatch():
+    """Literal-prefix and exact-path fast paths give the same answers as fnmatch."""
+    patterns = ("venv/*", "build/**", "a?c/*", "docs/[ab]/*", "*/conftest.py", "scripts/check.py")
+    matcher = _ExcludeMatcher(patterns)
+    assert matcher.prefixes == ("venv/", "build/")
+    assert matcher.exact == frozenset({"scripts/check.py"})
+
+    rels = ["venv/x.py", "venvx/y.py", "build/a/b.py", "abc/m.py", "ab/m.py", "docs/a/x.py",
+            "docs/c/x.py", "pkg/conftest.py", "scripts/check.py", "scripts/check.pyx", "src/app.py"]
+    for rel in rels:
+        assert matcher.match(rel) is any(fnmatch.fnmatchcase(rel, p) for p in patterns), rel
+    assert matcher.prunes("venv") and matcher.prunes("abc") and not matcher.prunes("venvx")
+
+
+def test_gather_py_files_sorting(tree_config):
+    # b.py was created before a.py; the result is still in Path order
+    files = gather_py_files(tree_config)
     assert files[0].name == "a.py"
     assert files[1].name == "b.py"
 
 
+def test_gather_py_files_prunes_excluded_dirs(tree_config):
+    root = tree_config.project_root
+    with patch("routine_workflow.utils.os.scandir", wraps=os.scandir) as mock_scandir:
+        files = gather_py_files(tree_config)
+
+    assert [p.relative_to(root).as_posix() for p in files] == ["a.py", "b.py", "src/pkg/mod.py"]
+    scanned = {Path(c.args[0]).relative_to(root).as_posix() for c in mock_scandir.call_args_list}
+    assert "venv" not in scanned and ".git" not in scanned
+    assert "src/pkg" in scanned
+
+
 # --- run_autoimport_parallel Tests ---
-@patch("routine_workflow.utils.cmd_exists", return_value=True)
-@patch("routine_workflow.utils.run_command")
-@patch("routine_workflow.utils.gather_py_files")
-def test_run_autoimport_worker_exception_logging(mock_gather, mock_cmd, mock_exists, mock_runner):
-    # We want to force an exception inside the thread pool execution
-    mock_gather.return_value = [Path("test.py")]
+def _fake_proc(returncode=0, out=b"", err=b""):
+    # The worker only reads returncode and awaits communicate() on the happy path
+    return SimpleNamespace(returncode=returncode, communicate=AsyncMock(return_value=(out, err)))
+
+
+@pytest.fixture
+def autoimport_env(mocker, mock_runner):
+    """run_autoimport_parallel's collaborators patched with defaults: one file, 8 cores, clean exits.
+
+    Tests override only what they exercise, e.g. ``autoimport_env.gather.return_value``.
+    """
+    mocker.patch("routine_workflow.utils.cmd_exists", return_value=True)
+    mocker.patch("routine_workflow.utils._CPU_COUNT", 8)
+    return SimpleNamespace(
+        runner=mock_runner,
+        gather=mocker.patch("routine_workflow.utils.gather_py_files", return_value=[Path("/proj/a.py")]),
+        which=mocker.patch("routine_workflow.utils._which", return_value=None),
+        exec=mocker.patch("asyncio.create_subprocess_exec",
+                          AsyncMock(side_effect=lambda *a, **k: _fake_proc())),
+    )
+
+
+def test_run_autoimport_worker_exception_logging(autoimport_env):
+    runner = autoimport_env.runner
+    autoimport_env.exec.side_effect = Exception("Worker died")
+
+    run_autoimport_parallel(runner)
+
+    runner.logger.warning.assert_called_once()
+    assert str(runner.logger.warning.call_args.args[1]) == "Worker died"
+    runner.logger.info.assert_called_with("Autoimport complete: %d/%d successful", 0, 1)
+
+
+def test_run_autoimport_batches_files(autoimport_env):
+    """Files are handed to autoimport in chunks, not one process per file."""
+    runner = autoimport_env.runner
+    files = [Path(f"/proj/m{i:03d}.py") for i in range(100)]
+    autoimport_env.gather.return_value = files
+    runner.config = dataclasses.replace(runner.config, max_workers=2)
+
+    run_autoimport_parallel(runner)
+
+    # 100 files // (2 workers * 4) -> chunks of 12 -> 9 invocations
+    cmds = [list(c.args) for c in autoimport_env.exec.call_args_list]
+    assert len(cmds) == 9
+    assert all(cmd[:2] == ["autoimport", "--keep-unused-imports"] for cmd in cmds)
+    assert sorted(p for cmd in cmds for p in cmd[2:]) == [str(f) for f in files]
+    assert runner.logger.info.call_args_list[-1] == call("Autoimport complete: %d/%d successful", 100, 100)
+
+
+def test_run_autoimport_chunk_size_capped(autoimport_env):
+    """Large trees are split into chunks of at most 64 paths."""
+    runner = autoimport_env.runner
+    autoimport_env.gather.return_value = [Path(f"/proj/m{i:04d}.py") for i in range(1000)]
+    runner.config = dataclasses.replace(runner.config, max_workers=1)
+
+    run_autoimport_parallel(runner)
+
+    sizes = [len(c.args) - 2 for c in autoimport_env.exec.call_args_list]
+    assert max(sizes) == 64
+    assert sum(sizes) == 1000
 
-    # run_command raises exception? No, run_command catches exceptions.
-    # But run_autoimport_parallel has a try-except block around fut.result().
-    # So if submit raises or result raises...
 
-    # We can patch ThreadPoolExecutor to return a future that raises on result()
-    with patch("routine_workflow.utils.ThreadPoolExecutor") as MockExecutor:
-        mock_future = Mock()
-        mock_future.result.side_effect = Exception("Worker died")
+def test_run_autoimport_concurrency_bounded(autoimport_env):
+    """No more than max_workers autoimport processes are in flight at once."""
+    runner = autoimport_env.runner
+    autoimport_env.gather.return_value = [Path(f"/proj/m{i:03d}.py") for i in range(100)]
+    runner.config = dataclasses.replace(runner.config, max_workers=3)
+    live = {"now": 0, "peak": 0}
 
-        mock_executor_instance = MockExecutor.return_value.__enter__.return_value
-        mock_executor_instance.submit.return_value = mock_future
+    async def communicate():
+        live["now"] += 1
+        live["peak"] = max(live["peak"], live["now"])
+        await asyncio.sleep(0)
+        live["now"] -= 1
+        return b"", b""
 
-        # as_completed needs to yield this future
-        with patch("routine_workflow.utils.as_completed", return_value=[mock_future]):
-             run_autoimport_parallel(mock_runner)
+    def spawn(*a, **k):
+        proc = _fake_proc()
+        proc.communicate = communicate
+        return proc
+
+    autoimport_env.exec.side_effect = spawn
+    run_autoimport_parallel(runner)
+
+    assert live["peak"] == 3
+    assert runner.logger.info.call_args_list[-1] == call("Autoimport complete: %d/%d successful", 100, 100)
+
+
+def test_run_autoimport_workers_clamped_to_cpus(autoimport_env, mocker):
+    """An oversized --workers value is clamped to the core count for autoimport."""
+    runner = autoimport_env.runner
+    mocker.patch("routine_workflow.utils._CPU_COUNT", 2)
+    autoimport_env.gather.return_value = [Path(f"/proj/m{i:03d}.py") for i in range(100)]
+    runner.config = dataclasses.replace(runner.config, max_workers=32)
+
+    run_autoimport_parallel(runner)
+
+    runner.logger.info.assert_any_call("Processing %d files with %d workers", 100, 2)
+    # 100 files // (2 workers * 4) -> chunks of 12 -> 9 invocations
+    assert autoimport_env.exec.call_count == 9
+
+
+def test_run_autoimport_uses_resolved_executable(autoimport_env):
+    autoimport_env.which.return_value = "/opt/bin/autoimport"
+
+    run_autoimport_parallel(autoimport_env.runner)
+
+    assert autoimport_env.exec.call_args.args[0] == "/opt/bin/autoimport"
+
+
+def test_run_autoimport_failed_chunk(autoimport_env):
+    runner = autoimport_env.runner
+    autoimport_env.exec.side_effect = lambda *a, **k: _fake_proc(1, err=b"bad import")
+
+    run_autoimport_parallel(runner)
+
+    assert runner.logger.warning.call_args_list == [
+        call("  %s", "bad import"), call("✖ %s (code %s)", "Autoimport 1 files", 1),
+    ]
+    runner.logger.info.assert_called_with("Autoimport complete: %d/%d successful", 0, 1)
+
+
+def test_run_autoimport_clipped_by_workflow_deadline(autoimport_env):
+    """A chunk's timeout is cut to what is left of the workflow deadline."""
+    runner = autoimport_env.runner
+    runner._deadline = time.monotonic() + 0.05
+    hung = SimpleNamespace(
+        returncode=None, communicate=AsyncMock(side_effect=asyncio.Event().wait),  # Never returns
+        kill=Mock(), wait=AsyncMock(),
+    )
+    autoimport_env.exec.side_effect = lambda *a, **k: hung
+
+    run_autoimport_parallel(runner)
+
+    hung.kill.assert_called_once()
+    fmt, timeout, description = runner.logger.error.call_args.args
+    assert (fmt, description) == ("Timeout (%ss) while running: %s", "Autoimport 1 files")
+    assert timeout <= 0.05
+    runner.logger.info.assert_called_with("Autoimport complete: %d/%d successful", 0, 1)
+
+
+def test_run_autoimport_spent_deadline_spawns_nothing(autoimport_env):
+    """Once the workflow deadline has passed, chunks fail as timeouts without a process."""
+    runner = autoimport_env.runner
+    runner._deadline = time.monotonic() - 1
+
+    run_autoimport_parallel(runner)
+
+    autoimport_env.exec.assert_not_called()
+    runner.logger.error.assert_called_once_with("Timeout (%ss) while running: %s", 0.0, "Autoimport 1 files")
+    runner.logger.info.assert_called_with("Autoimport complete: %d/%d successful", 0, 1)
+
+
+def test_indent_block_matches_line_join():
+    data = b"first\r\nsecond\n  third\n"
+    assert _indent_block(data) == "\n  ".join(data.decode().splitlines())
 
-    mock_runner.logger.warning.assert_called_with("autoimport worker exception: Worker died")
 
 # --- setup_signal_handlers Tests ---
-@patch("routine_workflow.utils.cleanup_and_exit")
-@patch("signal.signal")
-def test_signal_handler_execution(mock_signal, mock_cleanup, mock_runner):
+@pytest.fixture
+def signal_mocks(monkeypatch):
+    """signal.signal swapped on the utils module by a plain attribute set."""
+    mock_signal = Mock()
+    monkeypatch.setattr("routine_workflow.utils.signal.signal", mock_signal)
+    return mock_signal
+
+
+@pytest.fixture
+def mock_cleanup(monkeypatch):
+    """cleanup_and_exit as called by the installed signal handler."""
+    m = Mock()
+    monkeypatch.setattr("routine_workflow.utils.cleanup_and_exit", m)
+    return m
+
+
+def test_signal_handler_execution(mock_cleanup, signal_mocks, mock_runner):
     setup_signal_handlers(mock_runner)
 
+    assert [c.args[0] for c in signal_mocks.call_args_list] == [signal.SIGINT, signal.SIGTERM]
     # Extract handler
-    handler = mock_signal.call_args_list[0][0][1]
+    handler = signal_mocks.call_args_list[0][0][1]
 
     # Call it
     handler(signal.SIGINT, None)
 
     mock_cleanup.assert_called_with(mock_runner, 130) # 128 + 2
 
-@patch("routine_workflow.utils.cleanup_and_exit")
-@patch("signal.signal")
-def test_signal_handler_exception_fallback(mock_signal, mock_cleanup, mock_runner):
+def test_signal_handler_exception_fallback(monkeypatch, mock_cleanup, signal_mocks, mock_runner):
     setup_signal_handlers(mock_runner)
-    handler = mock_signal.call_args_list[0][0][1]
+    handler = signal_mocks.call_args_list[0][0][1]
 
     # Make cleanup raise generic exception
     mock_cleanup.side_effect = Exception("Cleanup failed")
 
-    with patch("os._exit") as mock_os_exit:
-        handler(signal.SIGINT, None)
-        mock_os_exit.assert_called_with(1)
+    mock_os_exit = Mock()
+    monkeypatch.setattr("os._exit", mock_os_exit)
+    handler(signal.SIGINT, None)
+    mock_os_exit.assert_called_with(1)
 
 # --- _has_rich Tests ---
-def test_has_rich_present():
+@pytest.fixture
+def fresh_has_rich():
+    _has_rich.cache_clear()
+    yield
+    _has_rich.cache_clear()
+
+def test_has_rich_present(fresh_has_rich):
     with patch("importlib.util.find_spec", return_value=True):
         assert _has_rich() is True
 
-def test_has_rich_absent():
+def test_has_rich_absent(fresh_has_rich):
     with patch("importlib.util.find_spec", return_value=None):
         assert _has_rich() is False
+
+def test_has_rich_probes_once(fresh_has_rich):
+    with patch("importlib.util.find_spec", return_value=None) as mock_find:
+        _has_rich()
+        _has_rich()
+    mock_find.assert_called_once_with("rich")
+
+
+def test_utils_import_defers_heavy_stdlib():
+    """Test importing utils does not load the executor or rotating-handler modules."""
+    src = Path(__file__).parent.parent / "src"
+    code = (
+        "import sys, routine_workflow.utils; "
+        "print(any(m in sys.modules for m in ('concurrent.futures', 'logging.handlers')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": str(src)},
+    )
+    assert result.stdout.strip() == "False"